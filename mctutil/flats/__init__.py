@@ -7,6 +7,7 @@ main = LazyGroup(
 	name="flats",
 	help="Flat-field drift tracking, digest, and medianization helpers.",
 	lazy_subcommands={
+		"apply": "mctutil.flats.apply:apply",
 		"beam-tracking": "mctutil.flats.beam_tracking:beam_tracking",
 		"medianize": "mctutil.flats.medianize:medianize",
 		"series-digest": "mctutil.flats.series_digest:series_digest",
@@ -0,0 +1,295 @@
+"""Stream flat-field correction across a projection stack with a process pool."""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing import cpu_count
+from pathlib import Path
+
+import click
+import numpy as np
+
+from mctutil.flats.beam_tracking import (
+	flatfield_projection,
+	geometric_crossfade,
+	keyframe_interp,
+	optimal_transport_interp,
+	projection_times,
+)
+from mctutil.flats.series_digest import FrameSource, sample_fractions
+from mctutil.shared.deps import require
+from mctutil.shared.log import LOG, log
+
+UINT16_MAX = np.iinfo(np.uint16).max
+WINDOW_PER_WORKER = 2
+
+_WORKER = None
+
+
+def _require_tifffile():
+	return require(
+		"tifffile",
+		"flats",
+		purpose="tifffile is required for flat-field correction",
+		error_type=click.ClickException,
+	)
+
+
+@dataclass(frozen=True)
+class ApplySpec:
+	"""Picklable description of the gain model and output encoding for workers."""
+
+	projections: Path
+	pre_flat: Path | None = None
+	post_flat: Path | None = None
+	digest_stack: Path | None = None
+	method: str = "transport"
+	transport_sigma: float = 12.0
+	dark: Path | None = None
+	output_dtype: str = "float32"
+	scale: float = 50000.0
+
+
+def build_gain_model(spec: ApplySpec):
+	"""Return ``G(t)`` from a digest stack's keyframes or a pre/post flat pair.
+
+	Digest keyframe ``i`` of ``keep`` is placed at scan fraction
+	``(i + 0.5) / keep``, the centre of the interval ``series-digest``
+	sampled it from (the ``frame_index`` of ``drift_trajectory.csv``).
+	"""
+	tifffile = _require_tifffile()
+	if spec.digest_stack is not None:
+		frames = np.asarray(tifffile.imread(spec.digest_stack), np.float64)
+		if frames.ndim == 2 or len(frames) < 2:
+			raise click.ClickException(f"{spec.digest_stack} needs at least two keyframes")
+		return keyframe_interp(list(frames), sample_fractions(len(frames)), spec.transport_sigma)
+	pre = tifffile.imread(spec.pre_flat)
+	post = tifffile.imread(spec.post_flat)
+	if spec.method == "crossfade":
+		return geometric_crossfade(pre, post)
+	return optimal_transport_interp(pre, post, spec.transport_sigma)
+
+
+def encode_projection(corrected, output_dtype: str, scale: float):
+	"""Cast a corrected projection to float32, or to ``round(value * scale)`` uint16."""
+	if output_dtype == "uint16":
+		return np.clip(np.rint(corrected * scale), 0, UINT16_MAX).astype(np.uint16)
+	return np.asarray(corrected, np.float32)
+
+
+def output_paths(source: FrameSource, projections: Path, output_dir: Path) -> list[Path]:
+	"""Name each corrected projection after its input frame or stack page."""
+	if source.frame_paths is not None:
+		return [output_dir / f"{path.stem}.tif" for path in source.frame_paths]
+	return [output_dir / f"{projections.stem}_{index:05d}.tif" for index in range(source.n_frames)]
+
+
+def validate_output_dir(source: FrameSource, projections: Path, output_dir: Path, paths: list[Path]) -> None:
+	"""Reject an output directory that is the input directory or would overwrite an input."""
+	inputs = {path.resolve() for path in (source.frame_paths or [projections])}
+	if output_dir.resolve() == projections.resolve() or inputs.intersection(path.resolve() for path in paths):
+		raise click.UsageError(f"OUTPUT_DIR {output_dir} must not be the projection directory or hold its frames.")
+
+
+def _init_worker(spec: ApplySpec, n_projections: int) -> None:
+	global _WORKER
+	tifffile = _require_tifffile()
+	dark = 0.0 if spec.dark is None else tifffile.imread(spec.dark).astype(np.float64)
+	_WORKER = {
+		"spec": spec,
+		"source": FrameSource(spec.projections),
+		"gain": build_gain_model(spec),
+		"dark": dark,
+		"times": projection_times(n_projections),
+	}
+
+
+def _correct_projection(index: int, output_path: Path) -> int:
+	"""Correct one projection and atomically write it; return the bytes written."""
+	tifffile = _require_tifffile()
+	spec = _WORKER["spec"]
+	projection = _WORKER["source"].read(index)
+	corrected = flatfield_projection(projection, _WORKER["gain"], _WORKER["times"][index], _WORKER["dark"])
+	encoded = encode_projection(corrected, spec.output_dtype, spec.scale)
+	partial = output_path.with_name(f".{output_path.name}.partial")
+	tifffile.imwrite(partial, encoded, photometric="minisblack")
+	os.replace(partial, output_path)
+	return encoded.nbytes
+
+
+def correct_projections(spec: ApplySpec, jobs, n_projections: int, workers: int, progress=None) -> int:
+	"""Correct ``(index, output_path)`` jobs in a pool and return the bytes written.
+
+	At most ``WINDOW_PER_WORKER`` projections per worker are in flight, so
+	memory stays bounded however long the stack is. Workers read their own
+	frames and build their own gain model, so only indices cross the pool.
+	"""
+	written = 0
+	pending = set()
+	with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec, n_projections)) as pool:
+		try:
+			for index, output_path in jobs:
+				while len(pending) >= workers * WINDOW_PER_WORKER:
+					written += _collect(pending, progress)
+				pending.add(pool.submit(_correct_projection, index, output_path))
+			while pending:
+				written += _collect(pending, progress)
+		except BaseException:
+			for future in pending:
+				future.cancel()
+			raise
+	return written
+
+
+def _collect(pending: set, progress) -> int:
+	done, _ = wait(tuple(pending), return_when=FIRST_COMPLETED)
+	written = 0
+	for future in done:
+		pending.discard(future)
+		written += future.result()
+		if progress is not None:
+			progress.update(1)
+	return written
+
+
+def _page_shape(path: Path, stack: bool = False) -> tuple[int, ...]:
+	with _require_tifffile().TiffFile(path) as tiff:
+		return tuple(tiff.series[0].shape[1:] if stack else tiff.pages[0].shape)
+
+
+def validate_shapes(spec: ApplySpec) -> None:
+	"""Check that every flat, digest keyframe, and dark frame matches the projections.
+
+	Only TIFF headers are read, so a binned or cropped digest fails here
+	rather than as a broadcast error inside every worker.
+	"""
+	source = FrameSource(spec.projections)
+	try:
+		first = spec.projections if source.frame_paths is None else source.frame_paths[0]
+	finally:
+		source.close()
+	expected = _page_shape(first)
+	inputs = {
+		"--digest-stack": (spec.digest_stack, True),
+		"--pre-flat": (spec.pre_flat, False),
+		"--post-flat": (spec.post_flat, False),
+		"--dark": (spec.dark, False),
+	}
+	for option, (path, stack) in inputs.items():
+		if path is None:
+			continue
+		shape = _page_shape(path, stack)
+		if shape != expected:
+			hint = "; was it digested with --bin or --crop?" if option == "--digest-stack" else ""
+			raise click.ClickException(
+				f"{option} {path} has frames of shape {shape}, but the projections are {expected}{hint}"
+			)
+
+
+def _validate_flats(pre_flat, post_flat, digest_stack):
+	if (pre_flat is None) != (post_flat is None):
+		raise click.UsageError("Provide both --pre-flat and --post-flat, or neither.")
+	if (pre_flat is None) == (digest_stack is None):
+		raise click.UsageError("Provide either --pre-flat/--post-flat or --digest-stack.")
+
+
+@click.command()
+@click.argument("projections", type=click.Path(exists=True, path_type=Path))
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("--pre-flat", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Flat before the scan.")
+@click.option("--post-flat", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Flat after the scan.")
+@click.option(
+	"--digest-stack",
+	type=click.Path(exists=True, dir_okay=False, path_type=Path),
+	help="series-digest keyframe stack to interpolate instead of a pre/post pair.",
+)
+@click.option(
+	"--method",
+	type=click.Choice(["transport", "crossfade"]),
+	default="transport",
+	show_default=True,
+	help="Pre/post gain interpolation.",
+)
+@click.option("--transport-sigma", type=float, default=12.0, show_default=True, help="Transport field smoothing.")
+@click.option("--dark", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Dark frame to subtract.")
+@click.option(
+	"--dtype",
+	"output_dtype",
+	type=click.Choice(["float32", "uint16"]),
+	default="float32",
+	show_default=True,
+	help="Output sample type.",
+)
+@click.option(
+	"--scale",
+	type=click.FloatRange(min=0, min_open=True),
+	default=50000.0,
+	show_default=True,
+	help="uint16 value of a corrected transmission of 1.0.",
+)
+@click.option("--workers", type=click.IntRange(min=1), help="Correction processes; defaults to the CPU count.")
+@click.option("--dry-run", is_flag=True, help="Plan corrected outputs without reading or writing frames.")
+def apply(
+	projections,
+	output_dir,
+	pre_flat,
+	post_flat,
+	digest_stack,
+	method,
+	transport_sigma,
+	dark,
+	output_dtype,
+	scale,
+	workers,
+	dry_run,
+):
+	"""Flat-field correct a projection directory or multipage TIFF, resuming past finished outputs."""
+	log.start()
+	_validate_flats(pre_flat, post_flat, digest_stack)
+	source = FrameSource(projections)
+	try:
+		paths = output_paths(source, projections, output_dir)
+		validate_output_dir(source, projections, output_dir, paths)
+	finally:
+		source.close()
+	jobs = [(index, path) for index, path in enumerate(paths) if not path.exists()]
+	log.write("Apply Plan", f"{len(paths)} projection(s), {len(paths) - len(jobs)} already corrected")
+	if dry_run:
+		log.write("Dry Run", f"Would write {len(jobs)} {output_dtype} projection(s) to {output_dir}")
+		return
+	if not jobs:
+		return
+
+	spec = ApplySpec(
+		projections,
+		pre_flat,
+		post_flat,
+		digest_stack,
+		method,
+		transport_sigma,
+		dark,
+		output_dtype,
+		scale,
+	)
+	validate_shapes(spec)
+	workers = min(workers or cpu_count(), len(jobs))
+	output_dir.mkdir(parents=True, exist_ok=True)
+	started = time.perf_counter()
+	with log.progress("Flat Apply", length=len(paths), initial=len(paths) - len(jobs)) as progress:
+		written = correct_projections(spec, jobs, len(paths), workers, progress)
+	elapsed = max(time.perf_counter() - started, 1e-9)
+	log.write(
+		"Throughput",
+		(
+			f"{len(jobs)} projection(s) in {elapsed:.1f} s with {workers} worker(s): "
+			f"{len(jobs) / elapsed:.1f} projection/s, {written / elapsed / 1e6:.1f} MB/s written"
+		),
+		log_level=LOG.INFO,
+	)
+
+
+if __name__ == "__main__":
+	apply()
@@ -65,6 +65,7 @@ pre->post line only; if the beam leaves that line (see a measured event series:
 All methods return a callable  G(t) -> ndarray. Use flatfield_projection(...).
 """
 from __future__ import annotations
+from collections import OrderedDict
 from pathlib import Path
 
 import click
@@ -278,7 +279,21 @@ def optimal_transport_interp(pre, post, transport_sigma=12, schedule=None):
 	avg = 0.5 * (lp + lq)
 	S = gaussian_filter(lq - lp, transport_sigma)
 	s = _as_schedule(schedule)
-	return lambda t: np.exp(avg + (s(t) - 0.5) * S)
+
+	def G(t):
+		return np.exp(avg + (s(t) - 0.5) * S)
+
+	def intervals(ts):
+		ts = np.asarray(ts, float)
+		yield (
+			np.arange(len(ts)),
+			avg.astype(np.float32),
+			S.astype(np.float32),
+			np.asarray(s(ts), np.float32),
+		)
+
+	G.intervals = intervals
+	return G
 
 
 # --------------------------------------------------------------------------- #
@@ -399,7 +414,32 @@ def separated_warp_interp(pre, post, beam_sigma=4, transport_sigma=12,
 #  With ~20 keyframes (60-frame spacing) the piecewise model's median error
 #  collapsed to 0.04 px; the digest produced by flat_series_digest.py is exactly
 #  such a keyframe stack.
-def keyframe_interp(flats, times, transport_sigma=12):
+class _PairCache:
+	"""LRU of float32 ``(avg, S)`` fields for keyframe pairs ``(k, k+1)``."""
+
+	def __init__(self, logs, transport_sigma, size):
+		if size < 1:
+			raise ValueError("cache_pairs must be at least 1")
+		self.logs = logs
+		self.transport_sigma = transport_sigma
+		self.size = size
+		self.fields = OrderedDict()
+
+	def __getitem__(self, k):
+		if k in self.fields:
+			self.fields.move_to_end(k)
+			return self.fields[k]
+		la, lb = self.logs[k], self.logs[k + 1]
+		self.fields[k] = (
+			(0.5 * (la + lb)).astype(np.float32),
+			gaussian_filter(lb - la, self.transport_sigma).astype(np.float32),
+		)
+		if len(self.fields) > self.size:
+			self.fields.popitem(last=False)
+		return self.fields[k]
+
+
+def keyframe_interp(flats, times, transport_sigma=12, cache_pairs=4):
 	"""Piecewise gain model from a sequence of clean flat snapshots (keyframes).
 
 	flats : (n, H, W) array or list of n flats, time-ordered (e.g. the
@@ -409,6 +449,7 @@ def keyframe_interp(flats, times, transport_sigma=12):
 			or seconds; queries use the same axis, normalised or not).
 	transport_sigma : smoothing of each pair's transport field (as in
 			optimal_transport_interp).
+	cache_pairs : how many pairs' (avg, S) fields to keep in an LRU cache.
 
 	Returns G(t): finds the bracketing keyframe pair (k, k+1) and applies the
 	noise-optimal pairwise interpolation
@@ -419,9 +460,10 @@ def keyframe_interp(flats, times, transport_sigma=12):
 	keyframes, not move steadily between two endpoints.
 
 	Queries outside [times[0], times[-1]] clamp to the nearest interval
-	(extrapolation via the end pair). Per-pair transport fields are computed
-	lazily and one pair is cached, which is efficient when projections are
-	processed in time order.
+	(extrapolation via the end pair). Per-pair fields are computed lazily in
+	float32 and the ``cache_pairs`` most recently used are kept, so revisiting
+	an interval out of time order does not refilter it. ``G.intervals(ts)``
+	groups many query times by pair for ``iter_gain_stack``.
 	"""
 	times = np.asarray(times, float)
 	if times.ndim != 1 or len(times) < 2:
@@ -432,25 +474,29 @@ def keyframe_interp(flats, times, transport_sigma=12):
 	logs = [np.log(_clean(f)) for f in flats]      # keep logs; flats can be freed
 	if len(logs) != n:
 		raise ValueError("len(flats) != len(times)")
+	pairs = _PairCache(logs, transport_sigma, cache_pairs)
 
-	cache = {"k": None, "avg": None, "S": None}
-
-	def _pair(k):
-		if cache["k"] != k:
-			la, lb = logs[k], logs[k + 1]
-			cache["avg"] = 0.5 * (la + lb)
-			cache["S"] = gaussian_filter(lb - la, transport_sigma)
-			cache["k"] = k
-		return cache["avg"], cache["S"]
+	def _locate(ts):
+		k = np.clip(np.searchsorted(times, ts) - 1, 0, n - 2)   # clamp -> end-pair extrapolation
+		w = (ts - times[k]) / (times[k + 1] - times[k])
+		return k, w
 
 	def G(t):
-		k = int(np.searchsorted(times, t) - 1)
-		k = min(max(k, 0), n - 2)                  # clamp -> end-pair extrapolation
-		w = (t - times[k]) / (times[k + 1] - times[k])
-		avg, S = _pair(k)
-		return np.exp(avg + (w - 0.5) * S)
+		k, w = _locate(float(t))
+		avg, S = pairs[int(k)]
+		return np.exp(avg + np.float32(w - 0.5) * S)
+
+	def intervals(ts):
+		ks, ws = _locate(np.asarray(ts, float))
+		# Runs of consecutive queries in one interval; time order gives one run per pair.
+		starts = np.flatnonzero(np.r_[True, ks[1:] != ks[:-1]])
+		for start, stop in zip(starts, np.r_[starts[1:], len(ks)]):
+			avg, S = pairs[int(ks[start])]
+			yield np.arange(start, stop), avg, S, ws[start:stop].astype(np.float32)
 
 	G.times = times
+	G.intervals = intervals
+	G.pairs = pairs
 	return G
 
 
@@ -740,8 +786,72 @@ def flatfield_projection(proj, G, t, dark=0.0):
 	return (np.asarray(proj, np.float64) - dark) / np.clip(g - dark, 1e-6, None)
 
 
-def build_gain_stack(G, n, dark=0.0):
-	return np.stack([G(i / (n - 1)) for i in range(n)], axis=0)
+def projection_times(n):
+	"""Scan fractions ``index / (n - 1)`` of ``n`` projections."""
+	return np.linspace(0.0, 1.0, n) if n > 1 else np.zeros(n)
+
+
+def iter_gain_stack(G, n, batch=8):
+	"""Yield the float32 gain of each of ``n`` projections in order.
+
+	Gain models with ``G.intervals`` (keyframe and transport interpolation)
+	are evaluated as one broadcast ``exp`` over up to ``batch`` projections
+	that share a keyframe pair; other models are called per projection.
+	"""
+	if batch < 1:
+		raise ValueError("batch must be at least 1")
+	ts = projection_times(n)
+	if not hasattr(G, "intervals"):
+		for t in ts:
+			yield np.asarray(G(t), np.float32)
+		return
+	for positions, avg, S, weights in G.intervals(ts):
+		for start in range(0, len(positions), batch):
+			offsets = (weights[start:start + batch] - np.float32(0.5))[:, None, None]
+			block = np.exp(avg + offsets * S)
+			yield from block
+
+
+def build_gain_stack(G, n, dark=0.0, batch=8):
+	"""Return the ``(n, H, W)`` gain stack for ``n`` projections.
+
+	The stack is float32, not the float64 of ``np.stack`` over ``G(t)``;
+	cast it if a caller needs double precision. ``n == 0`` gives an empty
+	``(0, H, W)`` stack shaped like ``G(0)``.
+	"""
+	if n == 0:
+		return np.empty((0,) + np.shape(G(0.0)), np.float32)
+	stack = None
+	for index, gain in enumerate(iter_gain_stack(G, n, batch=batch)):
+		if stack is None:
+			stack = np.empty((n,) + gain.shape, np.float32)
+		stack[index] = gain
+	return stack
+
+
+def write_gain_stack(G, n, path, batch=8):
+	"""Stream the float32 gain stack into a memmappable TIFF at ``path``.
+
+	Only one batch of gains is in memory at a time, however long the scan.
+	"""
+	if n < 1:
+		raise ValueError(f"a gain stack needs at least one projection, got {n}")
+	tifffile = _require_tifffile()
+	gains = iter_gain_stack(G, n, batch=batch)
+	first = next(gains)
+	stack = tifffile.memmap(
+		path,
+		shape=(n,) + first.shape,
+		dtype=np.float32,
+		bigtiff=n * first.nbytes >= 2 ** 32 - 2 ** 25,
+		photometric="minisblack",
+	)
+	stack[0] = first
+	for index, gain in enumerate(gains, start=1):
+		stack[index] = gain
+	stack.flush()
+	del stack
+	return Path(path)
 
 
 @click.command()
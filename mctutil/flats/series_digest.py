@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
 from pathlib import Path
 
 import click
@@ -91,6 +95,140 @@ def sample_centres(n_total, keep):
 	return ((interval_edges[:-1] + interval_edges[1:]) / 2).astype(int)
 
 
+def sample_fractions(keep):
+	"""Return the scan fraction ``(i + 0.5) / keep`` of each snapshot centre."""
+	return (np.arange(keep) + 0.5) / keep
+
+
+def sample_windows(n_total, centres, window):
+	"""Return the ``[low, high)`` frame range medianed around each centre."""
+	half_window = window // 2
+	return [(max(0, centre - half_window), min(n_total, centre + half_window + 1)) for centre in centres]
+
+
+class PrefetchReader:
+	"""Decode frames on a thread pool, keeping up to ``depth`` frames ahead of the consumer.
+
+	Each reader thread opens its own ``FrameSource`` so multipage stacks are
+	never shared between threads. The crop is applied in the reader.
+	"""
+
+	def __init__(self, path, pool, depth, crop=None):
+		self.path = path
+		self.pool = pool
+		self.depth = max(1, depth)
+		self.crop = crop
+		self._local = threading.local()
+		self._sources = []
+		self._lock = threading.Lock()
+
+	def _read(self, index):
+		source = getattr(self._local, "source", None)
+		if source is None:
+			source = self._local.source = FrameSource(self.path)
+			with self._lock:
+				self._sources.append(source)
+		frame = source.read(index)
+		if self.crop is not None:
+			row0, row1, col0, col1 = self.crop
+			frame = frame[row0:row1, col0:col1]
+		return frame
+
+	def frames(self, indices):
+		"""Yield ``(index, frame)`` in ``indices`` order."""
+		indices = iter(indices)
+		ahead = deque()
+		for index in indices:
+			ahead.append((index, self.pool.submit(self._read, index)))
+			if len(ahead) >= self.depth:
+				break
+		while ahead:
+			index, future = ahead.popleft()
+			next_index = next(indices, None)
+			if next_index is not None:
+				ahead.append((next_index, self.pool.submit(self._read, next_index)))
+			yield index, future.result()
+
+	def close(self):
+		with self._lock:
+			for source in self._sources:
+				source.close()
+			self._sources.clear()
+
+
+class WindowBuffer:
+	"""Ring buffer of the frames in the current median window.
+
+	Frame ``i`` lives in slot ``i % capacity``, so frames shared by
+	overlapping windows are read once. A window whose slots do not wrap is
+	a slice of the buffer and only a wrapping one is gathered into a new
+	array; ``np.median`` still partitions its own copy of every window.
+	"""
+
+	def __init__(self, capacity):
+		self.capacity = capacity
+		self.buffer = None
+		self.loaded = np.full(capacity, -1, np.int64)
+
+	def fill(self, low, high, frames):
+		"""Load the frames of ``[low, high)`` that are not already buffered from ``frames``."""
+		for index in range(low, high):
+			slot = index % self.capacity
+			if self.loaded[slot] == index:
+				continue
+			frame_index, frame = next(frames)
+			if frame_index != index:
+				raise RuntimeError(f"expected frame {index}, reader produced {frame_index}")
+			if self.buffer is None:
+				self.buffer = np.empty((self.capacity,) + frame.shape, np.float32)
+			self.buffer[slot] = frame
+			self.loaded[slot] = index
+
+	def window(self, low, high):
+		"""Return the buffered frames of ``[low, high)`` in slot order, as a view unless they wrap."""
+		if high - low == self.capacity:
+			return self.buffer
+		start = low % self.capacity
+		stop = start + high - low
+		if stop <= self.capacity:
+			return self.buffer[start:stop]
+		return np.concatenate([self.buffer[start:], self.buffer[:stop - self.capacity]])
+
+	def median(self, low, high):
+		return np.median(self.window(low, high), axis=0)
+
+
+def summarize_snapshot(snapshot, bin_factor):
+	"""Bin one window median and measure its centroid."""
+	snapshot = spatial_bin(snapshot, bin_factor)
+	return snapshot.astype(np.float32), beam_centroid(snapshot)
+
+
+def digest_snapshots(path, windows, bin_factor=1, crop=None, readers=1):
+	"""Median every window of frames and return ``(snapshots, centroids)``.
+
+	``readers`` threads prefetch frames ahead of the ring buffer and bin and
+	centroid finished medians, so decoding overlaps the reductions. Frames
+	shared by overlapping windows are read once, but every window is
+	medianed in full.
+	"""
+	needed = sorted({index for low, high in windows for index in range(low, high)})
+	capacity = max(high - low for low, high in windows)
+	with ThreadPoolExecutor(max_workers=readers) as pool:
+		reader = PrefetchReader(path, pool, 2 * readers, crop)
+		try:
+			frames = reader.frames(needed)
+			buffer = WindowBuffer(capacity)
+			summaries = []
+			for low, high in windows:
+				buffer.fill(low, high, frames)
+				summaries.append(pool.submit(summarize_snapshot, buffer.median(low, high), bin_factor))
+			results = [future.result() for future in summaries]
+		finally:
+			reader.close()
+	return [snapshot for snapshot, _ in results], [centroid for _, centroid in results]
+
+
 @click.command()
 @click.argument("path", type=click.Path(exists=True, path_type=Path))
 @click.option("--keep", type=click.IntRange(1), default=120, show_default=True, help="Number of snapshots.")
@@ -111,85 +249,77 @@ def sample_centres(n_total, keep):
 	show_default=True,
 	help="Output directory.",
 )
+@click.option(
+	"--readers",
+	type=click.IntRange(1),
+	default=min(8, cpu_count()),
+	show_default="min(8, CPU count)",
+	help="Threads prefetching and decoding frames.",
+)
 @click.option("--dry-run", is_flag=True, help="Plan the digest without writing or reading sampled image data.")
-def series_digest(path, keep, median_window, bin_factor, crop, output_dir, dry_run):
+def series_digest(path, keep, median_window, bin_factor, crop, output_dir, dry_run, readers):
 	"""Build digest_stack.tif and drift_trajectory.csv from flat-field frames."""
 	log.start()
 	source = FrameSource(path)
 	try:
 		n_total = source.n_frames
-		centres = sample_centres(n_total, keep)
-		window = max(1, median_window)
-		half_window = window // 2
-		log.write(
-			"Digest Plan",
-			f"{n_total} frames -> {keep} snapshots (interval {n_total / keep:.1f} frames), median window {window}",
-		)
-
-		if dry_run:
-			log.write("Dry Run", f"Would write {output_dir / 'drift_trajectory.csv'}")
-			log.write("Dry Run", f"Would write {output_dir / 'digest_stack.tif'}")
-			return
-
-		output_dir.mkdir(parents=True, exist_ok=True)
-		snapshots = []
-		trajectory = []
-		for centre in centres:
-			low = max(0, centre - half_window)
-			high = min(n_total, centre + half_window + 1)
-
-			window_frames = []
-			for index in range(low, high):
-				frame = source.read(index)
-				if crop is not None:
-					row0, row1, col0, col1 = crop
-					frame = frame[row0:row1, col0:col1]
-				window_frames.append(frame)
-
-			snapshot = np.median(np.stack(window_frames), axis=0)
-			snapshot = spatial_bin(snapshot, bin_factor)
-			snapshots.append(snapshot.astype(np.float32))
-
-			centroid_row, centroid_col, total_intensity = beam_centroid(snapshot)
-			trajectory.append((centre, total_intensity, centroid_row, centroid_col))
-
-		trajectory = np.array(trajectory, float)
-		intensity_norm = trajectory[:, 1] / trajectory[:, 1].max()
-		drift_row = trajectory[:, 2] - trajectory[0, 2]
-		drift_col = trajectory[:, 3] - trajectory[0, 3]
-		csv_table = np.column_stack(
-			[trajectory[:, 0], intensity_norm, trajectory[:, 2], trajectory[:, 3], drift_row, drift_col]
-		)
-
-		csv_path = output_dir / "drift_trajectory.csv"
-		np.savetxt(
-			csv_path,
-			csv_table,
-			delimiter=",",
-			header="frame_index,intensity_norm,centroid_row,centroid_col,drift_row,drift_col",
-			comments="",
-		)
-		log.write("File Written", str(csv_path))
-
-		line = np.polyval(np.polyfit(csv_table[:, 0], drift_row, 1), csv_table[:, 0])
-		linear_residual = float(np.std(drift_row - line))
-		log.write("Total Drift", f"row={drift_row[-1]:+.2f} col={drift_col[-1]:+.2f} px")
-		log.write("Intensity Change", f"{(intensity_norm[-1] - intensity_norm[0]) * 100:+.1f}%")
-		log.write(
-			"Linearity",
-			(
-				f"vertical residual={linear_residual:.3f} px "
-				f"({'nonlinear' if linear_residual > 0.5 else 'roughly linear'})"
-			),
-		)
-
-		tifffile = _require_tifffile()
-		digest_path = output_dir / "digest_stack.tif"
-		tifffile.imwrite(digest_path, np.stack(snapshots))
-		size_mb = digest_path.stat().st_size / 1e6
-		log.write("File Written", f"{digest_path} ({len(snapshots)} frames, {size_mb:.1f} MB)")
 	finally:
 		source.close()
+	centres = sample_centres(n_total, keep)
+	window = max(1, median_window)
+	log.write(
+		"Digest Plan",
+		f"{n_total} frames -> {keep} snapshots (interval {n_total / keep:.1f} frames), median window {window}",
+	)
+
+	if dry_run:
+		log.write("Dry Run", f"Would write {output_dir / 'drift_trajectory.csv'}")
+		log.write("Dry Run", f"Would write {output_dir / 'digest_stack.tif'}")
+		return
+
+	output_dir.mkdir(parents=True, exist_ok=True)
+	windows = sample_windows(n_total, centres, window)
+	snapshots, centroids = digest_snapshots(path, windows, bin_factor, crop, readers)
+	trajectory = [
+		(centre, total_intensity, centroid_row, centroid_col)
+		for centre, (centroid_row, centroid_col, total_intensity) in zip(centres, centroids)
+	]
+
+	trajectory = np.array(trajectory, float)
+	intensity_norm = trajectory[:, 1] / trajectory[:, 1].max()
+	drift_row = trajectory[:, 2] - trajectory[0, 2]
+	drift_col = trajectory[:, 3] - trajectory[0, 3]
+	csv_table = np.column_stack(
+		[trajectory[:, 0], intensity_norm, trajectory[:, 2], trajectory[:, 3], drift_row, drift_col]
+	)
+
+	csv_path = output_dir / "drift_trajectory.csv"
+	np.savetxt(
+		csv_path,
+		csv_table,
+		delimiter=",",
+		header="frame_index,intensity_norm,centroid_row,centroid_col,drift_row,drift_col",
+		comments="",
+	)
+	log.write("File Written", str(csv_path))
+
+	line = np.polyval(np.polyfit(csv_table[:, 0], drift_row, 1), csv_table[:, 0])
+	linear_residual = float(np.std(drift_row - line))
+	log.write("Total Drift", f"row={drift_row[-1]:+.2f} col={drift_col[-1]:+.2f} px")
+	log.write("Intensity Change", f"{(intensity_norm[-1] - intensity_norm[0]) * 100:+.1f}%")
+	log.write(
+		"Linearity",
+		(
+			f"vertical residual={linear_residual:.3f} px "
+			f"({'nonlinear' if linear_residual > 0.5 else 'roughly linear'})"
+		),
+	)
+
+	tifffile = _require_tifffile()
+	digest_path = output_dir / "digest_stack.tif"
+	tifffile.imwrite(digest_path, np.stack(snapshots), photometric="minisblack")
+	size_mb = digest_path.stat().st_size / 1e6
+	log.write("File Written", f"{digest_path} ({len(snapshots)} frames, {size_mb:.1f} MB)")
 
 
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ from mctutil.shared.cloudpaths import local_layer_path
 
 
 VARIABLE_SIZE_ENCODINGS = {"compressed_segmentation", "compresso"}
+COMPRESSED_SUFFIXES = (".gz", ".br", ".zstd")
 
 
 @dataclass(frozen=True)
@@ -85,16 +86,18 @@ def _load_mip0_spec(root: Path, info: dict | None) -> Mip0Spec:
 	return _mip0_spec(root, info)
 
 
-def _scan_scale(scale_path: Path) -> tuple[int, int]:
+def _scan_scale(scale_path: Path) -> tuple[int, int, int]:
 	file_count = 0
 	byte_count = 0
+	compressed_count = 0
 	with os.scandir(scale_path) as entries:
 		for entry in entries:
-			if not entry.is_file(follow_symlinks=False):
+			if not entry.is_file(follow_symlinks=False) or entry.name.endswith(".partial"):
 				continue
 			file_count += 1
 			byte_count += entry.stat(follow_symlinks=False).st_size
-	return file_count, byte_count
+			compressed_count += entry.name.endswith(COMPRESSED_SUFFIXES)
+	return file_count, byte_count, compressed_count
 
 
 def _raw_result(spec: Mip0Spec, byte_count: int) -> Mip0Completeness:
@@ -113,9 +116,10 @@ def _raw_result(spec: Mip0Spec, byte_count: int) -> Mip0Completeness:
 	)
 
 
-def _segmentation_result(
+def _chunk_count_result(
 	spec: Mip0Spec,
 	file_count: int,
+	label: str,
 ) -> Mip0Completeness:
 	expected = math.prod(
 		math.ceil(length / chunk)
@@ -128,9 +132,9 @@ def _segmentation_result(
 		expected=expected,
 		actual=file_count,
 		detail=(
-			"segmentation MIP 0 is structurally complete"
+			f"{label} MIP 0 is structurally complete"
 			if file_count == expected
-			else "segmentation MIP 0 is structurally incomplete"
+			else f"{label} MIP 0 is structurally incomplete"
 		),
 	)
 
@@ -157,17 +161,19 @@ def check_mip0_completeness(
 		return _failure(f"invalid or missing MIP-0 metadata: {exc}")
 
 	try:
-		file_count, byte_count = _scan_scale(spec.scale_path)
+		file_count, byte_count, compressed_count = _scan_scale(spec.scale_path)
 	except FileNotFoundError:
 		return _failure(
 			f"MIP-0 scale directory is missing: {spec.scale_path}",
 			scale_path=spec.scale_path,
 		)
 
+	if spec.encoding == "raw" and compressed_count:
+		return _chunk_count_result(spec, file_count, "compressed raw")
 	if spec.encoding == "raw":
 		return _raw_result(spec, byte_count)
 	if spec.encoding in VARIABLE_SIZE_ENCODINGS:
-		return _segmentation_result(spec, file_count)
+		return _chunk_count_result(spec, file_count, "segmentation")
 
 	return _failure(
 		f"unsupported MIP-0 encoding for completeness check: {spec.encoding}",
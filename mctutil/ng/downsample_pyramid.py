@@ -92,6 +92,7 @@ def run_pass(
 	lease_seconds: int,
 	release_leases: bool = True,
 	expected_existing: bool = False,
+	lease_batch: int | None = None,
 ) -> None:
 	specification = {
 		"stage": "downsample",
@@ -120,6 +121,7 @@ def run_pass(
 		release_leases=release_leases,
 		expected_existing=expected_existing,
 		progress_label=f"Downsample {pass_name.replace('-', ' ')}",
+		lease_batch=lease_batch,
 	)
 
 
@@ -139,6 +141,7 @@ def downsample_volume(
 	encoding: str,
 	lease_seconds: int,
 	release_leases: bool = True,
+	lease_batch: int | None = None,
 ) -> None:
 	configuration = {
 		"layer_path": normalize_layer_path(layer_path),
@@ -190,6 +193,7 @@ def downsample_volume(
 			lease_seconds,
 			release_leases=release_leases,
 			expected_existing=expected_existing,
+			lease_batch=lease_batch,
 		)
 		state["initial_complete"] = True
 		write_state(state_path, state)
@@ -230,6 +234,7 @@ def downsample_volume(
 				lease_seconds,
 				release_leases=release_leases,
 				expected_existing=expected_existing,
+				lease_batch=lease_batch,
 			)
 			extension["complete"] = True
 			write_state(state_path, state)
@@ -286,6 +291,11 @@ def downsample_volume(
 	help="Destination encoding; auto chooses from the layer type/source metadata.",
 )
 @click.option("--lease-seconds", type=click.IntRange(min=10), default=3600, show_default=True)
+@click.option(
+	"--lease-batch",
+	type=click.IntRange(min=1),
+	help="Tasks each worker leases and acknowledges at once; sized from the queue by default.",
+)
 @click.option(
 	"--release-leases/--preserve-leases",
 	default=True,
@@ -314,6 +324,7 @@ def downsample_pyramid(
 	release_leases: bool,
 	force: bool,
 	execute: bool,
+	lease_batch: int | None = None,
 ) -> None:
 	"""Build a volumetric MIP pyramid with durable task-level resume."""
 	try:
@@ -385,6 +396,7 @@ def downsample_pyramid(
 			encoding,
 			lease_seconds,
 			release_leases,
+			lease_batch,
 		)
 		log.write("Downsample", "Pyramid complete.", log_level=LOG.STATUS)
 	except click.ClickException:
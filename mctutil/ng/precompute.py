@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
-from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import (
+	ALL_COMPLETED,
+	FIRST_COMPLETED,
+	CancelledError,
+	ProcessPoolExecutor,
+	wait,
+)
 from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from multiprocessing import shared_memory
+from multiprocessing import get_context, shared_memory
 from pathlib import Path
 import re
 import sys
@@ -18,29 +25,51 @@ from mctutil.shared.cli import XYZ
 from mctutil.shared.cloudfiles_monitoring import patch_cloudfiles_monitoring
 from mctutil.shared.deps import require
 from mctutil.shared.io_helpers import (
+	RawReadPool,
 	distribute_read as distribute_offset_reads,
 	offset_reads,
 )
 from mctutil.shared.log import log, LOG
-from mctutil.shared.resource_monitor import record_active_workers
+from mctutil.shared.tiff_layout import TiffLayout, common_geometry, inspect_stack, layout_reads, summarize_layouts
+from mctutil.shared.resource_monitor import (
+	current_memory_pressure,
+	record_active_workers,
+	record_staging_slots,
+)
 from mctutil.ng.completeness import check_mip0_completeness
-from mctutil.ng.resource_planning import system_resources
+from mctutil.ng.raw_chunks import CHUNK_COMPRESSIONS, RawChunkWriter
+from mctutil.ng.resource_planning import (
+	ConcurrencyController,
+	fit_staging,
+	format_size,
+	load_settled_workers,
+	staging_memory_budget,
+	store_settled_workers,
+	system_resources,
+)
 
 
 LAYER_TYPES = ("auto", "image", "segmentation")
+CHUNK_WRITERS = ("auto", "native", "cloudvolume")
 SEGMENTATION_ENCODINGS = ("compressed_segmentation", "compresso")
 SEGMENTATION_NAME_HINTS = ("segmentation", "labels")
+DEFAULT_STAGING_SLOTS = 2
 
 _WORKER_VOLUME = None
 _WORKER_SOURCE = None
 _WORKER_SHARED_MEMORY = None
 _WORKER_DTYPE = None
 _WORKER_OFFSET_Z = 0
+_WORKER_BUFFERS = {}
 
 
 @dataclass(frozen=True)
 class InputSpec:
-	"""Resolved input layout shared by planning and workers."""
+	"""Resolved input layout shared by planning and workers.
+
+	A single-file ``memmap`` input is staged by raw plane offsets when it is
+	one contiguous block, and otherwise through its per-page ``layouts``.
+	"""
 
 	mode: str
 	source: str | tuple[str, ...]
@@ -48,6 +77,7 @@ class InputSpec:
 	dtype: np.dtype
 	raw_offset: int | None = None
 	plane_stride: int | None = None
+	layouts: tuple[TiffLayout, ...] | None = None
 
 
 @dataclass(frozen=True)
@@ -61,6 +91,9 @@ class VolumePlan:
 	voxel_offset: tuple[int, int, int]
 	chunk_size: tuple[int, int, int]
 	segmentation_block: tuple[int, int, int]
+	chunk_writer: str = "cloudvolume"
+	chunk_compression: str = "none"
+	compression_level: int | None = None
 
 
 @dataclass(frozen=True)
@@ -91,29 +124,7 @@ def discover_input(path: Path) -> InputSpec:
 	"""Inspect a memmappable TIFF or a directory of TIFF planes."""
 	path = path.resolve()
 	if path.is_file():
-		try:
-			mapped = tifffile.memmap(path)
-		except Exception as exc:
-			raise ValueError(
-				f"single TIFF input is not memmappable; run transform memmap-prep first: {path}"
-			) from exc
-		try:
-			if mapped.ndim != 3:
-				raise ValueError(f"expected a 3-D memmappable TIFF, got shape {mapped.shape}")
-			if not mapped.flags.c_contiguous:
-				raise ValueError(
-					f"single TIFF input is not C-contiguous; run transform memmap-prep first: {path}"
-				)
-			return InputSpec(
-				mode="memmap",
-				source=str(path),
-				shape=tuple(int(length) for length in mapped.shape),
-				dtype=np.dtype(mapped.dtype),
-				raw_offset=int(mapped.offset),
-				plane_stride=int(mapped.strides[0]),
-			)
-		finally:
-			del mapped
+		return _discover_stack(path)
 
 	paths = sorted(
 		(
@@ -137,6 +148,43 @@ def discover_input(path: Path) -> InputSpec:
 	)
 
 
+def _discover_stack(path: Path) -> InputSpec:
+	"""Stage a contiguous stack by raw plane offsets, and any other stack page by page."""
+	try:
+		mapped = tifffile.memmap(path)
+	except Exception:
+		mapped = None
+	if mapped is not None:
+		try:
+			if mapped.ndim != 3:
+				raise ValueError(f"expected a 3-D TIFF stack, got shape {mapped.shape}")
+			if mapped.flags.c_contiguous:
+				return InputSpec(
+					mode="memmap",
+					source=str(path),
+					shape=tuple(int(length) for length in mapped.shape),
+					dtype=np.dtype(mapped.dtype),
+					raw_offset=int(mapped.offset),
+					plane_stride=int(mapped.strides[0]),
+				)
+		finally:
+			del mapped
+	try:
+		layouts = inspect_stack(path)
+		(y_size, x_size), dtype = common_geometry(layouts)
+	except ValueError as exc:
+		raise ValueError(
+			f"single TIFF input is not a stack of 2-D grayscale pages; run transform memmap-prep first: {path}"
+		) from exc
+	return InputSpec(
+		mode="memmap",
+		source=str(path),
+		shape=(len(layouts), y_size, x_size),
+		dtype=dtype,
+		layouts=layouts,
+	)
+
+
 def guess_layer_type(path: Path) -> str:
 	name = path.resolve().name.lower()
 	if any(hint in name for hint in SEGMENTATION_NAME_HINTS) or name.endswith("_seg"):
@@ -176,8 +224,16 @@ def build_plan(
 	voxel_resolution: tuple[int, int, int],
 	voxel_offset: tuple[int, int, int],
 	segmentation_block: tuple[int, int, int],
+	*,
+	chunk_writer: str = "auto",
+	chunk_compression: str = "none",
+	compression_level: int | None = None,
 ) -> VolumePlan:
-	"""Resolve dtype, encoding, and chunk defaults."""
+	"""Resolve dtype, encoding, chunk, and chunk-writer defaults.
+
+	``auto`` keeps CloudVolume unless chunk compression is requested, which
+	only the native raw chunk writer supports.
+	"""
 	resolved_layer = guess_layer_type(input_path) if layer_type == "auto" else layer_type
 	if resolved_layer == "segmentation":
 		dtype = coerce_segmentation_dtype(
@@ -202,6 +258,7 @@ def build_plan(
 	}.items():
 		if any(value <= 0 for value in values):
 			raise ValueError(f"{name} entries must be positive: {values}")
+	chunk_writer = _resolve_chunk_writer(encoding, chunk_writer, chunk_compression, compression_level)
 
 	return VolumePlan(
 		layer_type=resolved_layer,
@@ -211,9 +268,35 @@ def build_plan(
 		voxel_offset=voxel_offset,
 		chunk_size=chunk_size,
 		segmentation_block=segmentation_block,
+		chunk_writer=chunk_writer,
+		chunk_compression=chunk_compression,
+		compression_level=compression_level,
 	)
 
 
+def _resolve_chunk_writer(
+	encoding: str,
+	chunk_writer: str,
+	chunk_compression: str,
+	compression_level: int | None,
+) -> str:
+	if chunk_writer not in CHUNK_WRITERS:
+		raise ValueError(f"chunk writer must be one of {', '.join(CHUNK_WRITERS)}; got {chunk_writer}")
+	if chunk_compression not in CHUNK_COMPRESSIONS:
+		raise ValueError(
+			f"chunk compression must be one of {', '.join(CHUNK_COMPRESSIONS)}; got {chunk_compression}"
+		)
+	if chunk_writer == "auto":
+		chunk_writer = "cloudvolume" if chunk_compression == "none" else "native"
+	if chunk_writer == "native" and encoding != "raw":
+		raise ValueError(f"the native chunk writer only supports raw encoding, not {encoding}")
+	if chunk_compression != "none" and chunk_writer != "native":
+		raise ValueError("chunk compression requires the native raw chunk writer")
+	if compression_level is not None and chunk_compression == "none":
+		raise ValueError("a compression level requires gzip or zstd chunk compression")
+	return chunk_writer
+
+
 def default_output_path(input_path: Path) -> Path:
 	if input_path.is_dir():
 		return input_path.with_name(f"{input_path.name}_precomputed")
@@ -331,17 +414,27 @@ def _init_worker(
 	shared_shape: tuple[int, int, int] | None,
 	source_dtype_name: str,
 	offset_z: int,
+	chunk_writer: str = "cloudvolume",
+	chunk_compression: str = "none",
+	compression_level: int | None = None,
 ) -> None:
 	global _WORKER_VOLUME, _WORKER_SOURCE, _WORKER_SHARED_MEMORY, _WORKER_DTYPE, _WORKER_OFFSET_Z
-	CloudVolume = _require_cloudvolume()
-	patch_cloudfiles_monitoring()
-	_WORKER_VOLUME = CloudVolume(
-		cloudpath,
-		parallel=False,
-		bounded=True,
-		cache=False,
-		compress=False,
-	)
+	if chunk_writer == "native":
+		_WORKER_VOLUME = RawChunkWriter(
+			cloudpath,
+			compression=chunk_compression,
+			level=compression_level,
+		)
+	else:
+		CloudVolume = _require_cloudvolume()
+		patch_cloudfiles_monitoring()
+		_WORKER_VOLUME = CloudVolume(
+			cloudpath,
+			parallel=False,
+			bounded=True,
+			cache=False,
+			compress=False,
+		)
 	_WORKER_DTYPE = np.dtype(dtype_name)
 	_WORKER_OFFSET_Z = offset_z
 	if _WORKER_SHARED_MEMORY is not None:
@@ -358,32 +451,294 @@ def _init_worker(
 		_WORKER_SOURCE = source
 
 
+def _worker_buffer(name: str, shape: tuple[int, ...], dtype) -> np.ndarray:
+	"""Return this worker's reusable buffer, reallocating only on a shape change."""
+	buffer = _WORKER_BUFFERS.get(name)
+	if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+		buffer = np.empty(shape, dtype=dtype)
+		_WORKER_BUFFERS[name] = buffer
+	return buffer
+
+
+def _read_directory_planes(z_start: int, z_stop: int) -> np.ndarray:
+	"""Decode directory TIFF planes into this worker's reused ``(Z, Y, X)`` buffer."""
+	planes = None
+	for offset, z_index in enumerate(range(z_start, z_stop)):
+		with tifffile.TiffFile(_WORKER_SOURCE[z_index]) as tiff:
+			series = tiff.series[0]
+			if len(series.shape) != 2:
+				raise ValueError(f"Z={z_index} is not a 2-D image: {series.shape}")
+			if planes is None:
+				planes = _worker_buffer(
+					"source",
+					(z_stop - z_start,) + tuple(series.shape),
+					series.dtype,
+				)
+			series.asarray(out=planes[offset])
+	return planes
+
+
+def _xyzc_view(slab: np.ndarray) -> np.ndarray:
+	"""Present a C-ordered ZYX slab as CloudVolume XYZC without a transpose copy.
+
+	The reversed-axis view of a C-contiguous array is Fortran-contiguous, which
+	is also the layout CloudVolume's raw encoder serializes directly. Only a
+	dtype change copies, into a buffer reused across tasks.
+	"""
+	if slab.dtype != _WORKER_DTYPE or not slab.flags.c_contiguous:
+		converted = _worker_buffer("converted", slab.shape, _WORKER_DTYPE)
+		np.copyto(converted, slab, casting="unsafe")
+		slab = converted
+	return slab.T[:, :, :, None]
+
+
 def _write_slice(work_item: int | tuple[int, int]) -> int:
 	if isinstance(work_item, tuple):
 		z_index, slot_index = work_item
 		image = _WORKER_SOURCE[slot_index, :, :]
 	else:
 		z_index = work_item
-		image = tifffile.imread(_WORKER_SOURCE[z_index])
+		image = _read_directory_planes(z_index, z_index + 1)[0]
 	if image.ndim != 2:
 		raise ValueError(f"Z={z_index} is not a 2-D image: {image.shape}")
-	image = np.asarray(image, dtype=_WORKER_DTYPE)
-	image = np.ascontiguousarray(image.T[:, :, None, None])
 	global_z = _WORKER_OFFSET_Z + z_index
-	_WORKER_VOLUME[:, :, global_z:global_z + 1, 0:1] = image
+	_WORKER_VOLUME[:, :, global_z:global_z + 1, 0:1] = _xyzc_view(image[None])
 	return z_index
 
 
+def _write_slab(work_item: tuple[int, int] | tuple[int, int, int]) -> tuple[int, ...]:
+	"""Write one chunk-aligned Z slab so each chunk file is written once."""
+	z_start, z_stop = work_item[:2]
+	depth = z_stop - z_start
+	if len(work_item) == 3:
+		slot_start = work_item[2]
+		slab = _WORKER_SOURCE[slot_start:slot_start + depth, :, :]
+	else:
+		slab = _read_directory_planes(z_start, z_stop)
+	global_z = _WORKER_OFFSET_Z + z_start
+	_WORKER_VOLUME[:, :, global_z:global_z + depth, 0:1] = _xyzc_view(slab)
+	return tuple(range(z_start, z_stop))
+
+
+def plan_slab_units(z_indices, chunk_depth: int) -> list[tuple[int, int]]:
+	"""Group Z indices into contiguous ``[start, stop)`` runs within one chunk row.
+
+	Chunk rows start at local Z multiples of ``chunk_depth`` because
+	CloudVolume aligns its chunk grid to the voxel offset.
+	"""
+	if chunk_depth < 1:
+		raise ValueError(f"chunk depth must be positive, got {chunk_depth}")
+	units = []
+	for z_index in sorted(z_indices):
+		if units and units[-1][1] == z_index and z_index % chunk_depth:
+			units[-1] = (units[-1][0], z_index + 1)
+		else:
+			units.append((z_index, z_index + 1))
+	return units
+
+
+def _record_completed(completed: set[int], result: int | tuple[int, ...]) -> int:
+	planes = result if isinstance(result, tuple) else (result,)
+	completed.update(planes)
+	return len(planes)
+
+
 def _harvest_completed_futures(futures, completed: set[int]) -> None:
 	for future in futures:
 		if not future.done() or future.cancelled():
 			continue
 		try:
-			completed.add(future.result())
+			_record_completed(completed, future.result())
 		except (BrokenProcessPool, CancelledError):
 			continue
 
 
+def _submit_unit(pool: ProcessPoolExecutor, unit: tuple[int, int], slot_start: int | None = None):
+	"""Submit one plane through ``_write_slice`` or a deeper slab through ``_write_slab``."""
+	z_start, z_stop = unit
+	if z_stop - z_start == 1:
+		work_item = z_start if slot_start is None else (z_start, slot_start)
+		return pool.submit(_write_slice, work_item)
+	work_item = unit if slot_start is None else (z_start, z_stop, slot_start)
+	return pool.submit(_write_slab, work_item)
+
+
+class _TaskWindow:
+	"""Submitted work units, with at most ``limit`` of them unfinished.
+
+	An attached ``ConcurrencyController`` lowers or raises the limit, up to
+	``workers``, between submissions.
+	"""
+
+	def __init__(
+		self,
+		pool: ProcessPoolExecutor,
+		workers: int,
+		completed: set[int],
+		progress=None,
+		controller: ConcurrencyController | None = None,
+	):
+		self.pool = pool
+		self.workers = workers
+		self.completed = completed
+		self.progress = progress
+		self.controller = controller
+		self.futures = []
+		self.pending = set()
+
+	def limit(self) -> int:
+		if self.controller is None:
+			return self.workers
+		return min(self.workers, self.controller.update())
+
+	def submit(self, unit: tuple[int, int], slot_start: int | None = None):
+		while self.pending and len(self.pending) >= self.limit():
+			self.collect(self.pending, FIRST_COMPLETED)
+		future = _submit_unit(self.pool, unit, slot_start)
+		self.futures.append(future)
+		self.pending.add(future)
+		return future
+
+	def collect(self, futures, return_when=ALL_COMPLETED) -> None:
+		"""Wait for ``futures`` and record every newly finished unit."""
+		done, _ = wait(tuple(futures), return_when=return_when)
+		for future in done:
+			if future not in self.pending:
+				continue
+			self.pending.discard(future)
+			count = _record_completed(self.completed, future.result())
+			if self.progress is not None:
+				self.progress.update(count)
+
+
+def _stage_batch(
+	staging_memory: shared_memory.SharedMemory,
+	input_spec: InputSpec,
+	placements: list[tuple[int, int]],
+	plane_size: int,
+	workers: int,
+	reader_pool: RawReadPool | None = None,
+) -> None:
+	"""Read or decode ``(z_index, slot_index)`` planes into their staging slots."""
+	reads = []
+	for z_index, slot_index in placements:
+		if input_spec.layouts is not None:
+			layout = input_spec.layouts[z_index]
+			reads.extend(layout_reads(layout, range(layout.shape[0]), slot_index * plane_size))
+			continue
+		reads.extend(offset_reads(
+			input_spec.source,
+			source_offset=input_spec.raw_offset + z_index * input_spec.plane_stride,
+			target_offset=slot_index * plane_size,
+			size=plane_size,
+		))
+	distribute_offset_reads(
+		staging_memory,
+		reads,
+		thread_max=min(workers, len(placements)),
+		pool=reader_pool,
+	)
+
+
+def _submit_staged_batches(
+	window: _TaskWindow,
+	staging_memory: shared_memory.SharedMemory,
+	input_spec: InputSpec,
+	units: list[tuple[int, int]],
+	batch_size: int,
+	unit_depth: int,
+	slot_count: int,
+	reader_pool: RawReadPool | None = None,
+) -> None:
+	"""Read batch N+1 into a free slot group while batch N is being written.
+
+	Staging memory holds ``slot_count`` groups of ``batch_size`` units, each
+	``unit_depth`` planes deep. A group is only overwritten after every write
+	that reads from it finished. Every batch is read through ``reader_pool``,
+	whose workers stay attached to the staging memory between batches.
+	"""
+	_, y_size, x_size = input_spec.shape
+	plane_size = y_size * x_size * input_spec.dtype.itemsize
+	group_size = batch_size * unit_depth
+	in_flight = deque()
+	for batch_number, batch_start in enumerate(range(0, len(units), batch_size)):
+		if len(in_flight) == slot_count:
+			window.collect(in_flight.popleft())
+		batch = units[batch_start:batch_start + batch_size]
+		first_slot = (batch_number % slot_count) * group_size
+		unit_slots = [first_slot + offset * unit_depth for offset in range(len(batch))]
+		placements = [
+			(z_index, slot_start + z_index - z_start)
+			for (z_start, z_stop), slot_start in zip(batch, unit_slots)
+			for z_index in range(z_start, z_stop)
+		]
+		_stage_batch(staging_memory, input_spec, placements, plane_size, batch_size, reader_pool)
+		in_flight.append([
+			window.submit(unit, slot_start)
+			for unit, slot_start in zip(batch, unit_slots)
+		])
+	while in_flight:
+		window.collect(in_flight.popleft())
+
+
+def staging_bytes(
+	input_spec: InputSpec,
+	workers: int,
+	staging_slots: int = DEFAULT_STAGING_SLOTS,
+	chunk_depth: int = 1,
+) -> int:
+	"""Return the shared memory a run stages for ``input_spec`` before any budget fit.
+
+	Only memmap input is staged: ``slots x workers x chunk_depth`` planes,
+	limited by the number of slabs in the volume.
+	"""
+	if input_spec.mode != "memmap":
+		return 0
+	z_count, y_size, x_size = input_spec.shape
+	depth = max(1, min(chunk_depth, z_count))
+	unit_count = -(-z_count // depth)
+	batch_size = max(1, min(workers, unit_count))
+	slot_count = min(staging_slots, -(-unit_count // batch_size))
+	return slot_count * batch_size * depth * y_size * x_size * input_spec.dtype.itemsize
+
+
+def _staging_layout(
+	input_spec: InputSpec,
+	units: list[tuple[int, int]],
+	workers: int,
+	staging_slots: int,
+	staging_budget: int | None,
+) -> tuple[int, int, int]:
+	"""Return ``(batch_size, slot_count, unit_depth)`` for staged memmap reads.
+
+	Staging holds ``slot_count x batch_size x unit_depth`` planes; slots and
+	then the batch size shrink until that fits ``staging_budget``, which
+	defaults to ``staging_memory_budget`` against the live workload sample.
+	"""
+	unit_depth = max(z_stop - z_start for z_start, z_stop in units)
+	batch_size = min(workers, len(units))
+	slot_count = min(staging_slots, -(-len(units) // batch_size))
+	if input_spec.mode != "memmap":
+		return batch_size, slot_count, unit_depth
+	if staging_budget is None:
+		staging_budget = staging_memory_budget(pressure=current_memory_pressure())
+	_, y_size, x_size = input_spec.shape
+	unit_bytes = unit_depth * y_size * x_size * input_spec.dtype.itemsize
+	fitted = fit_staging(unit_bytes, batch_size, slot_count, staging_budget)
+	if fitted != (batch_size, slot_count):
+		log.write(
+			"Staging",
+			(
+				f"{slot_count} slot(s) x {batch_size} slab(s) of {format_size(unit_bytes)} exceed the "
+				f"{format_size(staging_budget)} staging budget; using {fitted[1]} x {fitted[0]}."
+			),
+			log_level=LOG.WARN,
+		)
+	batch_size, slot_count = fitted
+	record_staging_slots(slot_count)
+	return batch_size, slot_count, unit_depth
+
+
 def _execute_slices(  # noqa: C901
 	cloudpath: str,
 	input_spec: InputSpec,
@@ -391,38 +746,48 @@ def _execute_slices(  # noqa: C901
 	z_indices: list[int],
 	workers: int,
 	progress=None,
+	staging_slots: int = DEFAULT_STAGING_SLOTS,
+	controller: ConcurrencyController | None = None,
+	staging_budget: int | None = None,
 ) -> WorkerBatchResult:
 	if not z_indices:
 		return WorkerBatchResult(frozenset(), None)
+	if staging_slots < 1:
+		raise ValueError(f"staging slots must be positive, got {staging_slots}")
 
 	pool_options = {}
 	if sys.version_info >= (3, 11):
 		pool_options["max_tasks_per_child"] = 500
 
+	units = plan_slab_units(z_indices, plan.chunk_size[2])
+	batch_size, slot_count, unit_depth = _staging_layout(input_spec, units, workers, staging_slots, staging_budget)
 	shared_source = input_spec.mode == "memmap"
 	staging_memory = None
+	reader_pool = None
 	shared_shape = None
 	worker_source = input_spec.source
 	if shared_source:
-		if input_spec.raw_offset is None or input_spec.plane_stride is None:
+		if input_spec.layouts is None and (input_spec.raw_offset is None or input_spec.plane_stride is None):
 			raise ValueError("memmap input is missing its raw byte layout")
 		_, y_size, x_size = input_spec.shape
-		slot_count = min(workers, len(z_indices))
-		shared_shape = (slot_count, y_size, x_size)
-		plane_size = y_size * x_size * input_spec.dtype.itemsize
+		shared_shape = (slot_count * batch_size * unit_depth, y_size, x_size)
 		staging_memory = shared_memory.SharedMemory(
 			create=True,
-			size=slot_count * plane_size,
+			size=shared_shape[0] * y_size * x_size * input_spec.dtype.itemsize,
 		)
 		worker_source = staging_memory.name
+		reader_pool = RawReadPool(batch_size)
 
 	pool = None
-	futures = []
+	window = None
 	completed = set()
 	failure = None
 	try:
+		# Spawned, not forked: publish may run this stage beside threads of
+		# other stages, such as boto3 transfers, that hold locks.
 		pool = ProcessPoolExecutor(
 			max_workers=workers,
+			mp_context=get_context("spawn"),
 			initializer=_init_worker,
 			initargs=(
 				cloudpath,
@@ -432,54 +797,43 @@ def _execute_slices(  # noqa: C901
 				shared_shape,
 				input_spec.dtype.name,
 				plan.voxel_offset[2],
+				plan.chunk_writer,
+				plan.chunk_compression,
+				plan.compression_level,
 			),
 			**pool_options,
 		)
 
+		window = _TaskWindow(pool, workers, completed, progress, controller)
 		if shared_source:
-			for batch_start in range(0, len(z_indices), shared_shape[0]):
-				batch = z_indices[batch_start:batch_start + shared_shape[0]]
-				reads = []
-				for slot_index, z_index in enumerate(batch):
-					reads.extend(offset_reads(
-						input_spec.source,
-						source_offset=input_spec.raw_offset + z_index * input_spec.plane_stride,
-						target_offset=slot_index * plane_size,
-						size=plane_size,
-					))
-				distribute_offset_reads(
-					staging_memory,
-					reads,
-					thread_max=min(workers, len(batch)),
-				)
-				batch_futures = [
-					pool.submit(_write_slice, (z_index, slot_index))
-					for slot_index, z_index in enumerate(batch)
-				]
-				futures.extend(batch_futures)
-				for future in as_completed(batch_futures):
-					completed.add(future.result())
-					if progress is not None:
-						progress.update(1)
+			_submit_staged_batches(
+				window,
+				staging_memory,
+				input_spec,
+				units,
+				batch_size,
+				unit_depth,
+				slot_count,
+				reader_pool,
+			)
 		else:
-			for z_index in z_indices:
-				futures.append(pool.submit(_write_slice, z_index))
-			for future in as_completed(futures):
-				completed.add(future.result())
-				if progress is not None:
-					progress.update(1)
+			for unit in units:
+				window.submit(unit)
+			window.collect(window.pending)
 	except BrokenProcessPool as exc:
 		failure = exc
 	finally:
 		if pool is not None:
 			pool.shutdown(wait=True, cancel_futures=failure is not None)
+		if reader_pool is not None:
+			reader_pool.close()
 		if staging_memory is not None:
 			staging_memory.close()
 			staging_memory.unlink()
 
 	if failure is not None:
 		known_completed = set(completed)
-		_harvest_completed_futures(futures, completed)
+		_harvest_completed_futures(() if window is None else window.futures, completed)
 		if progress is not None:
 			progress.update(len(completed - known_completed))
 	return WorkerBatchResult(frozenset(completed), failure)
@@ -490,17 +844,35 @@ def write_all_slices(
 	input_spec: InputSpec,
 	plan: VolumePlan,
 	workers: int,
+	staging_slots: int = DEFAULT_STAGING_SLOTS,
 ) -> int:
-	"""Write every plane, retrying incomplete work from a broken worker pool."""
+	"""Write every plane, retrying incomplete work from a broken worker pool.
+
+	Each task writes one chunk-aligned Z slab, so Z-deep chunks are written
+	once instead of once per plane. Memmap input is staged through
+	``staging_slots`` shared-memory batches of ``workers`` slabs each, so disk
+	reads overlap chunk encoding and writes.
+
+	While publish resource accounting is active, a ``ConcurrencyController``
+	sizes the in-flight task count from workload memory samples, starting at
+	the concurrency the previous run into ``output_path`` settled on.
+	"""
 	remaining = set(range(input_spec.shape[0]))
 	initial_count = len(remaining)
 	active_workers = min(workers, len(remaining))
 	record_active_workers(active_workers)
+	record_staging_slots(staging_slots)
+	controller = _adaptive_controller(output_path, active_workers)
+	adaptive = (
+		f", starting at {controller.limit} in flight"
+		if controller is not None
+		else ""
+	)
 	with log.progress(
 		"Z Planes",
 		length=initial_count,
 		start_message=(
-			f"Writing {initial_count} Z plane(s) with {active_workers} worker(s)."
+			f"Writing {initial_count} Z plane(s) with {active_workers} worker(s){adaptive}."
 		),
 		final_message=lambda handle: (
 			f"Wrote {handle.position} Z plane(s)."
@@ -514,6 +886,8 @@ def write_all_slices(
 				sorted(remaining),
 				active_workers,
 				progress=progress,
+				staging_slots=staging_slots,
+				controller=controller,
 			)
 			remaining.difference_update(result.completed)
 			if result.failure is not None:
@@ -521,6 +895,9 @@ def write_all_slices(
 					raise result.failure
 				active_workers = max(1, active_workers // 2)
 				record_active_workers(active_workers)
+				if controller is not None:
+					controller.maximum = active_workers
+					controller.limit = min(controller.limit, active_workers)
 				log.write(
 					"Z Planes",
 					(
@@ -536,18 +913,41 @@ def write_all_slices(
 					f"worker pool exited without completing "
 					f"{len(remaining)} Z plane(s)"
 				)
+	if controller is not None:
+		store_settled_workers(output_path, controller.limit)
 	return initial_count
 
 
+def _adaptive_controller(output_path: Path, workers: int) -> ConcurrencyController | None:
+	"""Build a memory-driven controller when workload samples are available."""
+	if current_memory_pressure() is None:
+		return None
+	settled = load_settled_workers(output_path)
+	return ConcurrencyController(
+		maximum=workers,
+		limit=workers if settled is None else settled,
+		sample=current_memory_pressure,
+	)
+
+
+def _compression_label(plan: VolumePlan) -> str:
+	if plan.compression_level is None:
+		return plan.chunk_compression
+	return f"{plan.chunk_compression} (level {plan.compression_level})"
+
+
 def describe_plan(
 	input_path: Path,
 	output_path: Path,
 	input_spec: InputSpec,
 	plan: VolumePlan,
 	workers: int,
+	staging_slots: int = DEFAULT_STAGING_SLOTS,
 ) -> None:
+	staging = f"; staging slots: {staging_slots}" if input_spec.mode == "memmap" else ""
+	layout = "" if input_spec.layouts is None else f"; pages: {summarize_layouts(input_spec.layouts)}"
 	statements = (
-		f"Input: {input_path.resolve()} ({input_spec.mode})",
+		f"Input: {input_path.resolve()} ({input_spec.mode}{layout})",
 		f"Output: {output_path.resolve()}",
 		f"Shape (Z,Y,X): {input_spec.shape}; source dtype: {input_spec.dtype}",
 		(
@@ -556,7 +956,8 @@ def describe_plan(
 		),
 		f"Voxel resolution (nm): {plan.resolution}",
 		f"Voxel offset: {plan.voxel_offset}",
-		f"Chunk size: {plan.chunk_size}; workers: {workers}",
+		f"Chunk size: {plan.chunk_size}; workers: {workers}{staging}",
+		f"Chunk writer: {plan.chunk_writer}; compression: {_compression_label(plan)}",
 	)
 	for statement in statements:
 		log.write("Precompute", statement, log_level=LOG.INFO)
@@ -576,6 +977,17 @@ def describe_plan(
 		"CPU count and cannot exceed it."
 	),
 )
+@click.option(
+	"--staging-slots",
+	type=click.IntRange(min=1),
+	default=DEFAULT_STAGING_SLOTS,
+	show_default=True,
+	help=(
+		"Shared-memory batches of memmap planes kept in flight; 2 reads the "
+		"next batch while the current one is written, 3 adds slack for "
+		"uneven writes, and 1 disables the overlap."
+	),
+)
 @click.option("--layer-type", type=click.Choice(LAYER_TYPES), default="auto", show_default=True)
 @click.option(
 	"--seg-encoding",
@@ -608,6 +1020,28 @@ def describe_plan(
 	show_default=True,
 	help="Voxel-coordinate offset as X,Y,Z.",
 )
+@click.option(
+	"--chunk-writer",
+	type=click.Choice(CHUNK_WRITERS),
+	default="auto",
+	show_default=True,
+	help=(
+		"MIP-0 chunk writer; auto writes through CloudVolume unless "
+		"--chunk-compression selects the native local raw writer."
+	),
+)
+@click.option(
+	"--chunk-compression",
+	type=click.Choice(CHUNK_COMPRESSIONS),
+	default="none",
+	show_default=True,
+	help="Native-writer chunk file compression (.gz or .zstd suffix).",
+)
+@click.option(
+	"--compression-level",
+	type=int,
+	help="Chunk compression level: gzip 1-9 (default 9) or zstd (default 3).",
+)
 @click.option("--execute/--dry-run", default=True, show_default=True)
 def precompute(
 	input_path: Path,
@@ -621,6 +1055,10 @@ def precompute(
 	voxel_resolution: tuple[int, int, int],
 	voxel_offset: tuple[int, int, int],
 	execute: bool,
+	staging_slots: int = DEFAULT_STAGING_SLOTS,
+	chunk_writer: str = "auto",
+	chunk_compression: str = "none",
+	compression_level: int | None = None,
 ) -> None:
 	"""Write an unsharded Neuroglancer precomputed volume at MIP 0."""
 	try:
@@ -638,8 +1076,11 @@ def precompute(
 			voxel_resolution,
 			voxel_offset,
 			segmentation_block,
+			chunk_writer=chunk_writer,
+			chunk_compression=chunk_compression,
+			compression_level=compression_level,
 		)
-		describe_plan(input_path, output_path, input_spec, plan, workers)
+		describe_plan(input_path, output_path, input_spec, plan, workers, staging_slots)
 		if not execute:
 			return
 
@@ -651,7 +1092,7 @@ def precompute(
 			else "Using compatible existing MIP 0 metadata; rewriting all Z planes.",
 			log_level=LOG.STATUS,
 		)
-		written = write_all_slices(output_path, input_spec, plan, workers)
+		written = write_all_slices(output_path, input_spec, plan, workers, staging_slots)
 		completeness = check_mip0_completeness(output_path, volume.info)
 		if not completeness.complete:
 			raise RuntimeError(
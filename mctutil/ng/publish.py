@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -21,6 +22,7 @@ from mctutil.ng.resource_planning import (
 	parse_size,
 	plan_resources,
 	ResourcePlan,
+	staging_memory_budget,
 	system_resources,
 )
 from mctutil.shared.aws import configure_aws_profile
@@ -50,6 +52,7 @@ STAGE_EXTRAS = {
 	"mesh": ("mesh",),
 }
 DERIVED_SUFFIXES = ("_precomputed", "_precomputed_sharded_local")
+NETWORK_STAGE_SLOTS = 1
 
 
 @dataclass(frozen=True)
@@ -636,6 +639,60 @@ def validate_prerequisites(
 		raise ValueError(f"sharded staging input is missing: {plan.staged}")
 
 
+def upload_during_shard(options: dict) -> bool:
+	return "upload" in options["effective_stages"] and bool(options["s3_prefix"])
+
+
+class ScaleUploader:
+	"""Upload each finished shard scale while later scales are still sharding.
+
+	Scales are synced one at a time on a background thread without root
+	metadata, so S3 never holds an ``info`` ahead of its shards. The upload
+	stage that follows finds them in the sync manifest, uploads whatever is
+	left, and writes the root ``info`` last. A failed scale upload is logged
+	and left to that stage.
+	"""
+
+	def __init__(self, plan: DatasetPlan, options: dict):
+		self.plan = plan
+		self.options = options
+		self.bucket, self.key = dataset_s3_target(plan, options["s3_prefix"])
+		self._executor = ThreadPoolExecutor(max_workers=1)
+		self._futures = {}
+
+	def __call__(self, mip: int) -> None:
+		if mip == 0 and not self.options["upload_include_mip0"]:
+			return
+		self._futures[mip] = self._executor.submit(self._upload, mip)
+
+	def _upload(self, mip: int) -> None:
+		module = importlib.import_module("mctutil.transport.s3upload")
+		module.upload_sharded_tree(
+			source_folder=self.plan.staged,
+			target_folder=self.key,
+			bucket_name=self.bucket,
+			jobs=self.options["upload_jobs"],
+			include_mip0=True,
+			execute=True,
+			aws_profile=self.options["aws_profile"],
+			mips=(mip,),
+			include_root=False,
+		)
+
+	def close(self) -> None:
+		"""Wait for queued scale uploads; failures defer to the upload stage."""
+		self._executor.shutdown(wait=True)
+		for mip, future in sorted(self._futures.items()):
+			error = future.exception()
+			if error is not None:
+				log.write(
+					"Publish",
+					f"{self.plan.dataset.name}: early upload of MIP {mip} failed ({error}); "
+					"the upload stage will retry it.",
+					log_level=LOG.WARN,
+				)
+
+
 def run_stage(stage: str, plan: DatasetPlan, options: dict) -> None:
 	queue_root = plan.precomputed / ".mctutil-queues"
 	encoding = (
@@ -705,22 +762,28 @@ def run_stage(stage: str, plan: DatasetPlan, options: dict) -> None:
 		if resources is None:
 			raise ValueError(f"shard resource metadata is missing: {plan.precomputed}")
 		module = importlib.import_module("mctutil.ng.shard")
-		module.shard.callback(
-			source=str(plan.precomputed),
-			destination=str(plan.staged),
-			mips=None,
-			low_chunk=(96, 96, 96),
-			mid_chunk=(64, 64, 64),
-			high_chunk=(16, 16, 16),
-			capacity_override=resources.shard_ceiling,
-			parallel=resources.shard_workers,
-			include_mip0=options["stage_include_mip0"],
-			encoding=encoding,
-			queue_dir=queue_root,
-			lease_seconds=3600,
-			release_leases=options["release_queue_leases"],
-			execute=True,
-		)
+		uploader = ScaleUploader(plan, options) if upload_during_shard(options) else None
+		try:
+			module.shard.callback(
+				source=str(plan.precomputed),
+				destination=str(plan.staged),
+				mips=None,
+				low_chunk=(96, 96, 96),
+				mid_chunk=(64, 64, 64),
+				high_chunk=(16, 16, 16),
+				capacity_override=resources.shard_ceiling,
+				parallel=resources.shard_workers,
+				include_mip0=options["stage_include_mip0"],
+				encoding=encoding,
+				queue_dir=queue_root,
+				lease_seconds=3600,
+				release_leases=options["release_queue_leases"],
+				execute=True,
+				on_scale_complete=uploader,
+			)
+		finally:
+			if uploader is not None:
+				uploader.close()
 	elif stage == "upload":
 		module = importlib.import_module("mctutil.transport.s3upload")
 		bucket, key = dataset_s3_target(plan, options["s3_prefix"])
@@ -732,6 +795,7 @@ def run_stage(stage: str, plan: DatasetPlan, options: dict) -> None:
 			include_mip0=options["upload_include_mip0"],
 			execute=True,
 			aws_profile=options["aws_profile"],
+			verify_remote=options["upload_verify_remote"],
 		)
 	elif stage == "mesh":
 		module = importlib.import_module("mctutil.shared.mesh")
@@ -817,117 +881,327 @@ def print_publish_plan(
 	)
 
 
-def publish_datasets(
-	plans: tuple[DatasetPlan, ...],
+@dataclass(frozen=True)
+class StageDemand:
+	"""Resource-class claims a running stage holds against the publish budget."""
+
+	cpu: int = 0
+	memory: int = 0
+	network: int = 0
+
+	def __add__(self, other: StageDemand) -> StageDemand:
+		return StageDemand(
+			self.cpu + other.cpu,
+			self.memory + other.memory,
+			self.network + other.network,
+		)
+
+	def __sub__(self, other: StageDemand) -> StageDemand:
+		return StageDemand(
+			self.cpu - other.cpu,
+			self.memory - other.memory,
+			self.network - other.network,
+		)
+
+
+def precompute_staging_demand(plan: DatasetPlan, options: dict) -> int:
+	"""Return the shared memory precompute will stage for ``plan``, within its budget."""
+	path = resolved_precompute_input(plan, options)
+	if path is None or not path.is_file():
+		return 0
+	precompute = importlib.import_module("mctutil.ng.precompute")
+	try:
+		staged = precompute.staging_bytes(precompute.discover_input(path), options["workers"])
+	except Exception:
+		# An unreadable input fails in the stage itself, with its own error.
+		return 0
+	if options["memory_capacity"]:
+		staged = min(staged, staging_memory_budget(options["memory_capacity"]))
+	return staged
+
+
+def stage_demand(stage: str, plan: DatasetPlan, options: dict) -> StageDemand:
+	"""Return the CPU, memory, and network share one stage occupies.
+
+	Precompute claims its shared-memory staging; downsample and shard claim
+	the memory ``plan_resources`` sizes their workers for; upload and S3
+	meshing each claim a network slot.
+	"""
+	network = int(
+		stage == "upload"
+		or (stage == "mesh" and mesh_target(plan, options).startswith("precomputed://s3://"))
+	)
+	if stage == "upload":
+		return StageDemand(network=network)
+	if stage == "prep":
+		return StageDemand(cpu=1)
+	if stage == "mesh":
+		return StageDemand(cpu=options["mesh_parallel"], network=network)
+	if stage == "precompute":
+		return StageDemand(cpu=options["workers"], memory=precompute_staging_demand(plan, options))
+	if stage not in {"downsample", "shard"}:
+		return StageDemand(cpu=options["workers"])
+	mips = (0, 3, 5) if stage == "downsample" else None
+	resources = dataset_resources(plan, options, mips=mips)
+	if resources is None:
+		return StageDemand(cpu=options["workers"], memory=options["memory_capacity"])
+	if stage == "downsample":
+		workers, limit = resources.downsample_workers, resources.downsample_memory_limit
+	else:
+		workers, limit = resources.shard_workers, resources.shard_memory_limit
+	return StageDemand(cpu=workers, memory=resources.memory_reserve + limit)
+
+
+class ResourceBudget:
+	"""Admit stages while their combined demand fits every resource class.
+
+	Demands are clamped to the budget so any stage can run on its own, and a
+	zero memory capacity (no memory-planned stage selected) is unlimited.
+	"""
+
+	def __init__(self, cpu: int, memory: int, network: int = NETWORK_STAGE_SLOTS):
+		self.capacity = StageDemand(max(1, cpu), max(0, memory), max(1, network))
+		self.used = StageDemand()
+
+	def clamp(self, demand: StageDemand) -> StageDemand:
+		return StageDemand(
+			min(demand.cpu, self.capacity.cpu),
+			min(demand.memory, self.capacity.memory),
+			min(demand.network, self.capacity.network),
+		)
+
+	def fits(self, demand: StageDemand) -> bool:
+		total = self.used + demand
+		return (
+			total.cpu <= self.capacity.cpu
+			and total.memory <= self.capacity.memory
+			and total.network <= self.capacity.network
+		)
+
+	def acquire(self, demand: StageDemand) -> None:
+		self.used = self.used + demand
+
+	def release(self, demand: StageDemand) -> None:
+		self.used = self.used - demand
+
+
+def log_dataset_plan(
+	plan: DatasetPlan,
+	state: dict,
 	selected_stages: tuple[str, ...],
 	options: dict,
 	execute: bool,
-	resource_monitor: PublishResourceMonitor | None = None,
 ) -> None:
-	for plan in plans:
-		state = load_dataset_state(plan)
-		log.write(
-			"Publish Plan",
-			f"Dataset: {plan.dataset.name} ({plan.layer_type})",
-			log_level=LOG.INFO,
-		)
-		log.write(
+	log.write(
+		"Publish Plan",
+		f"Dataset: {plan.dataset.name} ({plan.layer_type})",
+		log_level=LOG.INFO,
+	)
+	log.write(
+		"Publish Plan",
+		f"State: {plan.state_path}",
+		log_level=LOG.DEBUG,
+	)
+	if not execute and {"downsample", "shard"} & set(selected_stages):
+		resources = dataset_resources(plan, options)
+		log_resource_plan(
 			"Publish Plan",
-			f"State: {plan.state_path}",
-			log_level=LOG.DEBUG,
+			resources,
+			include_shards="shard" in selected_stages,
 		)
-		if not execute and {"downsample", "shard"} & set(selected_stages):
-			resources = dataset_resources(plan, options)
-			log_resource_plan(
-				"Publish Plan",
-				resources,
-				include_shards="shard" in selected_stages,
-			)
-		for stage in STAGES:
-			if stage not in selected_stages:
-				log.write(
-					"Publish Plan",
-					f"{stage}: not-run (outside selected range)",
-					log_level=LOG.INFO,
-				)
-				continue
-			decision, reason = stage_decision(
-				stage,
-				plan,
-				state,
-				options,
-			)
-			suffix = f" — {reason}" if reason else ""
+	for stage in STAGES:
+		if stage not in selected_stages:
 			log.write(
 				"Publish Plan",
-				f"{stage}: {decision}{suffix}",
+				f"{stage}: not-run (outside selected range)",
 				log_level=LOG.INFO,
 			)
-
-		if not execute:
 			continue
-		state["requested_stages"] = list(selected_stages)
-		state["updated_at"] = utc_now()
-		write_state(plan.state_path, state)
-		for stage in selected_stages:
-			decision, reason = stage_decision(stage, plan, state, options)
-			configuration = stage_configuration(stage, plan, options)
-			if decision == "omitted":
-				state["stages"][stage] = {
-					"status": "omitted",
-					"reason": reason,
-					"configuration": configuration,
-					"updated_at": utc_now(),
-				}
-				write_state(plan.state_path, state)
-				continue
-			if decision == "complete":
-				record = state["stages"].get(stage, {})
-				if (
-					record.get("status") != "complete"
-					or record.get("configuration") != configuration
-				):
-					state["stages"][stage] = {
-						"status": "complete",
-						"configuration": configuration,
-						"validated_at": utc_now(),
-					}
-					state["updated_at"] = utc_now()
-					write_state(plan.state_path, state)
-				continue
-			prediction = (
-				None
-				if resource_monitor is None
-				else stage_resource_prediction(stage, plan, options)
-			)
-			resource_context = (
-				nullcontext()
-				if resource_monitor is None
-				else resource_monitor.stage(
-					stage,
-					prediction,
-					dataset=plan.dataset.name,
-				)
-			)
-			with resource_context:
-				log.write(
-					"Publish",
-					f"Running {stage} for {plan.dataset.name}.",
-					log_level=LOG.STATUS,
-				)
-				run_stage(stage, plan, options)
-			state["stages"][stage] = {
+		decision, reason = stage_decision(
+			stage,
+			plan,
+			state,
+			options,
+		)
+		suffix = f" — {reason}" if reason else ""
+		log.write(
+			"Publish Plan",
+			f"{stage}: {decision}{suffix}",
+			log_level=LOG.INFO,
+		)
+
+
+def record_stage(plan: DatasetPlan, state: dict, stage: str, record: dict) -> None:
+	state["stages"][stage] = record
+	state["updated_at"] = utc_now()
+	write_state(plan.state_path, state)
+
+
+def next_pending_stage(
+	plan: DatasetPlan,
+	state: dict,
+	stages: list[str],
+	options: dict,
+) -> str | None:
+	"""Record omitted and already-complete stages; return the next to run.
+
+	Decisions are made only once the previous stage of the same dataset has
+	finished, so each sees the artifacts its predecessor wrote.
+	"""
+	while stages:
+		stage = stages[0]
+		decision, reason = stage_decision(stage, plan, state, options)
+		configuration = stage_configuration(stage, plan, options)
+		if decision == "pending":
+			return stage
+		stages.pop(0)
+		record = state["stages"].get(stage, {})
+		if decision == "omitted":
+			record_stage(plan, state, stage, {
+				"status": "omitted",
+				"reason": reason,
+				"configuration": configuration,
+				"updated_at": utc_now(),
+			})
+		elif (
+			record.get("status") != "complete"
+			or record.get("configuration") != configuration
+		):
+			record_stage(plan, state, stage, {
 				"status": "complete",
 				"configuration": configuration,
-				"completed_at": utc_now(),
-			}
-			state["updated_at"] = utc_now()
-			write_state(plan.state_path, state)
+				"validated_at": utc_now(),
+			})
+	log.write(
+		"Publish",
+		f"Completed selected stages for {plan.dataset.name}.",
+		log_level=LOG.STATUS,
+	)
+	return None
+
+
+def execute_stage(
+	stage: str,
+	plan: DatasetPlan,
+	options: dict,
+	resource_monitor: PublishResourceMonitor | None,
+) -> None:
+	prediction = (
+		None
+		if resource_monitor is None
+		else stage_resource_prediction(stage, plan, options)
+	)
+	resource_context = (
+		nullcontext()
+		if resource_monitor is None
+		else resource_monitor.stage(
+			stage,
+			prediction,
+			dataset=plan.dataset.name,
+		)
+	)
+	with resource_context:
 		log.write(
 			"Publish",
-			f"Completed selected stages for {plan.dataset.name}.",
+			f"Running {stage} for {plan.dataset.name}.",
 			log_level=LOG.STATUS,
 		)
+		run_stage(stage, plan, options)
+
+
+def _start_ready_stages(
+	executor: ThreadPoolExecutor,
+	ready: list,
+	running: dict,
+	budget: ResourceBudget,
+	options: dict,
+	resource_monitor: PublishResourceMonitor | None,
+) -> None:
+	for entry in list(ready):
+		_index, plan, _state, stages = entry
+		demand = budget.clamp(stage_demand(stages[0], plan, options))
+		if not budget.fits(demand):
+			continue
+		budget.acquire(demand)
+		ready.remove(entry)
+		configuration = stage_configuration(stages[0], plan, options)
+		future = executor.submit(execute_stage, stages[0], plan, options, resource_monitor)
+		running[future] = (entry, demand, configuration)
+
+
+def _finish_stage(entry: tuple, configuration: dict, options: dict, ready: list) -> None:
+	_index, plan, state, stages = entry
+	record_stage(plan, state, stages.pop(0), {
+		"status": "complete",
+		"configuration": configuration,
+		"completed_at": utc_now(),
+	})
+	if next_pending_stage(plan, state, stages, options) is not None:
+		ready.append(entry)
+		# Earlier datasets keep priority for the resources they wait on.
+		ready.sort(key=lambda waiting: waiting[0])
+
+
+def run_stage_graph(
+	datasets: list[tuple[DatasetPlan, dict]],
+	selected_stages: tuple[str, ...],
+	options: dict,
+	resource_monitor: PublishResourceMonitor | None = None,
+) -> None:
+	"""Run every dataset's stage chain, overlapping datasets within the budget.
+
+	Each dataset's stages stay in order. A ready stage starts as soon as its
+	CPU, memory, and network demand fits beside the running stages, with
+	earlier datasets first. Stages run on threads, so precompute, downsample,
+	and shard spawn their worker processes instead of forking beside another
+	stage's threads. After a failure no new stages start; running ones finish
+	and record their state before the first error is raised.
+	"""
+	budget = ResourceBudget(options["cpu_count"], options["memory_capacity"])
+	ready = []
+	for index, (plan, state) in enumerate(datasets):
+		stages = list(selected_stages)
+		if next_pending_stage(plan, state, stages, options) is not None:
+			ready.append((index, plan, state, stages))
+	running = {}
+	failure = None
+	with ThreadPoolExecutor(max_workers=max(1, len(datasets))) as executor:
+		while running or (ready and failure is None):
+			if failure is None:
+				_start_ready_stages(executor, ready, running, budget, options, resource_monitor)
+			done, _pending = wait(running, return_when=FIRST_COMPLETED)
+			for future in done:
+				entry, demand, configuration = running.pop(future)
+				budget.release(demand)
+				try:
+					future.result()
+				except Exception as exc:
+					failure = failure or exc
+					continue
+				_finish_stage(entry, configuration, options, ready)
+	if failure is not None:
+		raise failure
+
+
+def publish_datasets(
+	plans: tuple[DatasetPlan, ...],
+	selected_stages: tuple[str, ...],
+	options: dict,
+	execute: bool,
+	resource_monitor: PublishResourceMonitor | None = None,
+) -> None:
+	datasets = []
+	for plan in plans:
+		state = load_dataset_state(plan)
+		log_dataset_plan(plan, state, selected_stages, options, execute)
+		datasets.append((plan, state))
+	if not execute:
+		return
+	for plan, state in datasets:
+		state["requested_stages"] = list(selected_stages)
+		state["updated_at"] = utc_now()
+		write_state(plan.state_path, state)
+	run_stage_graph(datasets, selected_stages, options, resource_monitor)
 
 
 def execute_publish(
@@ -1002,6 +1276,11 @@ def execute_publish(
 	help="Release existing Igneous FileQueue leases when resuming.",
 )
 @click.option("--upload-jobs", type=click.IntRange(min=1), default=6, show_default=True)
+@click.option(
+	"--upload-verify-remote",
+	is_flag=True,
+	help="Check every uploaded object against S3 instead of the local sync manifest.",
+)
 @click.option("--mesh-parallel", type=click.IntRange(min=1), default=16, show_default=True)
 @click.option("--mesh-mip", type=click.IntRange(min=0), default=0, show_default=True)
 @click.option("--mesh-num-lod", type=click.IntRange(min=0), default=4, show_default=True)
@@ -1058,6 +1337,7 @@ def publish(  # noqa: C901
 	shard_capacity: str | None,
 	release_queue_leases: bool,
 	upload_jobs: int,
+	upload_verify_remote: bool,
 	mesh_parallel: int,
 	mesh_mip: int,
 	mesh_num_lod: int,
@@ -1140,6 +1420,7 @@ def publish(  # noqa: C901
 			"cpu_count": cpu_count,
 			"release_queue_leases": release_queue_leases,
 			"upload_jobs": upload_jobs,
+			"upload_verify_remote": upload_verify_remote,
 			"mesh_parallel": mesh_parallel,
 			"mesh_mip": mesh_mip,
 			"mesh_num_lod": mesh_num_lod,
@@ -0,0 +1,188 @@
+"""Direct chunk-file writer for raw-encoded local precomputed volumes."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import gzip
+import itertools
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from mctutil.shared.cloudpaths import local_layer_path
+from mctutil.shared.deps import require
+
+
+CHUNK_COMPRESSIONS = ("none", "gzip", "zstd")
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zstd"}
+
+
+@dataclass(frozen=True)
+class RawScale:
+	"""One raw-encoded scale of a local precomputed layer."""
+
+	path: Path
+	dtype: np.dtype
+	num_channels: int
+	voxel_offset: tuple[int, int, int]
+	size: tuple[int, int, int]
+	chunk_size: tuple[int, int, int]
+
+	@classmethod
+	def from_info(cls, root: Path, info: dict, mip: int = 0) -> RawScale:
+		scale = info["scales"][mip]
+		if scale["encoding"] != "raw":
+			raise ValueError(
+				f"native chunk writes require raw encoding, got {scale['encoding']}"
+			)
+		chunk_sizes = scale["chunk_sizes"]
+		if len(chunk_sizes) != 1:
+			raise ValueError(f"expected one chunk size per scale, got {chunk_sizes}")
+		return cls(
+			path=root / str(scale["key"]),
+			dtype=np.dtype(info["data_type"]),
+			num_channels=int(info.get("num_channels", 1)),
+			voxel_offset=tuple(int(value) for value in scale["voxel_offset"]),
+			size=tuple(int(value) for value in scale["size"]),
+			chunk_size=tuple(int(value) for value in chunk_sizes[0]),
+		)
+
+	@property
+	def stop(self) -> tuple[int, int, int]:
+		return tuple(offset + size for offset, size in zip(self.voxel_offset, self.size))
+
+
+def _compressor(compression: str, level: int | None):
+	if compression == "none":
+		if level is not None:
+			raise ValueError("a compression level requires gzip or zstd chunk compression")
+		return None
+	if compression == "gzip":
+		level = 9 if level is None else level
+		return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+	if compression == "zstd":
+		zstandard = require(
+			"zstandard",
+			"ng",
+			purpose="zstd chunk compression requires zstandard",
+		)
+		options = {} if level is None else {"level": level}
+		return zstandard.ZstdCompressor(**options).compress
+	raise ValueError(
+		f"chunk compression must be one of {', '.join(CHUNK_COMPRESSIONS)}; got {compression}"
+	)
+
+
+class RawChunkWriter:
+	"""Write chunk-aligned XYZC blocks as ``x0-x1_y0-y1_z0-z1`` files.
+
+	Slice assignment mirrors ``CloudVolume.__setitem__`` for the aligned,
+	bounded writes ``ng precompute`` issues, so workers can swap one for the
+	other. Each chunk is serialized with one Fortran-order copy and written
+	with one ``write`` call; stale chunk files with a different compression
+	suffix are removed so readers never see two encodings of one chunk.
+	"""
+
+	def __init__(
+		self,
+		layer_path: str | Path,
+		info: dict | None = None,
+		*,
+		mip: int = 0,
+		compression: str = "none",
+		level: int | None = None,
+	):
+		root = local_layer_path(layer_path)
+		if root is None:
+			raise ValueError(f"native chunk writes require a local layer: {layer_path}")
+		if info is None:
+			info = json.loads((root / "info").read_text(encoding="utf-8"))
+		self.scale = RawScale.from_info(root, info, mip)
+		self.compression = compression
+		self._compress = _compressor(compression, level)
+		self._suffix = COMPRESSION_SUFFIXES[compression]
+		self._stale_suffixes = tuple(
+			suffix for suffix in COMPRESSION_SUFFIXES.values() if suffix != self._suffix
+		)
+		self.scale.path.mkdir(parents=True, exist_ok=True)
+
+	def __setitem__(self, key, block) -> None:
+		if not isinstance(key, tuple) or len(key) != 4:
+			raise ValueError("native chunk writes take an (x, y, z, channel) slice key")
+		origin = []
+		for axis, item in enumerate(key[:3]):
+			if not isinstance(item, slice) or item.step not in (None, 1):
+				raise ValueError(f"axis {axis} needs a unit-step slice, got {item!r}")
+			origin.append(self.scale.voxel_offset[axis] if item.start is None else item.start)
+		self.write(tuple(origin), block)
+
+	def write(self, origin: tuple[int, int, int], block) -> int:
+		"""Write an XYZ or XYZC block at global voxel ``origin``; return chunk count."""
+		block = np.asarray(block)
+		if block.ndim == 3:
+			block = block[:, :, :, np.newaxis]
+		if block.ndim != 4 or block.shape[3] != self.scale.num_channels:
+			raise ValueError(
+				f"expected an XYZ block with {self.scale.num_channels} channel(s), got {block.shape}"
+			)
+		if block.dtype != self.scale.dtype:
+			raise ValueError(f"expected {self.scale.dtype} data, got {block.dtype}")
+		stop = tuple(start + length for start, length in zip(origin, block.shape[:3]))
+		self._check_alignment(origin, stop)
+
+		written = 0
+		starts = [
+			range(start, end, chunk)
+			for start, end, chunk in zip(origin, stop, self.scale.chunk_size)
+		]
+		for z0, y0, x0 in itertools.product(starts[2], starts[1], starts[0]):
+			chunk_start = (x0, y0, z0)
+			chunk_stop = tuple(
+				min(start + chunk, end)
+				for start, chunk, end in zip(chunk_start, self.scale.chunk_size, stop)
+			)
+			local = tuple(
+				slice(start - base, end - base)
+				for start, end, base in zip(chunk_start, chunk_stop, origin)
+			)
+			# C order of the reversed axes is the chunk's Fortran byte order, and
+			# NumPy copies it far faster than ``tobytes(order="F")`` on a strided view.
+			self._write_chunk(chunk_start, chunk_stop, np.ascontiguousarray(block[local].T))
+			written += 1
+		return written
+
+	def _check_alignment(self, origin, stop) -> None:
+		for axis, (start, end) in enumerate(zip(origin, stop)):
+			offset = self.scale.voxel_offset[axis]
+			bound = self.scale.stop[axis]
+			chunk = self.scale.chunk_size[axis]
+			if start < offset or end > bound or end <= start:
+				raise ValueError(
+					f"axis {axis} write [{start}, {end}) is outside bounds [{offset}, {bound})"
+				)
+			if (start - offset) % chunk or (end != bound and (end - offset) % chunk):
+				raise ValueError(
+					f"axis {axis} write [{start}, {end}) is not aligned to {chunk}-voxel chunks "
+					f"starting at {offset}"
+				)
+
+	def _write_chunk(self, start, stop, chunk: np.ndarray) -> None:
+		name = "_".join(f"{low}-{high}" for low, high in zip(start, stop))
+		data = memoryview(chunk).cast("B")
+		if self._compress is not None:
+			data = self._compress(data)
+		path = self.scale.path / f"{name}{self._suffix}"
+		# Readers and completeness checks never see a partly written chunk:
+		# the bytes land under a per-process name and replace the chunk whole.
+		partial = path.with_name(f".{path.name}.{os.getpid()}.partial")
+		try:
+			with open(partial, "wb") as handle:
+				handle.write(data)
+			os.replace(partial, path)
+		except BaseException:
+			partial.unlink(missing_ok=True)
+			raise
+		for suffix in self._stale_suffixes:
+			path.with_name(f"{name}{suffix}").unlink(missing_ok=True)
@@ -2,22 +2,28 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from decimal import Decimal
+import json
 from math import prod
 import os
 from pathlib import Path
 import re
+import time
 
 import numpy as np
 import psutil
 
 from mctutil.shared.log import log, LOG
+from mctutil.shared.resource_monitor import MemoryPressure
 
 
 GIB = 1024 ** 3
 TIB = 1024 ** 4
 MAX_MEMORY_RESERVE = 24 * GIB
+STAGING_MEMORY_FRACTION = 0.5
+SETTLED_WORKERS_NAME = ".mctutil-settled-workers.json"
 
 LOW_CHUNK = (96, 96, 96)
 MID_CHUNK = (64, 64, 64)
@@ -116,6 +122,38 @@ def calculate_memory_reserve(memory_capacity: int) -> int:
 	return min(MAX_MEMORY_RESERVE, max(0, int(memory_capacity)) // 4)
 
 
+def staging_memory_budget(
+	memory_capacity: int | None = None,
+	pressure: MemoryPressure | None = None,
+) -> int:
+	"""Return the bytes precompute may stage in shared memory.
+
+	Staging may hold half of the effective RAM left after the reserve; the
+	other half is left to the workers encoding chunks. With a live workload
+	sample, the budget is also capped at half of the sample's headroom, so
+	stages running alongside are counted.
+	"""
+	if memory_capacity is None:
+		memory_capacity, _ = system_resources()
+	budget = int((memory_capacity - calculate_memory_reserve(memory_capacity)) * STAGING_MEMORY_FRACTION)
+	if pressure is not None and pressure.limit:
+		budget = min(budget, int(max(0, pressure.limit - pressure.current) * STAGING_MEMORY_FRACTION))
+	return max(0, budget)
+
+
+def fit_staging(unit_bytes: int, batch_size: int, slots: int, budget: int) -> tuple[int, int]:
+	"""Shrink staging slots, then the batch size, until ``slots x batch x unit`` fits ``budget``.
+
+	At least one slot of one unit is always kept, so a budget smaller than
+	one unit still stages one slab at a time.
+	"""
+	unit_bytes = max(1, int(unit_bytes))
+	slots = max(1, min(slots, budget // (batch_size * unit_bytes)))
+	if slots * batch_size * unit_bytes > budget:
+		batch_size = max(1, min(batch_size, budget // unit_bytes))
+	return batch_size, slots
+
+
 def _shard_plan(
 	info: dict,
 	mips: tuple[int, ...],
@@ -275,3 +313,76 @@ def log_resource_plan(
 		)
 	if plan.warning is not None:
 		log.write(label, f"Warning: {plan.warning}", log_level=LOG.WARN)
+
+
+@dataclass
+class ConcurrencyController:
+	"""Steer an in-flight task limit from live workload memory samples.
+
+	Above ``high_water`` of the workload limit the task limit shrinks in
+	proportion to the overshoot; below ``low_water`` it grows by one task.
+	Samples are taken at most once per ``interval`` seconds, and a missing
+	sample leaves the limit unchanged.
+	"""
+
+	maximum: int
+	limit: int
+	sample: Callable[[], MemoryPressure | None]
+	high_water: float = 0.85
+	low_water: float = 0.65
+	interval: float = 1.0
+	clock: Callable[[], float] = time.monotonic
+	_next_sample: float = field(default=float("-inf"), repr=False)
+
+	def __post_init__(self):
+		if not 0.0 < self.low_water < self.high_water <= 1.0:
+			raise ValueError("memory watermarks must satisfy 0 < low < high <= 1")
+		self.maximum = max(1, self.maximum)
+		self.limit = min(max(1, self.limit), self.maximum)
+
+	def update(self) -> int:
+		"""Return the current limit, adjusting it when a new sample is due."""
+		now = self.clock()
+		if now < self._next_sample:
+			return self.limit
+		self._next_sample = now + self.interval
+		pressure = self.sample()
+		fraction = None if pressure is None else pressure.fraction
+		if fraction is None:
+			return self.limit
+		previous = self.limit
+		if fraction >= self.high_water:
+			scaled = int(self.limit * self.high_water / fraction)
+			self.limit = max(1, min(self.limit - 1, scaled))
+		elif fraction < self.low_water:
+			self.limit = min(self.maximum, self.limit + 1)
+		if self.limit != previous:
+			log.write(
+				"Concurrency",
+				(
+					f"Workload memory at {fraction:.0%} of "
+					f"{format_size(pressure.limit)}; in-flight tasks "
+					f"{previous} -> {self.limit}."
+				),
+				log_level=LOG.INFO,
+			)
+		return self.limit
+
+
+def load_settled_workers(directory: Path) -> int | None:
+	"""Return the concurrency a previous run settled on, if it recorded one."""
+	try:
+		value = json.loads((directory / SETTLED_WORKERS_NAME).read_text(encoding="utf-8"))
+		workers = int(value["workers"])
+	except (FileNotFoundError, OSError, ValueError, KeyError, TypeError):
+		return None
+	return workers if workers > 0 else None
+
+
+def store_settled_workers(directory: Path, workers: int) -> None:
+	"""Record the concurrency a run settled on for the next run to start at."""
+	directory.mkdir(parents=True, exist_ok=True)
+	(directory / SETTLED_WORKERS_NAME).write_text(
+		json.dumps({"workers": int(workers)}) + "\n",
+		encoding="utf-8",
+	)
@@ -191,6 +191,65 @@ def shard_configuration(
 	}
 
 
+def _shard_all_pending(stage_root, state_path, state, configuration, shards, scale_tasks, queue_options) -> None:
+	"""Shard every pending scale through one combined queue."""
+	pending = tuple(shard[0] for shard in shards)
+	task_fingerprint = stable_fingerprint(
+		{
+			"configuration": configuration,
+			"attempt": state.get("attempt", 0),
+			"pending": pending,
+		}
+	)
+	expected_existing = state.get("attempt_started", False)
+	if not expected_existing:
+		state["attempt_started"] = True
+		write_state(state_path, state)
+	run_persistent_tasks(
+		stage_root / f"tasks-{state.get('attempt', 0)}",
+		task_fingerprint,
+		lambda: scale_tasks(shards),
+		expected_existing=expected_existing,
+		progress_label="Shard Tasks",
+		**queue_options,
+	)
+	state["completed_mips"] = sorted(set(state["completed_mips"]) | set(pending))
+
+
+def _shard_each_pending(
+	stage_root,
+	state_path,
+	state,
+	configuration,
+	shards,
+	scale_tasks,
+	queue_options,
+	on_scale_complete,
+) -> None:
+	"""Shard pending scales one queue at a time, reporting each as it completes."""
+	attempt = state.get("attempt", 0)
+	for scale_plan in shards:
+		mip = scale_plan[0]
+		started = set(state.get("started_mips", []))
+		expected_existing = mip in started
+		if not expected_existing:
+			state["started_mips"] = sorted(started | {mip})
+			write_state(state_path, state)
+		run_persistent_tasks(
+			stage_root / f"tasks-{attempt}-mip{mip}",
+			stable_fingerprint(
+				{"configuration": configuration, "attempt": attempt, "mip": mip}
+			),
+			lambda scale_plan=scale_plan: scale_tasks((scale_plan,)),
+			expected_existing=expected_existing,
+			progress_label=f"Shard MIP {mip}",
+			**queue_options,
+		)
+		state["completed_mips"] = sorted(set(state["completed_mips"]) | {mip})
+		write_state(state_path, state)
+		on_scale_complete(mip)
+
+
 def shard_volume(
 	source: str,
 	destination: str,
@@ -200,7 +259,23 @@ def shard_volume(
 	parallel: int,
 	lease_seconds: int,
 	release_leases: bool = True,
+	on_scale_complete=None,
+	lease_batch: int | None = None,
 ) -> None:
+	"""Shard every pending scale through durable queues.
+
+	Without ``on_scale_complete`` all pending scales share one queue, so
+	workers never idle at a scale boundary. With it, each scale gets its own
+	queue in ascending MIP order; as each finishes it is recorded in the
+	pipeline state and ``on_scale_complete(mip)`` is called, so a consumer
+	such as an uploader can start on it while later scales are still sharding.
+	"""
+	queue_options = {
+		"parallel": parallel,
+		"lease_seconds": lease_seconds,
+		"release_leases": release_leases,
+		"lease_batch": lease_batch,
+	}
 	mips = tuple(shard[0] for shard in resources.shards)
 	configuration = shard_configuration(source, destination, resources, encoding)
 	fingerprint = stable_fingerprint(configuration)
@@ -234,6 +309,7 @@ def shard_volume(
 	if state["complete"]:
 		state["attempt"] = state.get("attempt", 0) + 1
 		state["attempt_started"] = False
+		state["started_mips"] = []
 		state["completed_mips"] = sorted(verified_completed)
 		state["complete"] = False
 		write_state(state_path, state)
@@ -248,37 +324,17 @@ def shard_volume(
 		write_state(state_path, state)
 		return
 
-	task_fingerprint = stable_fingerprint(
-		{
-			"configuration": configuration,
-			"attempt": state.get("attempt", 0),
-			"pending": pending,
-		}
-	)
-	expected_existing = state.get("attempt_started", False)
-	if not expected_existing:
-		state["attempt_started"] = True
-		write_state(state_path, state)
-	run_persistent_tasks(
-		stage_root / f"tasks-{state.get('attempt', 0)}",
-		task_fingerprint,
-		lambda: all_shard_tasks(
-			source,
-			destination,
-			tuple(
-				shard
-				for shard in resources.shards
-				if shard[0] in pending
-			),
-			encoding,
-		),
-		parallel,
-		lease_seconds,
-		release_leases=release_leases,
-		expected_existing=expected_existing,
-		progress_label="Shard Tasks",
-	)
-	state["completed_mips"] = sorted(set(state["completed_mips"]) | set(pending))
+	shards = tuple(shard for shard in resources.shards if shard[0] in pending)
+
+	def scale_tasks(selected):
+		return all_shard_tasks(source, destination, selected, encoding)
+
+	if on_scale_complete is None:
+		_shard_all_pending(stage_root, state_path, state, configuration, shards, scale_tasks, queue_options)
+	else:
+		_shard_each_pending(
+			stage_root, state_path, state, configuration, shards, scale_tasks, queue_options, on_scale_complete
+		)
 	state["complete"] = True
 	write_state(state_path, state)
 
@@ -337,6 +393,11 @@ def shard_volume(
 )
 @click.option("--queue", "queue_dir", type=click.Path(path_type=Path))
 @click.option("--lease-seconds", type=click.IntRange(min=10), default=3600, show_default=True)
+@click.option(
+	"--lease-batch",
+	type=click.IntRange(min=1),
+	help="Tasks each worker leases and acknowledges at once; sized from the queue by default.",
+)
 @click.option(
 	"--release-leases/--preserve-leases",
 	default=True,
@@ -360,6 +421,8 @@ def shard(
 	lease_seconds: int,
 	release_leases: bool,
 	execute: bool,
+	on_scale_complete=None,
+	lease_batch: int | None = None,
 ) -> None:
 	"""Stage a precomputed pyramid into sharded Neuroglancer scales."""
 	try:
@@ -407,6 +470,8 @@ def shard(
 			resources.shard_workers,
 			lease_seconds,
 			release_leases,
+			on_scale_complete,
+			lease_batch,
 		)
 		log.write("Shard", "Staging complete.", log_level=LOG.STATUS)
 	except click.ClickException:
@@ -18,6 +18,7 @@ EXTRA_MODULES: dict[str, tuple[str, ...]] = {
 		"neuroglancer_scripts",
 		"tifffile",
 		"zarr",
+		"zstandard",
 	),
 	"serve": (
 		"flask",
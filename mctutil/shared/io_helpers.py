@@ -1,7 +1,9 @@
-from collections import namedtuple
+import os
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from multiprocessing import Pool, shared_memory
+from multiprocessing import get_context, shared_memory
 from os import PathLike
 from typing import Iterable
 
@@ -9,25 +11,92 @@ import numpy as np
 from numpy.typing import ArrayLike
 from psutil import cpu_count
 
+from mctutil.shared.deps import require
 from mctutil.shared.mem import SharedNP
 
 FlatPair = namedtuple("FlatPair", ["Index", "Offset"])
 
+READER_OPEN_FILES = 64
+READER_ATTACHMENTS = 2
+try:
+	IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, OSError, ValueError):
+	IOV_MAX = 1024
+IOV_MAX = IOV_MAX if IOV_MAX > 0 else 1024
+
+_READER_FILES: OrderedDict = OrderedDict()
+_READER_TIFFS: OrderedDict = OrderedDict()
+_READER_MEMORY: OrderedDict = OrderedDict()
+_READER_OPEN_FILES = READER_OPEN_FILES
+
 
 @dataclass(frozen=True)
 class RawOffsetRead:
-	"""One raw byte span copied from a file into shared memory."""
+	"""One raw byte span copied from a file into shared memory.
+
+	A non-zero ``swap`` is the item size of samples stored in the opposite
+	byte order; they are byte-swapped in place once the span has landed.
+	"""
 
 	source: PathLike
 	source_offset: int
 	target_offset: int
 	size: int
+	swap: int = 0
+
+	def __post_init__(self):
+		for name in ("source_offset", "target_offset", "size", "swap"):
+			value = getattr(self, name)
+			if value < 0:
+				raise ValueError(f"{name} must be non-negative, got {value}")
+		if self.swap and self.size % self.swap:
+			raise ValueError(f"size {self.size} is not a whole number of {self.swap}-byte samples")
+
+
+@dataclass(frozen=True)
+class DecodeRead:
+	"""Rows of one TIFF page decoded into shared memory, one row every ``target_stride`` bytes.
+
+	``chunk_rows`` is the page's strip or tile height; pools only split a
+	read on those boundaries so no segment is decoded twice.
+	"""
+
+	source: PathLike
+	page: int
+	row_start: int
+	row_stop: int
+	target_offset: int
+	target_stride: int
+	chunk_rows: int = 1
 
 	def __post_init__(self):
-		for name in ("source_offset", "target_offset", "size"):
+		for name in ("page", "row_start", "target_offset", "target_stride"):
 			value = getattr(self, name)
 			if value < 0:
 				raise ValueError(f"{name} must be non-negative, got {value}")
+		if self.row_stop < self.row_start:
+			raise ValueError(f"row_stop must not precede row_start, got {self.row_start}:{self.row_stop}")
+		if self.chunk_rows < 1:
+			raise ValueError(f"chunk_rows must be positive, got {self.chunk_rows}")
+
+	def split(self, pieces: int) -> tuple["DecodeRead", ...]:
+		"""Split into at most ``pieces`` reads cut on segment boundaries."""
+		step = -(-(self.row_stop - self.row_start) // max(pieces, 1))
+		reads = []
+		start = self.row_start
+		while start < self.row_stop:
+			stop = min(self.row_stop, -(-(start + step) // self.chunk_rows) * self.chunk_rows)
+			reads.append(DecodeRead(
+				self.source,
+				self.page,
+				start,
+				stop,
+				self.target_offset + (start - self.row_start) * self.target_stride,
+				self.target_stride,
+				self.chunk_rows,
+			))
+			start = stop
+		return tuple(reads)
 
 
 def offset_reads(
@@ -39,8 +108,9 @@ def offset_reads(
 	count: int = 1,
 	source_stride: int | None = None,
 	target_stride: int | None = None,
+	swap: int = 0,
 ) -> tuple[RawOffsetRead, ...]:
-	"""Build layout-agnostic strided raw-byte reads."""
+	"""Build layout-agnostic strided raw-byte reads, byte-swapping ``swap``-byte samples."""
 	if count < 0:
 		raise ValueError(f"count must be non-negative, got {count}")
 	source_stride = size if source_stride is None else source_stride
@@ -51,11 +121,24 @@ def offset_reads(
 			source_offset=source_offset + index * source_stride,
 			target_offset=target_offset + index * target_stride,
 			size=size,
+			swap=swap,
 		)
 		for index in range(count)
 	)
 
 
+def _swap_landed(target_buffer, reads: Iterable[RawOffsetRead]) -> None:
+	"""Byte-swap the landed target span of every read that asks for it."""
+	for read in reads:
+		if read.swap and read.size:
+			np.ndarray(
+				(read.size // read.swap,),
+				dtype=np.dtype(f"u{read.swap}"),
+				buffer=target_buffer,
+				offset=read.target_offset,
+			).byteswap(inplace=True)
+
+
 def readinto_offset(source_handle, target_buffer, read: RawOffsetRead) -> None:
 	"""Copy one exact raw file span into an arbitrary shared-memory span."""
 	target_stop = read.target_offset + read.size
@@ -75,46 +158,390 @@ def readinto_offset(source_handle, target_buffer, read: RawOffsetRead) -> None:
 			f"short raw read from {read.source}: expected {read.size} bytes at "
 			f"offset {read.source_offset}, got {read_count}"
 		)
+	_swap_landed(target_buffer, (read,))
+
+
+@dataclass(frozen=True)
+class ReadStats:
+	"""Bytes copied, read calls issued, and TIFF segments decoded for a set of reads."""
+
+	nbytes: int = 0
+	syscalls: int = 0
+	decoded: int = 0
+
+	def __add__(self, other: "ReadStats") -> "ReadStats":
+		return ReadStats(
+			self.nbytes + other.nbytes,
+			self.syscalls + other.syscalls,
+			self.decoded + other.decoded,
+		)
+
+	@property
+	def bytes_per_syscall(self) -> float:
+		return self.nbytes / self.syscalls if self.syscalls else 0.0
+
+
+def coalesce_reads(reads: Iterable[RawOffsetRead]) -> list[tuple[int, list[tuple[int, int]]]]:
+	"""Sort reads by source offset and merge source-contiguous runs.
+
+	Returns ``(source_offset, [(target_offset, size), ...])`` spans, each one
+	sequential source range scattered into its target pieces. Pieces that are
+	also contiguous in the target are merged into one.
+	"""
+	spans = []
+	span_end = None
+	for read in sorted(reads, key=lambda read: read.source_offset):
+		if read.size == 0:
+			continue
+		if spans and read.source_offset == span_end:
+			pieces = spans[-1][1]
+			last_target, last_size = pieces[-1]
+			if last_target + last_size == read.target_offset:
+				pieces[-1] = (last_target, last_size + read.size)
+			else:
+				pieces.append((read.target_offset, read.size))
+		else:
+			spans.append((read.source_offset, [(read.target_offset, read.size)]))
+		span_end = read.source_offset + read.size
+	return spans
+
+
+def _scatter_preadv(fd: int, views: list, source_offset: int, source: PathLike) -> int:
+	"""Fill ``views`` from ``source_offset`` with ``os.preadv``; return the calls made."""
+	pending = deque(views)
+	expected = sum(len(view) for view in views)
+	offset = source_offset
+	syscalls = 0
+	while pending:
+		count = os.preadv(fd, [pending[index] for index in range(min(len(pending), IOV_MAX))], offset)
+		syscalls += 1
+		if count == 0:
+			raise EOFError(
+				f"short raw read from {source}: expected {expected} bytes at "
+				f"offset {source_offset}, got {offset - source_offset}"
+			)
+		offset += count
+		while count:
+			head = pending[0]
+			if count < len(head):
+				pending[0] = head[count:]
+				views.append(pending[0])
+				break
+			count -= len(head)
+			pending.popleft()
+	return syscalls
+
+
+def _scatter_bounce(handle, views: list, source_offset: int, source: PathLike) -> int:
+	"""Read one sequential span into a bounce buffer and copy it out to ``views``."""
+	expected = sum(len(view) for view in views)
+	bounce = bytearray(expected)
+	handle.seek(source_offset)
+	read_count = handle.readinto(bounce)
+	if read_count != expected:
+		raise EOFError(
+			f"short raw read from {source}: expected {expected} bytes at "
+			f"offset {source_offset}, got {read_count}"
+		)
+	position = 0
+	for view in views:
+		view[:] = bounce[position:position + len(view)]
+		position += len(view)
+	return 1
+
+
+def readinto_spans(source_handle, target_buffer, reads: Iterable[RawOffsetRead], source: PathLike = None) -> ReadStats:
+	"""Copy ``reads`` from one source file into ``target_buffer`` in coalesced spans.
+
+	Spans are read in source-offset order with one vectored ``os.preadv`` per
+	span (or per ``IOV_MAX`` pieces), falling back to a bounce buffer where
+	``preadv`` is unavailable. Reads with a ``swap`` size are byte-swapped
+	in place afterwards.
+	"""
+	reads = tuple(reads)
+	stats = ReadStats()
+	for source_offset, pieces in coalesce_reads(reads):
+		views = []
+		try:
+			for target_offset, size in pieces:
+				target_stop = target_offset + size
+				if target_stop > len(target_buffer):
+					raise ValueError(
+						f"raw read target exceeds shared memory: stop={target_stop}, "
+						f"available={len(target_buffer)}"
+					)
+				views.append(target_buffer[target_offset:target_stop])
+			nbytes = sum(size for _, size in pieces)
+			if hasattr(os, "preadv"):
+				syscalls = _scatter_preadv(source_handle.fileno(), views, source_offset, source)
+			else:
+				syscalls = _scatter_bounce(source_handle, views, source_offset, source)
+			stats += ReadStats(nbytes, syscalls)
+		finally:
+			for view in views:
+				view.release()
+	_swap_landed(target_buffer, reads)
+	return stats
+
+
+def _open_tiff(source: PathLike):
+	tifffile = require("tifffile", "transform", purpose="decoding TIFF segments requires tifffile")
+	return tifffile.TiffFile(source)
+
+
+def decode_rows(tiff, target_buffer, read: DecodeRead) -> ReadStats:
+	"""Decode the strips or tiles covering ``read``'s rows straight into ``target_buffer``.
+
+	Segments are read in file order and each one is copied, clipped to the
+	requested rows and the image width, into its place in the target rows.
+	"""
+	page = tiff.pages[read.page]
+	if len(page.shape) != 2:
+		raise ValueError(f"expected a 2-D page in {read.source}, got shape {page.shape}")
+	height, width = page.shape
+	if read.row_stop > height:
+		raise ValueError(f"rows {read.row_start}:{read.row_stop} exceed {read.source} page height {height}")
+	rows = read.row_stop - read.row_start
+	if rows == 0:
+		return ReadStats()
+	dtype = np.dtype(page.dtype).newbyteorder("=")
+	target_stop = read.target_offset + (rows - 1) * read.target_stride + width * dtype.itemsize
+	if target_stop > len(target_buffer):
+		raise ValueError(
+			f"decoded rows exceed shared memory: stop={target_stop}, available={len(target_buffer)}"
+		)
+	target = np.ndarray(
+		(rows, width),
+		dtype=dtype,
+		buffer=target_buffer,
+		offset=read.target_offset,
+		strides=(read.target_stride, dtype.itemsize),
+	)
+	chunk_rows = page.chunks[0]
+	columns = page.chunked[-1]
+	indices = [
+		row * columns + column
+		for row in range(read.row_start // chunk_rows, (read.row_stop - 1) // chunk_rows + 1)
+		for column in range(columns)
+	]
+	# read_segments yields positions in the lists passed; its ``indices``
+	# argument is mishandled for a single segment, so map positions back here.
+	segments = tiff.filehandle.read_segments(
+		[page.dataoffsets[index] for index in indices],
+		[page.databytecounts[index] for index in indices],
+		sort=True,
+	)
+	for data, position in segments:
+		segment, (_, _, row, column, _), shape = page.decode(data, indices[position])
+		low, high = max(row, read.row_start), min(row + shape[1], read.row_stop)
+		right = min(column + shape[2], width)
+		window = target[low - read.row_start:high - read.row_start, column:right]
+		if segment is None:
+			window[...] = page.nodata
+		else:
+			window[...] = segment[0, low - row:high - row, :right - column, 0]
+	return ReadStats(target.nbytes, len(indices), len(indices))
+
+
+def _read_into(buffer, handle, source: PathLike, reads: tuple) -> ReadStats:
+	"""Copy raw spans from an open file, or decode segments from an open ``TiffFile``."""
+	if isinstance(reads[0], DecodeRead):
+		return sum((decode_rows(handle, buffer, read) for read in reads), ReadStats())
+	return readinto_spans(handle, buffer, reads, source)
 
 
-def _readinto_shared(target: str, source: PathLike, reads: tuple[RawOffsetRead, ...]) -> None:
-	"""Attach to shared memory and perform one source file's raw reads."""
+def _readinto_shared(target: str, source: PathLike, reads: tuple[RawOffsetRead | DecodeRead, ...]) -> ReadStats:
+	"""Attach to shared memory and perform one source file's raw reads or decodes."""
 	memory = shared_memory.SharedMemory(name=target)
 	try:
+		if isinstance(reads[0], DecodeRead):
+			with _open_tiff(source) as tiff:
+				return _read_into(memory.buf, tiff, source, reads)
 		with open(source, "rb", buffering=0) as source_handle:
-			for read in reads:
-				readinto_offset(source_handle, memory.buf, read)
+			return _read_into(memory.buf, source_handle, source, reads)
 	finally:
 		memory.close()
 
 
-def distribute_read(
-	target_mem: SharedNP | shared_memory.SharedMemory | str,
-	reads: Iterable[RawOffsetRead],
-	thread_max: int | None = None,
-) -> None:
-	"""Distribute layout-agnostic raw-offset reads into shared memory."""
+def _init_reader(max_open_files: int) -> None:
+	global _READER_OPEN_FILES
+	_READER_OPEN_FILES = max_open_files
+
+
+def _cached(cache: OrderedDict, key, limit: int, opener, closer):
+	"""Return ``cache[key]``, opening it and evicting the least recent entry past ``limit``."""
+	if key in cache:
+		cache.move_to_end(key)
+		return cache[key]
+	value = cache[key] = opener(key)
+	while len(cache) > limit:
+		closer(cache.popitem(last=False)[1])
+	return value
+
+
+def _pooled_readinto(target: str, source: PathLike, reads: tuple[RawOffsetRead | DecodeRead, ...]) -> ReadStats:
+	"""Perform one job's reads through this worker's warm attachments and open files.
+
+	Raw reads and decodes keep separate caches of ``max_open_files`` entries:
+	plain descriptors for raw spans, parsed ``TiffFile`` handles for decodes.
+	"""
+	memory = _cached(
+		_READER_MEMORY,
+		target,
+		READER_ATTACHMENTS,
+		lambda name: shared_memory.SharedMemory(name=name),
+		lambda attached: attached.close(),
+	)
+	key = str(source)
+	if isinstance(reads[0], DecodeRead):
+		cache, opener = _READER_TIFFS, _open_tiff
+	else:
+		cache, opener = _READER_FILES, lambda path: open(path, "rb", buffering=0)
+	handle = _cached(cache, key, _READER_OPEN_FILES, opener, lambda opened: opened.close())
+	try:
+		return _read_into(memory.buf, handle, source, reads)
+	except BaseException:
+		cache.pop(key, None)
+		handle.close()
+		raise
+
+
+def _decode_jobs(
+	target_name: str,
+	reads: list[DecodeRead],
+	concurrency: int,
+) -> list[tuple[str, PathLike, tuple[DecodeRead, ...]]]:
+	"""Make one job per decode read, splitting reads on segment boundaries to fill ``concurrency``."""
+	if not reads:
+		return []
+	pieces = max(1, -(-concurrency // len(reads)))
+	return [
+		(target_name, piece.source, (piece,))
+		for read in reads
+		for piece in read.split(pieces)
+	]
+
+
+def _read_jobs(
+	target_name: str,
+	reads: Iterable[RawOffsetRead | DecodeRead],
+	concurrency: int,
+) -> list[tuple[str, PathLike, tuple[RawOffsetRead | DecodeRead, ...]]]:
+	"""Group reads by source file, splitting sources so ``concurrency`` jobs can run.
+
+	Each source's reads are sorted by offset first, so every job covers one
+	contiguous stretch of the file and coalesces into few large reads.
+	Decode reads become jobs of their own.
+	"""
 	grouped: dict[PathLike, list[RawOffsetRead]] = {}
+	decodes = []
 	for read in reads:
-		grouped.setdefault(read.source, []).append(read)
+		if isinstance(read, DecodeRead):
+			decodes.append(read)
+		else:
+			grouped.setdefault(read.source, []).append(read)
+	jobs = _decode_jobs(target_name, decodes, concurrency)
 	if not grouped:
-		return
+		return jobs
+	pieces = max(1, -(-concurrency // len(grouped)))
+	for source, source_reads in grouped.items():
+		source_reads.sort(key=lambda read: read.source_offset)
+		step = -(-len(source_reads) // min(pieces, len(source_reads)))
+		jobs.extend(
+			(target_name, source, tuple(source_reads[start:start + step]))
+			for start in range(0, len(source_reads), step)
+		)
+	return jobs
+
+
+class RawReadPool:
+	"""Reusable worker processes for raw-offset reads and decodes into shared memory.
+
+	Workers are started on the first parallel read and then kept, along with
+	their shared-memory attachments and up to ``max_open_files`` open source
+	files, until ``close()``, so repeated reads into the same buffer
+	skip process start-up, re-attachment, and re-opening files. Sources are
+	assumed not to be replaced while the pool is open.
+	"""
+
+	def __init__(self, workers: int | None = None, max_open_files: int = READER_OPEN_FILES):
+		if workers is not None and workers < 1:
+			raise ValueError(f"workers must be positive, got {workers}")
+		if max_open_files < 1:
+			raise ValueError(f"max_open_files must be positive, got {max_open_files}")
+		self.workers = workers or cpu_count() or 1
+		self.max_open_files = max_open_files
+		self._executor = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def _ensure_executor(self) -> ProcessPoolExecutor:
+		if self._executor is None:
+			# Spawned readers never inherit locks held by the caller's threads.
+			self._executor = ProcessPoolExecutor(
+				max_workers=self.workers,
+				mp_context=get_context("spawn"),
+				initializer=_init_reader,
+				initargs=(self.max_open_files,),
+			)
+		return self._executor
 
-	target_name = target_mem if isinstance(target_mem, str) else target_mem.name
+	def start(self) -> "RawReadPool":
+		"""Start the worker processes now instead of on the first parallel read.
+
+		Readers are spawned, not forked, so they are safe to start beside
+		threads; starting them early moves interpreter start-up off the first
+		batch's critical path.
+		"""
+		if self.workers > 1:
+			self._ensure_executor().submit(int).result()
+		return self
+
+	def read(
+		self,
+		target_mem: SharedNP | shared_memory.SharedMemory | str,
+		reads: Iterable[RawOffsetRead | DecodeRead],
+		thread_max: int | None = None,
+	) -> ReadStats:
+		"""Copy or decode ``reads`` into ``target_mem`` using at most ``thread_max`` workers at once."""
+		if thread_max is not None and thread_max < 1:
+			raise ValueError(f"thread_max must be positive, got {thread_max}")
+		target_name = target_mem if isinstance(target_mem, str) else target_mem.name
+		concurrency = min(thread_max or self.workers, self.workers)
+		jobs = _read_jobs(target_name, reads, concurrency)
+		if concurrency == 1 or len(jobs) == 1:
+			return sum((_readinto_shared(*job) for job in jobs), ReadStats())
+		futures = [self._ensure_executor().submit(_pooled_readinto, *job) for job in jobs]
+		return sum((future.result() for future in futures), ReadStats())
+
+	def close(self) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(wait=True)
+			self._executor = None
+
+
+def distribute_read(
+	target_mem: SharedNP | shared_memory.SharedMemory | str,
+	reads: Iterable[RawOffsetRead | DecodeRead],
+	thread_max: int | None = None,
+	pool: RawReadPool | None = None,
+) -> ReadStats:
+	"""Distribute layout-agnostic raw-offset reads and segment decodes into shared memory.
+
+	Pass a ``RawReadPool`` to reuse its warm workers; otherwise a temporary
+	pool of ``thread_max`` workers is used for this call only. Returns the
+	bytes copied, read calls issued after coalescing, and segments decoded.
+	"""
 	if thread_max is not None and thread_max < 1:
 		raise ValueError(f"thread_max must be positive, got {thread_max}")
-	requested_workers = thread_max or cpu_count() or 1
-	worker_count = min(requested_workers, len(grouped))
-	jobs = [
-		(target_name, source, tuple(source_reads))
-		for source, source_reads in grouped.items()
-	]
-	if worker_count == 1:
-		for job in jobs:
-			_readinto_shared(*job)
-		return
-	with Pool(worker_count) as pool:
-		pool.starmap(_readinto_shared, jobs)
+	if pool is not None:
+		return pool.read(target_mem, reads, thread_max=thread_max)
+	with RawReadPool(thread_max) as temporary:
+		return temporary.read(target_mem, reads)
 
 
 class FLAT(Enum):
@@ -154,6 +154,11 @@ class ProgressHandle:
 			self.position = self._bar.pos
 		self.position = self._bar.pos
 
+	def set_length(self, length: int) -> None:
+		"""Change the total, e.g. while the work is still being enumerated."""
+		self.length = length
+		self._bar.length = length
+
 	def update(self, count: int) -> None:
 		"""Advance manually by ``count`` completed units."""
 		if not self._entered:
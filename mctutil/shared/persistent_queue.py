@@ -4,8 +4,10 @@ from __future__ import annotations
 
 from contextlib import redirect_stderr, redirect_stdout
 import hashlib
+import heapq
 import importlib
 from io import StringIO
+import itertools
 import json
 import multiprocessing
 from pathlib import Path
@@ -20,6 +22,13 @@ from mctutil.shared.log import log, LOG
 from mctutil.shared.resource_monitor import record_active_workers
 
 
+EMPTY_POLL_INITIAL_SECONDS = 0.01
+EMPTY_POLL_MAX_SECONDS = 1.0
+LEASE_BATCH_MAX = 32
+LEASE_BATCHES_PER_WORKER = 8
+INSERT_BATCH_TASKS = 1000
+
+
 class QueueDrainError(RuntimeError):
 	"""A worker-process failure with its buffered output events."""
 
@@ -72,10 +81,176 @@ def _require_taskqueue():
 	return taskqueue.QueueEmptyError, taskqueue.TaskQueue
 
 
-def _renew_lease(queue, task, lease_seconds: int, stopped: threading.Event) -> None:
-	interval = max(1.0, lease_seconds / 2)
-	while not stopped.wait(interval):
-		queue.renew(task, lease_seconds)
+class LeaseRenewer:
+	"""Renew every active lease of one worker from a single long-lived thread.
+
+	Each leased batch sits in a heap ordered by its next renewal time, and
+	every task in it is renewed together. Renewals run under the renewer's
+	lock, so once ``remove`` returns no renewal of that batch is in flight
+	and its tasks can be deleted or cancelled safely.
+	"""
+
+	def __init__(self, queue, lease_seconds: int):
+		self.queue = queue
+		self.lease_seconds = lease_seconds
+		self.interval = max(1.0, lease_seconds / 2)
+		self._condition = threading.Condition()
+		self._heap = []
+		self._active = {}
+		self._tokens = itertools.count()
+		self._closed = False
+		self._thread = None
+
+	def add(self, tasks: list) -> int:
+		with self._condition:
+			token = next(self._tokens)
+			self._active[token] = list(tasks)
+			heapq.heappush(self._heap, (time.monotonic() + self.interval, token))
+			if self._thread is None:
+				self._thread = threading.Thread(target=self._run, daemon=True)
+				self._thread.start()
+			self._condition.notify()
+		return token
+
+	def remove(self, token: int) -> None:
+		with self._condition:
+			self._active.pop(token, None)
+
+	def close(self) -> None:
+		with self._condition:
+			self._closed = True
+			self._condition.notify()
+		if self._thread is not None:
+			self._thread.join()
+
+	def _run(self) -> None:
+		with self._condition:
+			while not self._closed:
+				while self._heap and self._heap[0][1] not in self._active:
+					heapq.heappop(self._heap)
+				if not self._heap:
+					self._condition.wait()
+					continue
+				deadline, token = self._heap[0]
+				delay = deadline - time.monotonic()
+				if delay > 0:
+					self._condition.wait(delay)
+					continue
+				heapq.heappop(self._heap)
+				self._renew(token, deadline)
+
+	def _renew(self, token: int, deadline: float) -> None:
+		try:
+			for task in self._active[token]:
+				self.queue.renew(task, self.lease_seconds)
+		except Exception as exc:
+			# Like an expired lease, the task becomes available to other workers.
+			self._active.pop(token)
+			log.write("Queue", f"Lease renewal failed: {exc}", log_level=LOG.WARN)
+			return
+		heapq.heappush(self._heap, (deadline + self.interval, token))
+
+
+class _TaskOutput:
+	"""Captured stdout/stderr buffers reused across a worker's tasks."""
+
+	def __init__(self):
+		self.stdout = StringIO()
+		self.stderr = StringIO()
+
+	def redirect(self):
+		for buffer in (self.stdout, self.stderr):
+			buffer.seek(0)
+			buffer.truncate()
+		return redirect_stdout(self.stdout), redirect_stderr(self.stderr)
+
+	def event(self, status: str) -> dict | None:
+		if status == "complete" and not (self.stdout.tell() or self.stderr.tell()):
+			return None
+		return {
+			"status": status,
+			"stdout": self.stdout.getvalue(),
+			"stderr": self.stderr.getvalue(),
+		}
+
+
+class _WorkerTiming:
+	"""Wall time one worker spent executing tasks versus handling them."""
+
+	def __init__(self):
+		self.tasks = 0
+		self.execute_seconds = 0.0
+		self.overhead_seconds = 0.0
+		self.idle_seconds = 0.0
+
+	def event(self) -> dict:
+		return {
+			"status": "timing",
+			"tasks": self.tasks,
+			"execute_seconds": self.execute_seconds,
+			"overhead_seconds": self.overhead_seconds,
+			"idle_seconds": self.idle_seconds,
+		}
+
+
+def lease_batch_size(remaining: int, parallel: int, requested: int | None = None) -> int:
+	"""Return how many tasks each worker leases and acknowledges at once.
+
+	Unless ``requested``, batches grow with the queue but leave every worker
+	about ``LEASE_BATCHES_PER_WORKER`` batches, so the tail stays balanced.
+	"""
+	if requested is not None:
+		return requested
+	return max(
+		1,
+		min(LEASE_BATCH_MAX, remaining // (max(1, parallel) * LEASE_BATCHES_PER_WORKER)),
+	)
+
+
+def _lease_batch(queue, lease_seconds: int, lease_batch: int, insert_lock=None) -> list:
+	if insert_lock is None:
+		leased = queue.lease(seconds=lease_seconds, num_tasks=lease_batch)
+	else:
+		with insert_lock:
+			leased = queue.lease(seconds=lease_seconds, num_tasks=lease_batch)
+	return list(leased) if lease_batch > 1 else [leased]
+
+
+def _run_leased_batch(queue, tasks: list, renewer, output, event_queue, timing, poll) -> None:
+	token = renewer.add(tasks)
+	completed = []
+	for task in tasks:
+		redirect_out, redirect_err = output.redirect()
+		started = time.perf_counter()
+		try:
+			with redirect_out, redirect_err:
+				task.execute()
+		except Exception:
+			renewer.remove(token)
+			if completed:
+				queue.delete(completed, tally=True)
+			for unfinished in tasks[len(completed):]:
+				queue.cancel(unfinished)
+			event = output.event("failed")
+			event["traceback"] = traceback.format_exc()
+			event_queue.put(event)
+			raise
+		timing.execute_seconds += time.perf_counter() - started
+		completed.append(task)
+		event = output.event("complete")
+		if event is not None:
+			event_queue.put(event)
+	acknowledging = time.perf_counter()
+	renewer.remove(token)
+	queue.delete(completed, tally=True)
+	if poll is not None:
+		poll()
+	timing.tasks += len(completed)
+	timing.overhead_seconds += time.perf_counter() - acknowledging
+
+
+def _insertion_finished(insertion_done) -> bool:
+	return insertion_done is None or insertion_done.is_set()
 
 
 def _drain_worker(
@@ -84,65 +259,51 @@ def _drain_worker(
 	task_modules: tuple[str, ...],
 	event_queue,
 	poll=None,
+	lease_batch: int = 1,
+	insertion_done=None,
+	insert_lock=None,
 ) -> None:
-	"""Lease, execute, and acknowledge tasks until the durable queue is empty."""
+	"""Lease, execute, and acknowledge tasks until the durable queue is empty.
+
+	Tasks are leased ``lease_batch`` at a time and acknowledged together once
+	the batch finishes. A crash leaves the whole batch leased, so its tasks,
+	including any already executed, return to the queue when the leases
+	expire; Igneous tasks are idempotent. While other workers hold the
+	remaining leases, or while ``insertion_done`` is not yet set, empty polls
+	back off exponentially up to ``EMPTY_POLL_MAX_SECONDS``. Until insertion
+	is done, leases are taken under ``insert_lock`` so they never land
+	inside an insert. A ``timing`` event with the worker's execution and
+	overhead totals is put last.
+	"""
 	for module_name in task_modules:
 		importlib.import_module(module_name)
 	QueueEmptyError, TaskQueue = _require_taskqueue()
-	queue = TaskQueue(queue_url, progress=False)
-	while True:
-		try:
-			task = queue.lease(seconds=lease_seconds)
-		except QueueEmptyError:
-			if queue.is_empty():
-				return
-			time.sleep(0.1)
-			continue
-
-		stopped = threading.Event()
-		renewer = threading.Thread(
-			target=_renew_lease,
-			args=(queue, task, lease_seconds, stopped),
-			daemon=True,
-		)
-		renewer.start()
-		stdout_buffer = StringIO()
-		stderr_buffer = StringIO()
-		try:
-			with (
-				redirect_stdout(stdout_buffer),
-				redirect_stderr(stderr_buffer),
-			):
-				task.execute()
-			stopped.set()
-			renewer.join()
-			queue.delete(task, tally=True)
-			if poll is not None:
-				poll()
-		except Exception:
-			stopped.set()
-			renewer.join()
-			queue.cancel(task)
-			event_queue.put(
-				{
-					"status": "failed",
-					"stdout": stdout_buffer.getvalue(),
-					"stderr": stderr_buffer.getvalue(),
-					"traceback": traceback.format_exc(),
-				}
-			)
-			raise
-		else:
-			stdout_value = stdout_buffer.getvalue()
-			stderr_value = stderr_buffer.getvalue()
-			if stdout_value or stderr_value:
-				event_queue.put(
-					{
-						"status": "complete",
-						"stdout": stdout_value,
-						"stderr": stderr_value,
-					}
-				)
+	# Serial deletes: a batch acknowledgement must not start a thread pool.
+	queue = TaskQueue(queue_url, progress=False, n_threads=0)
+	renewer = LeaseRenewer(queue, lease_seconds)
+	output = _TaskOutput()
+	timing = _WorkerTiming()
+	backoff = EMPTY_POLL_INITIAL_SECONDS
+	try:
+		while True:
+			leasing = time.perf_counter()
+			try:
+				inserting = not _insertion_finished(insertion_done)
+				tasks = _lease_batch(queue, lease_seconds, lease_batch, insert_lock if inserting else None)
+			except QueueEmptyError:
+				# Check insertion first: once it is finished, empty means drained.
+				if _insertion_finished(insertion_done) and queue.is_empty():
+					break
+				time.sleep(backoff)
+				backoff = min(backoff * 2, EMPTY_POLL_MAX_SECONDS)
+				timing.idle_seconds += time.perf_counter() - leasing
+				continue
+			backoff = EMPTY_POLL_INITIAL_SECONDS
+			timing.overhead_seconds += time.perf_counter() - leasing
+			_run_leased_batch(queue, tasks, renewer, output, event_queue, timing, poll)
+	finally:
+		renewer.close()
+	event_queue.put(timing.event())
 
 
 def _drain_worker_entry(
@@ -150,6 +311,9 @@ def _drain_worker_entry(
 	lease_seconds: int,
 	task_modules: tuple[str, ...],
 	event_queue,
+	lease_batch: int = 1,
+	insertion_done=None,
+	insert_lock=None,
 ) -> None:
 	try:
 		_drain_worker(
@@ -157,6 +321,9 @@ def _drain_worker_entry(
 			lease_seconds,
 			task_modules,
 			event_queue,
+			lease_batch=lease_batch,
+			insertion_done=insertion_done,
+			insert_lock=insert_lock,
 		)
 	except Exception:
 		event_queue.put(
@@ -185,6 +352,9 @@ def _parallel_worker_events(
 	task_modules: tuple[str, ...],
 	poll,
 	poll_interval: float,
+	lease_batch: int = 1,
+	insertion_done=None,
+	insert_lock=None,
 ):
 	context = multiprocessing.get_context("spawn")
 	event_queue = context.Queue()
@@ -192,7 +362,15 @@ def _parallel_worker_events(
 	processes = [
 		context.Process(
 			target=_drain_worker_entry,
-			args=(queue_url, lease_seconds, task_modules, event_queue),
+			args=(
+				queue_url,
+				lease_seconds,
+				task_modules,
+				event_queue,
+				lease_batch,
+				insertion_done,
+				insert_lock,
+			),
 		)
 		for _index in range(parallel)
 	]
@@ -249,10 +427,21 @@ def drain_file_queue(
 	task_modules: tuple[str, ...] = ("igneous.task_creation",),
 	poll=None,
 	poll_interval: float = 0.1,
+	lease_batch: int = 1,
+	insertion_done=None,
+	insert_lock=None,
 ) -> list[dict]:
-	"""Execute a file queue in one or more independent worker processes."""
+	"""Execute a file queue in one or more independent worker processes.
+
+	While tasks are still being inserted, pass a spawn-context
+	``multiprocessing.Event`` as ``insertion_done``; workers keep polling an
+	empty queue until it is set. Pass the inserter's spawn-context
+	``multiprocessing.Lock`` as ``insert_lock`` so no lease runs mid-insert.
+	"""
 	if parallel < 1:
 		raise ValueError("parallel must be at least 1")
+	if lease_batch < 1:
+		raise ValueError("lease_batch must be at least 1")
 
 	events = []
 	if parallel == 1:
@@ -263,6 +452,9 @@ def drain_file_queue(
 				task_modules,
 				_ListEventQueue(events),
 				poll=poll,
+				lease_batch=lease_batch,
+				insertion_done=insertion_done,
+				insert_lock=insert_lock,
 			)
 		except Exception as exc:
 			raise QueueDrainError(str(exc), events) from exc
@@ -275,6 +467,9 @@ def drain_file_queue(
 		task_modules,
 		poll,
 		poll_interval,
+		lease_batch,
+		insertion_done,
+		insert_lock,
 	)
 	_raise_worker_failures(processes, events)
 	return events
@@ -311,7 +506,8 @@ def _announce_queue_start(
 
 
 def _finish_insertion(queue, state: dict, state_path: Path, tasks_factory) -> None:
-	if state["status"] != "inserting":
+	"""Complete an all-at-once insertion started before insertion streamed."""
+	if state["status"] != "inserting" or state.get("streaming"):
 		return
 	if queue.inserted == 0:
 		# FileQueue commits its insertion counter only after the full insert
@@ -329,8 +525,15 @@ def _finish_insertion(queue, state: dict, state_path: Path, tasks_factory) -> No
 	)
 
 
+def _record_insertion(queue, state: dict, state_path: Path) -> None:
+	state["status"] = "executing"
+	state["inserted"] = int(queue.inserted)
+	write_state(state_path, state)
+	log.write("Queue", f"Tasks: inserted={state['inserted']}.", log_level=LOG.STATUS)
+
+
 def _release_resume_leases(queue, state: dict, release_leases: bool) -> None:
-	if state["status"] not in {"enqueued", "executing"}:
+	if state["status"] not in {"inserting", "enqueued", "executing"}:
 		return
 	leased = queue.leased
 	if release_leases:
@@ -349,13 +552,95 @@ def _release_resume_leases(queue, state: dict, release_leases: bool) -> None:
 	)
 
 
+class TaskInserter:
+	"""Stream a task factory into a file queue on a background thread.
+
+	Tasks are generated in batches, so a short factory finishes before its
+	first task is enqueued, and each task is inserted by its own
+	``queue.insert`` call. FileQueue's insertion counter is the checkpoint,
+	committed by every call, so a restart skips that many tasks of the
+	deterministic factory; a crash can repeat at most the one task being
+	inserted. Every insert holds ``lock``,
+	which draining workers also take to lease: FileQueue writes a task file
+	before its movement record, and a lease in between would lose its
+	record. ``done`` is set when insertion stops for any reason;
+	``on_complete`` runs on the inserting thread only once every task is in.
+	Other threads read progress from ``inserted`` rather than the counter
+	file, which the inserting thread rewrites in place.
+	"""
+
+	def __init__(
+		self,
+		queue,
+		tasks_factory,
+		done,
+		lock,
+		batch_size: int | None = None,
+		on_complete=None,
+	):
+		self.queue = queue
+		self.tasks_factory = tasks_factory
+		self.done = done
+		self.lock = lock
+		self.batch_size = batch_size or INSERT_BATCH_TASKS
+		self.on_complete = on_complete
+		self.inserted = int(queue.inserted or 0)
+		self.error = None
+		self._first_task = threading.Event()
+		self._stopped = threading.Event()
+		self._thread = threading.Thread(target=self._run, daemon=True)
+
+	def start(self) -> None:
+		"""Start inserting and return once the first task is enqueued."""
+		self._thread.start()
+		self._first_task.wait()
+
+	def stop(self) -> None:
+		self._stopped.set()
+		self._thread.join()
+
+	def join(self) -> None:
+		self._thread.join()
+		if self.error is not None:
+			raise self.error
+
+	def _run(self) -> None:
+		try:
+			tasks = itertools.islice(self.tasks_factory(), self.inserted, None)
+			while not self._stopped.is_set():
+				batch = list(itertools.islice(tasks, self.batch_size))
+				if not batch:
+					if self.on_complete is not None:
+						self.on_complete()
+					break
+				self._insert(batch)
+		except Exception as exc:
+			self.error = exc
+		finally:
+			self.done.set()
+			self._first_task.set()
+
+	def _insert(self, batch: list) -> None:
+		for task in batch:
+			if self._stopped.is_set():
+				return
+			with self.lock:
+				self.inserted += self.queue.insert([task])
+			self._first_task.set()
+
+
 class QueueCompletionMonitor:
-	"""Translate a durable completion tally into bounded progress updates."""
+	"""Translate a durable completion tally into bounded progress updates.
+
+	With ``total_source``, the total is re-read on each poll so it can grow
+	while tasks are still being inserted.
+	"""
 
-	def __init__(self, queue, total: int, progress):
+	def __init__(self, queue, total: int, progress, total_source=None):
 		self.queue = queue
 		self.total = total
 		self.progress = progress
+		self.total_source = total_source
 		self.highest_tally = int(queue.completed or 0)
 
 	@property
@@ -363,6 +648,11 @@ class QueueCompletionMonitor:
 		return min(self.total, self.highest_tally)
 
 	def poll(self) -> None:
+		if self.total_source is not None:
+			total = int(self.total_source() or 0)
+			if total > self.total:
+				self.total = total
+				self.progress.set_length(total)
 		self.highest_tally = max(
 			self.highest_tally,
 			int(self.queue.completed or 0),
@@ -397,7 +687,28 @@ class QueueCompletionMonitor:
 			)
 
 
+def _report_worker_timing(events: list[dict]) -> None:
+	timings = [event for event in events if event["status"] == "timing"]
+	tasks = sum(event["tasks"] for event in timings)
+	if not tasks:
+		return
+	execute = sum(event["execute_seconds"] for event in timings)
+	overhead = sum(event["overhead_seconds"] for event in timings)
+	idle = sum(event["idle_seconds"] for event in timings)
+	share = 100 * overhead / max(execute + overhead, 1e-9)
+	log.write(
+		"Queue",
+		(
+			f"Task timing: {tasks} task(s); execute {1000 * execute / tasks:.2f} ms/task; "
+			f"overhead {1000 * overhead / tasks:.2f} ms/task ({share:.1f}%); "
+			f"idle polling {idle:.2f} s."
+		),
+		log_level=LOG.INFO,
+	)
+
+
 def _emit_worker_events(events: list[dict]) -> None:
+	events = [event for event in events if event["status"] != "timing"]
 	if not events:
 		return
 	with igneous_output_session() as normalizer:
@@ -420,6 +731,24 @@ def _emit_worker_events(events: list[dict]) -> None:
 				)
 
 
+def _drain_plan(
+	queue,
+	total: int,
+	parallel: int,
+	lease_batch: int | None,
+	inserter: TaskInserter | None,
+) -> tuple[int, int, int, int]:
+	"""Return total, initial completions, worker count, and lease batch."""
+	if inserter is not None:
+		inserter.start()
+		total = inserter.inserted
+	initial = min(total, int(queue.completed or 0))
+	remaining = max(1, total - initial)
+	streaming = inserter is not None and not inserter.done.is_set()
+	active_parallel = parallel if streaming else min(parallel, remaining)
+	return total, initial, active_parallel, lease_batch_size(remaining, active_parallel, lease_batch)
+
+
 def _drain_with_progress(
 	queue,
 	queue_path: Path,
@@ -427,9 +756,17 @@ def _drain_with_progress(
 	parallel: int,
 	lease_seconds: int,
 	progress_label: str,
+	lease_batch: int | None = None,
+	inserter: TaskInserter | None = None,
 ) -> QueueCompletionMonitor:
-	initial = min(total, int(queue.completed or 0))
-	active_parallel = min(parallel, max(1, total - initial))
+	total, initial, active_parallel, lease_batch = _drain_plan(
+		queue,
+		total,
+		parallel,
+		lease_batch,
+		inserter,
+	)
+	streaming = "; insertion continues" if inserter is not None and not inserter.done.is_set() else ""
 	record_active_workers(active_parallel)
 	worker_events = []
 	monitor = None
@@ -439,34 +776,48 @@ def _drain_with_progress(
 			length=total,
 			initial=initial,
 			start_message=(
-				f"Executing queue with {active_parallel} worker(s): "
-				f"completed={initial}; total={total}."
+				f"Executing queue with {active_parallel} worker(s), "
+				f"leasing {lease_batch} task(s) at a time: "
+				f"completed={initial}; total={total}{streaming}."
 			),
 			final_message=lambda handle: (
 				f"Queue execution complete: completed="
-				f"{handle.position}/{total}."
+				f"{handle.position}/{handle.length}."
 			),
 		) as progress:
-			monitor = QueueCompletionMonitor(queue, total, progress)
+			monitor = QueueCompletionMonitor(
+				queue,
+				total,
+				progress,
+				total_source=None if inserter is None else lambda: inserter.inserted,
+			)
 			try:
 				worker_events = drain_file_queue(
 					file_queue_url(queue_path),
 					active_parallel,
 					lease_seconds,
 					poll=monitor.poll,
+					lease_batch=lease_batch,
+					insertion_done=None if inserter is None else inserter.done,
+					insert_lock=None if inserter is None else inserter.lock,
 				)
 			except QueueDrainError as exc:
 				worker_events = exc.events
 				raise
+			if inserter is not None:
+				inserter.join()
 			if not queue.is_empty():
 				raise RuntimeError(
 					f"persistent queue did not drain: {queue_path}"
 				)
 			monitor.reconcile_empty()
 	except Exception:
+		if inserter is not None:
+			inserter.stop()
 		_emit_worker_events(worker_events)
 		raise
 	_emit_worker_events(worker_events)
+	_report_worker_timing(worker_events)
 	return monitor
 
 
@@ -479,8 +830,16 @@ def run_persistent_tasks(
 	release_leases: bool = True,
 	expected_existing: bool = False,
 	progress_label: str = "Queue Tasks",
+	lease_batch: int | None = None,
 ) -> dict:
-	"""Insert a task set once and resume its durable queue until completion."""
+	"""Insert a task set once and resume its durable queue until completion.
+
+	Insertion streams: workers start once the first task is enqueued and
+	drain while the rest is inserted, and an interrupted insertion resumes
+	after its last committed task. ``lease_batch`` fixes how many tasks a
+	worker leases at once; by default ``lease_batch_size`` picks it from the
+	remaining work.
+	"""
 	_QueueEmptyError, TaskQueue = _require_taskqueue()
 	queue_path = queue_path.resolve()
 	state_path = queue_path / "mctutil-state.json"
@@ -490,12 +849,13 @@ def run_persistent_tasks(
 		raise RuntimeError(f"persistent queue fingerprint mismatch: {queue_path}")
 
 	_announce_queue_start(queue_path, state, expected_existing)
-	queue = TaskQueue(file_queue_url(queue_path), progress=False)
+	# Serial inserts: inserting one task at a time must not start a thread pool.
+	queue = TaskQueue(file_queue_url(queue_path), progress=False, n_threads=0)
 	if state is None:
 		state = {
 			"fingerprint": task_fingerprint,
 			"status": "inserting",
-			"inserted": 0,
+			"streaming": True,
 		}
 		write_state(state_path, state)
 
@@ -515,7 +875,23 @@ def run_persistent_tasks(
 	if resumed:
 		_release_resume_leases(queue, state, release_leases)
 
-	if queue.is_empty():
+	inserter = None
+	if state["status"] == "inserting":
+		context = multiprocessing.get_context("spawn")
+		inserter = TaskInserter(
+			queue,
+			tasks_factory,
+			context.Event(),
+			context.Lock(),
+			on_complete=lambda: _record_insertion(queue, state, state_path),
+		)
+		if queue.inserted:
+			log.write(
+				"Queue",
+				f"Resuming task insertion after {queue.inserted} inserted task(s).",
+				log_level=LOG.STATUS,
+			)
+	elif queue.is_empty():
 		state["status"] = "complete"
 		write_state(state_path, state)
 		log.write(
@@ -527,9 +903,9 @@ def run_persistent_tasks(
 			log_level=LOG.STATUS,
 		)
 		return state
-
-	state["status"] = "executing"
-	write_state(state_path, state)
+	else:
+		state["status"] = "executing"
+		write_state(state_path, state)
 	total = int(state.get("inserted", queue.inserted))
 	monitor = _drain_with_progress(
 		queue,
@@ -538,6 +914,8 @@ def run_persistent_tasks(
 		parallel,
 		lease_seconds,
 		progress_label,
+		lease_batch,
+		inserter,
 	)
 	monitor.report_overrun()
 	state["status"] = "complete"
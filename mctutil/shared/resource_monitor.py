@@ -13,6 +13,7 @@ import multiprocessing
 import os
 from pathlib import Path
 import signal
+import threading
 import time
 
 import psutil
@@ -55,6 +56,30 @@ class UsageSample:
 	anon: int | None
 	file: int | None
 	system: SystemContext
+	limit: int | None = None
+
+
+@dataclass(frozen=True)
+class MemoryPressure:
+	"""Latest workload memory sample against the memory it may grow into."""
+
+	current: int
+	limit: int | None
+
+	@property
+	def fraction(self) -> float | None:
+		if not self.limit:
+			return None
+		return self.current / self.limit
+
+
+def _workload_limit(current: int, system: SystemContext, hard_limit: int | None = None) -> int | None:
+	"""Return a hard cgroup limit, or current usage plus system-wide headroom."""
+	if hard_limit is not None:
+		return hard_limit
+	if system.available is None:
+		return None
+	return current + system.available
 
 
 @dataclass(frozen=True)
@@ -278,6 +303,7 @@ class _CgroupSampler:
 		if current is None:
 			raise RuntimeError("cgroup memory.current became unavailable")
 		stats = _read_key_values(self.directory / "memory.stat")
+		system = _system_context(self.proc_root)
 		return UsageSample(
 			mode=self.mode,
 			current=current,
@@ -286,7 +312,8 @@ class _CgroupSampler:
 			processes=_read_int(self.directory / "pids.current") or 0,
 			anon=stats.get("anon"),
 			file=stats.get("file"),
-			system=_system_context(self.proc_root),
+			system=system,
+			limit=_workload_limit(current, system, _read_int(self.directory / "memory.max")),
 		)
 
 	def reset_peak(self) -> bool:
@@ -395,6 +422,7 @@ class _ProcessTreeSampler:
 			component += resident
 			swap += process_swap
 			count += 1
+		system = _system_context(self.proc_root)
 		return UsageSample(
 			mode=self.mode,
 			current=component + swap,
@@ -403,7 +431,8 @@ class _ProcessTreeSampler:
 			processes=count,
 			anon=None,
 			file=None,
-			system=_system_context(self.proc_root),
+			system=system,
+			limit=_workload_limit(component + swap, system),
 		)
 
 	def reset_peak(self) -> bool:
@@ -429,6 +458,7 @@ def _update_columns(shared, sample: UsageSample, peak: int) -> None:
 	shared[0] = max(0, sample.current)
 	shared[1] = max(0, peak)
 	shared[2] = _MODE_CODES[sample.mode]
+	shared[3] = max(0, sample.limit or 0)
 
 
 def _handle_monitor_command(
@@ -541,6 +571,19 @@ def record_active_workers(count: int) -> None:
 		_active_monitor.observe_workers(count)
 
 
+def current_memory_pressure() -> MemoryPressure | None:
+	"""Return the active monitor's latest workload sample, if any."""
+	if _active_monitor is None:
+		return None
+	return _active_monitor.memory_pressure()
+
+
+def record_staging_slots(count: int) -> None:
+	"""Record how many staged read batches a stage keeps in flight."""
+	if _active_monitor is not None:
+		_active_monitor.observe_staging_slots(count)
+
+
 def _format_size(value: int | None) -> str:
 	if value is None:
 		return "unavailable"
@@ -560,6 +603,7 @@ def format_stage_summary(
 	summary: StageSummary,
 	active_workers: int,
 	prediction: StagePrediction | None,
+	staging_slots: int | None = None,
 ) -> str:
 	peak_kind = "exact cgroup peak" if summary.peak_exact else "sampled peak"
 	parts = []
@@ -572,6 +616,10 @@ def format_stage_summary(
 		f"total peak={_format_size(summary.peak)} ({peak_kind})",
 		f"delta={_format_size(max(0, summary.peak - summary.baseline))}",
 		f"effective workers={active_workers}",
+	])
+	if staging_slots is not None:
+		parts.append(f"staging slots={staging_slots}")
+	parts.extend([
 		f"peak processes={summary.peak_processes}",
 		f"peak swap={_format_size(summary.peak_swap)}",
 	])
@@ -630,8 +678,11 @@ class PublishResourceMonitor:
 		self.shared = None
 		self.mode = None
 		self.active_workers = 1
+		self.staging_slots = None
 		self._previous_monitor = None
 		self._reported_dead = False
+		self._stage_lock = threading.Lock()
+		self._stage_owner = None
 
 	@property
 	def enabled(self) -> bool:
@@ -641,7 +692,7 @@ class PublishResourceMonitor:
 		global _active_monitor
 		context = multiprocessing.get_context("spawn")
 		parent_connection, child_connection = context.Pipe()
-		shared = context.Array("Q", (0, 0, 0), lock=False)
+		shared = context.Array("Q", (0, 0, 0, 0), lock=False)
 		process = context.Process(
 			target=_monitor_main,
 			args=(child_connection, shared, self.root_pid, self.interval),
@@ -704,14 +755,31 @@ class PublishResourceMonitor:
 				"SYS AVAIL",
 				psutil.virtual_memory().available,
 			)
-		current, peak, mode = self.shared[:]
+		current, peak, mode, _ = self.shared[:]
 		labels = _COLUMN_LABELS.get(mode, ("WORKLOAD", "WL PEAK"))
 		return labels[0], current, labels[1], peak
 
+	def memory_pressure(self) -> MemoryPressure | None:
+		if not self.enabled or self.shared is None:
+			return None
+		current, _, mode, limit = self.shared[:]
+		if not mode:
+			return None
+		return MemoryPressure(current=current, limit=limit or None)
+
+	def _observing(self) -> bool:
+		# Overlapping publish stages report from their own threads; only the
+		# accounted stage's thread may shape its summary.
+		return self._stage_owner in (None, threading.get_ident())
+
 	def observe_workers(self, count: int) -> None:
-		if count > 0:
+		if count > 0 and self._observing():
 			self.active_workers = max(self.active_workers, int(count))
 
+	def observe_staging_slots(self, count: int) -> None:
+		if count > 0 and self._observing():
+			self.staging_slots = max(self.staging_slots or 0, int(count))
+
 	def _request(self, command: str, value=None):
 		if not self.enabled or self.connection is None:
 			if command != "shutdown" and not self._reported_dead:
@@ -752,23 +820,34 @@ class PublishResourceMonitor:
 		prediction: StagePrediction | None = None,
 		dataset: str | None = None,
 	):
+		"""Account one stage; a stage overlapping another runs unaccounted."""
+		if not self._stage_lock.acquire(blocking=False):
+			log.write(
+				"Resources",
+				f"{name} for {dataset} overlaps an accounted stage; no separate summary.",
+				log_level=LOG.DEBUG,
+			)
+			yield
+			return
+		self._stage_owner = threading.get_ident()
 		self.active_workers = 1
+		self.staging_slots = None
 		started = self._request("start", (dataset, name)) is not None
 		try:
 			yield
 		finally:
-			if started:
-				summary = self._request("stop")
-				if isinstance(summary, StageSummary):
-					log.write(
-						"Resources",
-						format_stage_summary(
-							summary,
-							self.active_workers,
-							prediction,
-						),
-						log_level=LOG.STATUS,
-					)
+			try:
+				summary = self._request("stop") if started else None
+				workers, staging_slots = self.active_workers, self.staging_slots
+			finally:
+				self._stage_owner = None
+				self._stage_lock.release()
+			if isinstance(summary, StageSummary):
+				log.write(
+					"Resources",
+					format_stage_summary(summary, workers, prediction, staging_slots),
+					log_level=LOG.STATUS,
+				)
 
 	def close(self) -> None:
 		global _active_monitor
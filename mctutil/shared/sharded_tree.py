@@ -99,8 +99,13 @@ def sharded_tree_complete(root: str | Path, info: dict | None = None) -> bool:
 def read_sharded_scales(
 	root: Path,
 	include_mip0: bool = True,
+	mips: tuple[int, ...] | None = None,
 ) -> list[tuple[int, str, Path]]:
-	"""Return uploadable declared scales with legacy validation behavior."""
+	"""Return uploadable declared scales with legacy validation behavior.
+
+	``mips`` restricts selection and validation to those scales, so one
+	finished scale can be read while others are still being written.
+	"""
 	root = Path(root)
 	info = load_info(root)
 	declared = info.get("scales", [])
@@ -111,6 +116,8 @@ def read_sharded_scales(
 	for scale in inspect_sharded_tree(root, info):
 		if scale.mip == 0 and not include_mip0:
 			continue
+		if mips is not None and scale.mip not in mips:
+			continue
 		if scale.key is None:
 			raise ValueError(f"scale {scale.mip} has no key")
 		if not scale.sharded:
@@ -0,0 +1,215 @@
+"""Classify TIFF pixel layouts and route reads to raw copies or segment decodes."""
+
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from os import PathLike
+from typing import Iterable
+
+import math
+
+import numpy as np
+from psutil import cpu_count
+
+from mctutil.shared.deps import require
+from mctutil.shared.io_helpers import DecodeRead, RawOffsetRead, offset_reads
+
+CONTIGUOUS = "contiguous"
+MULTI_STRIP = "multi-strip"
+TILED = "tiled"
+COMPRESSED = "compressed"
+RAW_LAYOUTS = (CONTIGUOUS, MULTI_STRIP)
+INSPECT_THREADS = 8
+
+
+def _require_tifffile():
+	return require("tifffile", "transform", purpose="inspecting TIFF layouts requires tifffile")
+
+
+@dataclass(frozen=True)
+class TiffLayout:
+	"""Where one 2-D TIFF page's pixels are stored and how to read them.
+
+	Uncompressed strips stored with whole, in-order samples are ``raw`` and
+	copied by offset, byte-swapped afterwards when ``swapped`` marks them as
+	stored in the opposite byte order; everything else is decoded segment by
+	segment. A layout is path-like, so it can stand in for its file.
+	"""
+
+	path: str
+	page: int
+	kind: str
+	shape: tuple[int, int]
+	dtype: np.dtype
+	chunk_rows: int
+	offsets: tuple[int, ...] = ()
+	native: bool = True
+	swapped: bool = False
+
+	def __fspath__(self) -> str:
+		return self.path
+
+	@property
+	def raw(self) -> bool:
+		return self.native and self.kind in RAW_LAYOUTS
+
+	@property
+	def row_bytes(self) -> int:
+		return self.shape[1] * self.dtype.itemsize
+
+
+def _kind(page) -> str:
+	if page.compression != 1:
+		return COMPRESSED
+	if page.is_tiled:
+		return TILED
+	offsets, counts = page.dataoffsets, page.databytecounts
+	if all(offsets[index] + counts[index] == offsets[index + 1] for index in range(len(offsets) - 1)):
+		return CONTIGUOUS
+	return MULTI_STRIP
+
+
+def page_layout(path: PathLike, page, index: int, byteorder: str) -> TiffLayout:
+	"""Classify one parsed ``TiffPage``; ``byteorder`` is its file's ``'<'`` or ``'>'``."""
+	if len(page.shape) != 2 or page.samplesperpixel != 1 or page.dtype is None:
+		raise ValueError(f"{path} page {index} is not a 2-D grayscale image: shape {page.shape}")
+	kind = _kind(page)
+	dtype = np.dtype(page.dtype).newbyteorder("=")
+	native = page.bitspersample == dtype.itemsize * 8 and page.fillorder == 1
+	swapped = dtype.itemsize > 1 and not np.dtype(page.dtype).newbyteorder(byteorder).isnative
+	height = int(page.shape[0])
+	if kind == CONTIGUOUS:
+		chunk_rows, offsets = height, (int(page.dataoffsets[0]),)
+	else:
+		chunk_rows, offsets = int(page.chunks[0]), tuple(int(offset) for offset in page.dataoffsets)
+	return TiffLayout(
+		path=str(path),
+		page=index,
+		kind=kind,
+		shape=(height, int(page.shape[1])),
+		dtype=dtype,
+		chunk_rows=chunk_rows,
+		offsets=offsets if kind in RAW_LAYOUTS else (),
+		native=native,
+		swapped=swapped,
+	)
+
+
+def inspect_layout(path: PathLike, page: int = 0) -> TiffLayout:
+	"""Classify one page of a TIFF file."""
+	with _require_tifffile().TiffFile(path) as tiff:
+		return page_layout(path, tiff.pages[page], page, tiff.byteorder)
+
+
+def inspect_stack(path: PathLike) -> tuple[TiffLayout, ...]:
+	"""Classify every page of a multipage TIFF."""
+	with _require_tifffile().TiffFile(path) as tiff:
+		return tuple(page_layout(path, page, index, tiff.byteorder) for index, page in enumerate(tiff.pages))
+
+
+def inspect_layouts(paths: Iterable[PathLike], threads: int | None = None) -> list[TiffLayout]:
+	"""Classify the first page of each file, parsing headers on a thread pool."""
+	paths = list(paths)
+	threads = threads or min(INSPECT_THREADS, cpu_count() or 1)
+	if threads == 1 or len(paths) < 2:
+		return [inspect_layout(path) for path in paths]
+	with ThreadPoolExecutor(max_workers=threads) as pool:
+		return list(pool.map(inspect_layout, paths))
+
+
+def common_geometry(layouts: Iterable[TiffLayout]) -> tuple[tuple[int, int], np.dtype]:
+	"""Return the shared page shape and dtype, or raise if the inputs disagree."""
+	layouts = list(layouts)
+	if not layouts:
+		raise ValueError("no TIFF inputs to inspect")
+	first = layouts[0]
+	for layout in layouts[1:]:
+		if layout.shape != first.shape or layout.dtype != first.dtype:
+			raise ValueError(
+				f"{layout.path} page {layout.page} is {layout.shape} {layout.dtype}; "
+				f"expected {first.shape} {first.dtype} like {first.path}"
+			)
+	return first.shape, first.dtype
+
+
+def summarize_layouts(layouts: Iterable[TiffLayout]) -> str:
+	"""Describe how many inputs have each layout and how they will be read."""
+	kinds = Counter()
+	routes = Counter()
+	for layout in layouts:
+		kinds[layout.kind] += 1
+		routes["raw-offset" if layout.raw else "decoded"] += 1
+		routes["byte-swapped"] += layout.raw and layout.swapped
+	return (
+		", ".join(f"{kinds[kind]} {kind}" for kind in (CONTIGUOUS, MULTI_STRIP, TILED, COMPRESSED) if kinds[kind])
+		+ f"; {routes['raw-offset']} raw-offset, {routes['decoded']} decoded"
+		+ (f" ({routes['byte-swapped']} byte-swapped)" if routes["byte-swapped"] else "")
+	)
+
+
+def decode_alignment(layouts: Iterable[TiffLayout]) -> int:
+	"""Rows per read window that keep every decoded strip or tile row whole.
+
+	Windows that start and stop on multiples of this decode each segment
+	once instead of once per window it overlaps. Returns 1 when no layout
+	is decoded.
+	"""
+	return math.lcm(1, *{layout.chunk_rows for layout in layouts if not layout.raw})
+
+
+def layout_reads(
+	layout: TiffLayout,
+	rows: range,
+	target_offset: int,
+	target_stride: int | None = None,
+) -> tuple[RawOffsetRead | DecodeRead, ...]:
+	"""Read ``rows`` of a page into shared memory, one row every ``target_stride`` bytes.
+
+	Raw layouts become one offset read per strip piece, or one per row when
+	target rows are not adjacent. Other layouts become a single decode read
+	that pools split across workers on segment boundaries.
+	"""
+	if rows.step != 1 or rows.start < 0 or rows.stop > layout.shape[0]:
+		raise ValueError(f"rows {rows} are outside {layout.path} page height {layout.shape[0]}")
+	row_bytes = layout.row_bytes
+	target_stride = row_bytes if target_stride is None else target_stride
+	swap = layout.dtype.itemsize if layout.swapped else 0
+	if not rows:
+		return ()
+	if not layout.raw:
+		return (DecodeRead(
+			layout.path,
+			layout.page,
+			rows.start,
+			rows.stop,
+			target_offset,
+			target_stride,
+			layout.chunk_rows,
+		),)
+	reads = []
+	for strip in range(rows.start // layout.chunk_rows, -(-rows.stop // layout.chunk_rows)):
+		strip_start = strip * layout.chunk_rows
+		low, high = max(rows.start, strip_start), min(rows.stop, strip_start + layout.chunk_rows)
+		source_offset = layout.offsets[strip] + (low - strip_start) * row_bytes
+		piece_offset = target_offset + (low - rows.start) * target_stride
+		if target_stride == row_bytes:
+			reads.extend(offset_reads(
+				layout.path,
+				source_offset=source_offset,
+				target_offset=piece_offset,
+				size=(high - low) * row_bytes,
+				swap=swap,
+			))
+		else:
+			reads.extend(offset_reads(
+				layout.path,
+				source_offset=source_offset,
+				target_offset=piece_offset,
+				size=row_bytes,
+				count=high - low,
+				target_stride=target_stride,
+				swap=swap,
+			))
+	return tuple(reads)
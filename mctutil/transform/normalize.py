@@ -14,6 +14,7 @@ from mctutil.shared.mem import SharedNP, ProjOrder
 from mctutil.shared.np_convert import np_convert
 from mctutil.shared.stack_apply import apply_array, batched, run_parallel, tiff_paths
 from mctutil.shared.tiff_stack_writer import write_tiff_stack
+from mctutil.transform.percentile import volume_percentiles
 
 
 def normalized_image(image, floor, ceiling):
@@ -26,13 +27,18 @@ def normalized_image(image, floor, ceiling):
 	return result
 
 
-def normalization_bounds(image, bottom_threshold, top_threshold):
-	"""Return the percentile bounds used by normalization commands."""
-	floor, ceiling = np.percentile(
-		np.asarray(image),
+def normalization_bounds(image, bottom_threshold, top_threshold, workers=1):
+	"""Return the percentile bounds used by normalization commands.
+
+	Bounds come from a per-plane histogram instead of a flattened sort copy;
+	see ``PercentileSketch`` for the exactness guarantees by dtype.
+	"""
+	floor, ceiling = volume_percentiles(
+		image,
 		(bottom_threshold, top_threshold),
+		workers=workers,
 	)
-	return float(floor), float(ceiling)
+	return floor, ceiling
 
 
 def norm_helper(image_mem, i, floor, ceiling):
@@ -51,6 +57,7 @@ def normalize(image_mem, index, bottom_threshold, top_threshold, thread_max):
 			image,
 			bottom_threshold,
 			top_threshold,
+			workers=thread_max,
 		)
 
 		log.write('Normalization',
@@ -5,6 +5,9 @@ from __future__ import annotations
 import numpy as np
 
 
+SLIDING_MAXIMUM_MIN_WIDTH = 16
+
+
 def _axis_index(axis: int, ndim: int) -> int:
 	axis = int(axis)
 	if axis < 0:
@@ -14,12 +17,7 @@ def _axis_index(axis: int, ndim: int) -> int:
 	return axis
 
 
-def maximum_intensity_projection(
-	volume: np.ndarray,
-	width: int,
-	axis: int = 0,
-) -> np.ndarray:
-	"""Return trailing-window maximum-intensity projections along one axis."""
+def _validated_mip(volume, width: int, axis: int) -> tuple[np.ndarray, int]:
 	array = np.asarray(volume)
 	axis = _axis_index(axis, array.ndim)
 	if width < 1:
@@ -28,6 +26,16 @@ def maximum_intensity_projection(
 		raise ValueError(
 			f"MIP width {width} exceeds axis {axis} length {array.shape[axis]}"
 		)
+	return array, axis
+
+
+def reference_maximum_intensity_projection(
+	volume: np.ndarray,
+	width: int,
+	axis: int = 0,
+) -> np.ndarray:
+	"""Reduce a ``sliding_window_view`` with ``np.max``: O(width) per voxel."""
+	array, axis = _validated_mip(volume, width, axis)
 	if width == 1:
 		return np.array(array, copy=True)
 	windows = np.lib.stride_tricks.sliding_window_view(
@@ -38,6 +46,75 @@ def maximum_intensity_projection(
 	return np.max(windows, axis=-1)
 
 
+def sliding_maximum(
+	volume: np.ndarray,
+	width: int,
+	axis: int = 0,
+) -> np.ndarray:
+	"""Trailing-window maximum with a constant cost per voxel for any width.
+
+	This is the van Herk/Gil-Werman scheme: the axis is cut into
+	``width``-long blocks, and each output combines a backward running max over
+	the rest of its block with a forward running max into the next block.
+	Scratch memory is two blocks of ``width`` planes.
+	"""
+	array, axis = _validated_mip(volume, width, axis)
+	if width == 1:
+		return np.array(array, copy=True)
+	source = np.moveaxis(array, axis, 0)
+	count = source.shape[0] - width + 1
+	shape = list(array.shape)
+	shape[axis] = count
+	result = np.empty(shape, dtype=array.dtype)
+	target = np.moveaxis(result, axis, 0)
+	backward = np.empty((width,) + source.shape[1:], dtype=array.dtype)
+	forward = np.empty((width - 1,) + source.shape[1:], dtype=array.dtype)
+	for start in range(0, count, width):
+		backward[width - 1] = source[start + width - 1]
+		for offset in range(width - 2, -1, -1):
+			np.maximum(source[start + offset], backward[offset + 1], out=backward[offset])
+		target[start] = backward[0]
+		tail = min(width, count - start) - 1
+		if not tail:
+			continue
+		forward[0] = source[start + width]
+		for offset in range(1, tail):
+			np.maximum(source[start + width + offset], forward[offset - 1], out=forward[offset])
+		np.maximum(backward[1:tail + 1], forward[:tail], out=target[start + 1:start + tail + 1])
+	return result
+
+
+def maximum_intensity_projection(
+	volume: np.ndarray,
+	width: int,
+	axis: int = 0,
+) -> np.ndarray:
+	"""Return trailing-window maximum-intensity projections along one axis.
+
+	Narrow windows over a non-final axis keep the direct windowed reduction,
+	which NumPy vectorizes well; wider windows and last-axis projections use
+	``sliding_maximum``. Both are exact (``scripts/benchmark_mip.py``).
+	"""
+	array, axis = _validated_mip(volume, width, axis)
+	if width < SLIDING_MAXIMUM_MIN_WIDTH and axis != array.ndim - 1:
+		return reference_maximum_intensity_projection(array, width, axis)
+	return sliding_maximum(array, width, axis)
+
+
+def circular_plane_mask(shape: tuple[int, int], ratio: float) -> np.ndarray:
+	"""Return the boolean keep-mask of a centered circle on one 2D plane."""
+	if not 0.0 < ratio <= 1.0:
+		raise ValueError("circular mask ratio must be greater than 0 and at most 1")
+	first_size, second_size = shape
+	first = np.arange(first_size, dtype=np.float64) - (first_size - 1) / 2
+	second = np.arange(second_size, dtype=np.float64) - (second_size - 1) / 2
+	radius = ratio * min(first_size, second_size) / 2
+	return (
+		first[:, np.newaxis] ** 2 + second[np.newaxis, :] ** 2
+		<= radius ** 2
+	)
+
+
 def circular_mask(
 	volume: np.ndarray,
 	ratio: float,
@@ -55,13 +132,7 @@ def circular_mask(
 
 	plane_axes = tuple(index for index in range(array.ndim) if index != axis)
 	first_size, second_size = (array.shape[index] for index in plane_axes)
-	first = np.arange(first_size, dtype=np.float64) - (first_size - 1) / 2
-	second = np.arange(second_size, dtype=np.float64) - (second_size - 1) / 2
-	radius = ratio * min(first_size, second_size) / 2
-	plane_mask = (
-		first[:, np.newaxis] ** 2 + second[np.newaxis, :] ** 2
-		<= radius ** 2
-	)
+	plane_mask = circular_plane_mask((first_size, second_size), ratio)
 	mask_shape = [1] * array.ndim
 	mask_shape[plane_axes[0]] = first_size
 	mask_shape[plane_axes[1]] = second_size
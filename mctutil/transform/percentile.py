@@ -0,0 +1,227 @@
+"""Streaming histogram percentiles for whole-volume normalization bounds."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from multiprocessing.pool import ThreadPool
+from threading import Lock
+
+import numpy as np
+
+from mctutil.shared.log import LOG, log
+from mctutil.shared.stack_apply import run_parallel
+
+
+DEFAULT_BINS = 1 << 16
+ONE_PASS_BITS = 16
+
+
+class PercentileSketch:
+	"""Mergeable per-plane histogram that resolves percentiles of a stream.
+
+	Integer dtypes up to 16 bits are counted exactly in one pass with
+	``np.bincount`` over the whole dtype range. Wider integers and floats
+	observe their value range first and histogram a second pass. Wider
+	integers stay exact while ``max - min`` fits in ``bins``; otherwise,
+	and always for floats, percentiles interpolate inside one bin, so each
+	bound is within ``(max - min) / bins`` of ``np.percentile``. NaN and infinite float
+	values are left out, as ``np.nanpercentile`` leaves out NaN, and counted
+	in ``nonfinite``. ``observe`` and ``accumulate`` are safe to call from
+	concurrent reader threads.
+	"""
+
+	def __init__(self, dtype, bins: int = DEFAULT_BINS):
+		self.dtype = np.dtype(dtype)
+		if self.dtype.kind not in "iuf":
+			raise ValueError(f"percentile sketch does not support dtype {self.dtype}")
+		if bins < 1:
+			raise ValueError("percentile sketch needs at least one bin")
+		self.bins = int(bins)
+		self.count = 0
+		self.nonfinite = 0
+		self.minimum = None
+		self.maximum = None
+		self._counts = None
+		self._offset = None
+		self._width = None
+		self._lock = Lock()
+		if self.dtype.kind in "iu" and self.dtype.itemsize * 8 <= ONE_PASS_BITS:
+			info = np.iinfo(self.dtype)
+			self._offset = int(info.min)
+			self._width = 1
+			self._counts = np.zeros(int(info.max) - int(info.min) + 1, dtype=np.int64)
+
+	@property
+	def needs_second_pass(self) -> bool:
+		"""Whether ``accumulate`` must see every plane after ``observe``."""
+		return not (
+			self.dtype.kind in "iu"
+			and self.dtype.itemsize * 8 <= ONE_PASS_BITS
+		)
+
+	@property
+	def exact(self) -> bool:
+		"""Whether resolved percentiles equal ``np.percentile`` exactly; never for floats."""
+		return self.dtype.kind in "iu" and self._width == 1
+
+	def observe(self, plane) -> None:
+		"""First pass: record the value range, counting one-pass dtypes."""
+		plane, skipped = self._finite(self._checked(plane))
+		if skipped:
+			with self._lock:
+				self.nonfinite += skipped
+		if not plane.size:
+			return
+		low, high = plane.min(), plane.max()
+		counts = None if self.needs_second_pass else self._bincount(plane)
+		with self._lock:
+			self.minimum = low if self.minimum is None else min(self.minimum, low)
+			self.maximum = high if self.maximum is None else max(self.maximum, high)
+			if counts is not None:
+				self._counts += counts
+				self.count += plane.size
+
+	def accumulate(self, plane) -> None:
+		"""Second pass: histogram one plane against the observed range."""
+		if not self.needs_second_pass:
+			return
+		plane, _ = self._finite(self._checked(plane))
+		if not plane.size:
+			return
+		with self._lock:
+			if self._counts is None:
+				self._allocate_bins()
+		counts = self._bincount(plane)
+		with self._lock:
+			self._counts += counts
+			self.count += plane.size
+
+	def percentiles(self, values: Iterable[float]) -> tuple[float, ...]:
+		"""Resolve ``np.percentile``-compatible linear percentiles."""
+		if not self.count:
+			if self.nonfinite:
+				raise ValueError(f"cannot resolve percentiles: all {self.nonfinite} values are NaN or infinite")
+			raise ValueError("cannot resolve percentiles of an empty stream")
+		if self.nonfinite:
+			log.write(
+				"Percentiles",
+				f"Left out {self.nonfinite} NaN or infinite value(s) from the bounds",
+				log_level=LOG.WARN,
+			)
+		cumulative = np.cumsum(self._counts)
+		return tuple(
+			_linear_percentile(
+				lambda rank: self._order_statistic(cumulative, rank),
+				self.count,
+				value,
+			)
+			for value in values
+		)
+
+	def _checked(self, plane) -> np.ndarray:
+		plane = np.asarray(plane)
+		if plane.dtype != self.dtype:
+			raise ValueError(
+				f"percentile sketch expected {self.dtype} planes; got {plane.dtype}"
+			)
+		return plane
+
+	def _finite(self, plane: np.ndarray) -> tuple[np.ndarray, int]:
+		"""Drop NaN and infinite float values; return the kept values and how many were dropped."""
+		if self.dtype.kind != "f":
+			return plane, 0
+		finite = np.isfinite(plane)
+		if finite.all():
+			return plane, 0
+		kept = plane[finite]
+		return kept, plane.size - kept.size
+
+	def _allocate_bins(self) -> None:
+		if self.minimum is None:
+			raise ValueError("observe every plane before accumulating a second pass")
+		span = self.maximum - self.minimum
+		if self.dtype.kind in "iu" and int(span) < self.bins:
+			self._offset = int(self.minimum)
+			self._width = 1
+			self._counts = np.zeros(int(span) + 1, dtype=np.int64)
+			return
+		self._offset = float(self.minimum)
+		self._width = float(span) / self.bins
+		self._counts = np.zeros(self.bins, dtype=np.int64)
+
+	def _bincount(self, plane: np.ndarray) -> np.ndarray:
+		if self.exact:
+			index = plane.ravel().astype(np.int64) - self._offset
+		elif self._width == 0:
+			index = np.zeros(plane.size, dtype=np.int64)
+		else:
+			index = np.subtract(plane.ravel(), self._offset, dtype=np.float64)
+			index /= self._width
+			index = np.minimum(index.astype(np.int64), len(self._counts) - 1)
+		return np.bincount(index, minlength=len(self._counts))
+
+	def _order_statistic(self, cumulative: np.ndarray, rank: int) -> float:
+		position = int(np.searchsorted(cumulative, rank, side="right"))
+		if self.exact:
+			return self._offset + position
+		if self._width == 0 or rank == 0:
+			return float(self.minimum)
+		if rank == self.count - 1:
+			return float(self.maximum)
+		before = int(cumulative[position - 1]) if position else 0
+		inside = (rank - before + 0.5) / int(self._counts[position])
+		return self._offset + self._width * (position + inside)
+
+
+def _linear_percentile(order_statistic, count: int, percentile: float) -> float:
+	"""Interpolate two order statistics the way ``np.percentile`` does."""
+	virtual = (count - 1) * np.true_divide(percentile, 100)
+	if virtual >= count - 1:
+		return float(order_statistic(count - 1))
+	if virtual < 0:
+		return float(order_statistic(0))
+	previous = int(np.floor(virtual))
+	gamma = virtual - previous
+	lower = order_statistic(previous)
+	upper = order_statistic(previous + 1)
+	difference = upper - lower
+	if gamma >= 0.5:
+		return float(upper - difference * (1 - gamma))
+	return float(lower + difference * gamma)
+
+
+def resolve_percentiles(
+	sketch: PercentileSketch,
+	planes: Sequence[np.ndarray],
+	values: Iterable[float],
+	workers: int = 1,
+) -> tuple[float, ...]:
+	"""Finish an observed sketch with any second pass over in-memory planes."""
+	if sketch.needs_second_pass:
+		run_parallel(
+			sketch.accumulate,
+			((plane,) for plane in planes),
+			min(workers, len(planes)),
+			pool_factory=ThreadPool,
+		)
+	return sketch.percentiles(values)
+
+
+def volume_percentiles(
+	volume,
+	values: Iterable[float],
+	*,
+	workers: int = 1,
+	bins: int = DEFAULT_BINS,
+) -> tuple[float, ...]:
+	"""Histogram percentiles of an in-memory array, one leading plane at a time."""
+	array = np.asarray(volume)
+	planes = array if array.ndim > 1 else array[np.newaxis]
+	sketch = PercentileSketch(array.dtype, bins)
+	run_parallel(
+		sketch.observe,
+		((plane,) for plane in planes),
+		min(workers, len(planes)),
+		pool_factory=ThreadPool,
+	)
+	return resolve_percentiles(sketch, planes, values, workers)
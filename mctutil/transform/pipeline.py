@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from dataclasses import dataclass
 from multiprocessing import shared_memory
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import Iterator
+from typing import Callable, Iterator
 
 import click
 import numpy as np
@@ -24,12 +25,14 @@ from mctutil.shared.stack_apply import (
 from mctutil.shared.tiff_stack_writer import compression_for, write_tiff_stack
 from mctutil.transform.convert import converted_image
 from mctutil.transform.flip import flipped_volume
+from mctutil.transform.fused import fused_transform_pipeline
 from mctutil.transform.normalize import normalization_bounds, normalized_image
 from mctutil.transform.ops import (
 	circular_mask,
 	maximum_intensity_projection,
 	spatial_bin,
 )
+from mctutil.transform.percentile import PercentileSketch, resolve_percentiles
 from mctutil.transform.simple_noise import denoised_volume
 from mctutil.transform.trim import cropped_image
 
@@ -93,11 +96,14 @@ def _validate_denoise_config(mode, threshold) -> None:
 def _normalized_volume(
 	volume: np.ndarray,
 	normalize_range: tuple[float, float] | None,
+	bounds: tuple[float, float] | None = None,
 ) -> np.ndarray:
 	_validate_normalize_range(normalize_range)
 	if normalize_range is None:
 		return volume
-	floor, ceiling = normalization_bounds(volume, *normalize_range)
+	if bounds is None:
+		bounds = normalization_bounds(volume, *normalize_range)
+	floor, ceiling = bounds
 	if ceiling <= floor:
 		raise ValueError(
 			f"normalization bounds must differ; both resolved to {floor:.4g}"
@@ -146,36 +152,23 @@ def _optionally_flipped(volume, flip_axis):
 	return flipped_volume(volume, flip_axis)
 
 
-def apply_transform_pipeline(
+def _volume_stages(
 	volume: np.ndarray,
 	*,
-	normalize_range: tuple[float, float] | None = None,
-	vertical_trim=(0.0, 0.0),
-	horizontal_trim=(0.0, 0.0),
-	z_trim=(0.0, 0.0),
-	mip_width: int = 0,
-	mip_axis: int = 0,
-	circ_mask_ratio: float | None = None,
-	denoise_mode: str | None = None,
-	denoise_threshold: float | None = None,
-	flip_axis: int | None = None,
-	out_dtype: np.dtype | type | None = np.uint8,
-	bin_power: int = 0,
+	normalize_range,
+	normalize_bounds,
+	vertical_trim,
+	horizontal_trim,
+	z_trim,
+	mip_width: int,
+	mip_axis: int,
+	circ_mask_ratio,
+	circ_mask_value,
+	denoise_mode,
+	denoise_threshold,
 ) -> np.ndarray:
-	"""Apply the fused operation chain to an already-loaded ZYX volume.
-
-	The order is fixed by ``PIPELINE_ORDER``. Dtype conversion is performed per
-	output Z image, as it is in the standalone ``transform convert`` core, and
-	spatial binning preserves that converted dtype while changing only Y and X.
-	"""
-	result = np.asarray(volume)
-	if result.ndim != 3:
-		raise ValueError(
-			f"transform pipeline requires a three-dimensional ZYX volume; got {result.shape}"
-		)
-	if mip_width < 0:
-		raise ValueError("MIP width cannot be negative")
-	result = _normalized_volume(result, normalize_range)
+	"""Run the stages whose output can depend on neighboring Z planes."""
+	result = _normalized_volume(volume, normalize_range, normalize_bounds)
 	result = _trimmed_volume(
 		result,
 		vertical_trim,
@@ -187,20 +180,33 @@ def apply_transform_pipeline(
 		result = maximum_intensity_projection(result, mip_width, mip_axis)
 
 	if circ_mask_ratio is not None:
-		mask_value = 0 if normalize_range is not None else np.min(result)
+		if circ_mask_value is None:
+			circ_mask_value = (
+				0 if normalize_range is not None else np.min(result)
+			)
 		result = circular_mask(
 			result,
 			circ_mask_ratio,
 			axis=0,
-			value=mask_value,
+			value=circ_mask_value,
 		)
 
-	result = _optionally_denoised(
+	return _optionally_denoised(
 		result,
 		denoise_mode,
 		denoise_threshold,
 	)
-	result = _optionally_flipped(result, flip_axis)
+
+
+def _plane_stages(
+	volume: np.ndarray,
+	*,
+	flip_axis: int | None,
+	out_dtype,
+	bin_power: int,
+) -> np.ndarray:
+	"""Run the flip, per-image conversion, and binning tail."""
+	result = _optionally_flipped(volume, flip_axis)
 
 	if out_dtype is not None:
 		result = np.stack(
@@ -213,13 +219,66 @@ def apply_transform_pipeline(
 	return result
 
 
-def _read_tiff_image(
+def apply_transform_pipeline(
 	volume: np.ndarray,
-	index: int,
+	*,
+	normalize_range: tuple[float, float] | None = None,
+	normalize_bounds: tuple[float, float] | None = None,
+	vertical_trim=(0.0, 0.0),
+	horizontal_trim=(0.0, 0.0),
+	z_trim=(0.0, 0.0),
+	mip_width: int = 0,
+	mip_axis: int = 0,
+	circ_mask_ratio: float | None = None,
+	circ_mask_value=None,
+	denoise_mode: str | None = None,
+	denoise_threshold: float | None = None,
+	flip_axis: int | None = None,
+	out_dtype: np.dtype | type | None = np.uint8,
+	bin_power: int = 0,
+) -> np.ndarray:
+	"""Apply the fused operation chain to an already-loaded ZYX volume.
+
+	The order is fixed by ``PIPELINE_ORDER``. Dtype conversion is performed per
+	output Z image, as it is in the standalone ``transform convert`` core, and
+	spatial binning preserves that converted dtype while changing only Y and X.
+	``normalize_bounds`` and ``circ_mask_value`` override the whole-volume
+	percentile and minimum when a caller has already resolved them.
+	"""
+	result = np.asarray(volume)
+	if result.ndim != 3:
+		raise ValueError(
+			f"transform pipeline requires a three-dimensional ZYX volume; got {result.shape}"
+		)
+	if mip_width < 0:
+		raise ValueError("MIP width cannot be negative")
+	result = _volume_stages(
+		result,
+		normalize_range=normalize_range,
+		normalize_bounds=normalize_bounds,
+		vertical_trim=vertical_trim,
+		horizontal_trim=horizontal_trim,
+		z_trim=z_trim,
+		mip_width=mip_width,
+		mip_axis=mip_axis,
+		circ_mask_ratio=circ_mask_ratio,
+		circ_mask_value=circ_mask_value,
+		denoise_mode=denoise_mode,
+		denoise_threshold=denoise_threshold,
+	)
+	return _plane_stages(
+		result,
+		flip_axis=flip_axis,
+		out_dtype=out_dtype,
+		bin_power=bin_power,
+	)
+
+
+def _checked_tiff_image(
 	path: Path,
 	expected_shape: tuple[int, int],
 	expected_dtype: np.dtype,
-) -> None:
+) -> np.ndarray:
 	image = np.asarray(tf.imread(path))
 	if image.shape != expected_shape:
 		raise ValueError(
@@ -229,15 +288,35 @@ def _read_tiff_image(
 		raise ValueError(
 			f"TIFF dtype mismatch for {path}: {image.dtype} != {expected_dtype}"
 		)
-	volume[index] = image
+	return image
 
 
-@contextmanager
-def shared_tiff_volume(
+def _read_tiff_image(
+	volume: np.ndarray,
+	index: int,
+	path: Path,
+	expected_shape: tuple[int, int],
+	expected_dtype: np.dtype,
+	on_plane: Callable[[np.ndarray], None] | None = None,
+) -> None:
+	volume[index] = _checked_tiff_image(path, expected_shape, expected_dtype)
+	if on_plane is not None:
+		on_plane(volume[index])
+
+
+def _update_from_tiff(
+	path: Path,
+	expected_shape: tuple[int, int],
+	expected_dtype: np.dtype,
+	update: Callable[[np.ndarray], None],
+) -> None:
+	update(_checked_tiff_image(path, expected_shape, expected_dtype))
+
+
+def tiff_stack_layout(
 	paths: tuple[Path, ...],
-	workers: int,
-) -> Iterator[np.ndarray]:
-	"""Read each single-image TIFF once into one shared-memory ZYX volume."""
+) -> tuple[tuple[int, int], np.dtype]:
+	"""Return the per-file image shape and dtype that every input must share."""
 	if not paths:
 		raise ValueError("cannot load an empty TIFF stack")
 	with tf.TiffFile(paths[0]) as tif:
@@ -245,23 +324,47 @@ def shared_tiff_volume(
 			raise ValueError(
 				"transform pipeline expects one two-dimensional image per TIFF file"
 			)
-		image_shape = tuple(tif.pages[0].shape)
-		dtype = np.dtype(tif.pages[0].dtype)
+		return tuple(tif.pages[0].shape), np.dtype(tif.pages[0].dtype)
+
+
+def read_tiff_planes(
+	paths: tuple[Path, ...],
+	out: np.ndarray,
+	workers: int,
+	layout: tuple[tuple[int, int], np.dtype] | None = None,
+	on_plane: Callable[[np.ndarray], None] | None = None,
+) -> np.ndarray:
+	"""Read single-image TIFFs into the leading planes of a preallocated array.
+
+	``on_plane`` sees each plane from its reader thread as soon as it lands.
+	"""
+	image_shape, dtype = tiff_stack_layout(paths) if layout is None else layout
+	run_parallel(
+		_read_tiff_image,
+		(
+			(out, index, path, image_shape, dtype, on_plane)
+			for index, path in enumerate(paths)
+		),
+		min(workers, len(paths)),
+		pool_factory=ThreadPool,
+	)
+	return out[:len(paths)]
+
+
+@contextmanager
+def shared_tiff_volume(
+	paths: tuple[Path, ...],
+	workers: int,
+	on_plane: Callable[[np.ndarray], None] | None = None,
+) -> Iterator[np.ndarray]:
+	"""Read each single-image TIFF once into one shared-memory ZYX volume."""
+	image_shape, dtype = tiff_stack_layout(paths)
 	volume_shape = (len(paths),) + image_shape
 	byte_count = int(np.prod(volume_shape, dtype=np.int64)) * dtype.itemsize
 	segment = shared_memory.SharedMemory(create=True, size=byte_count)
 	volume = np.ndarray(volume_shape, dtype=dtype, buffer=segment.buf)
 	try:
-		active_workers = min(workers, len(paths))
-		run_parallel(
-			_read_tiff_image,
-			(
-				(volume, index, path, image_shape, dtype)
-				for index, path in enumerate(paths)
-			),
-			active_workers,
-			pool_factory=ThreadPool,
-		)
+		read_tiff_planes(paths, volume, workers, (image_shape, dtype), on_plane)
 		yield volume
 	finally:
 		del volume
@@ -332,6 +435,278 @@ def write_pipeline_outputs(
 	return tuple(item.target for item in items)
 
 
+@dataclass(frozen=True)
+class PipelineSlab:
+	"""One streamed range of output planes and the Z-trimmed inputs it needs.
+
+	``start``/``stop`` index post-MIP output planes before any Z flip, and
+	``read_start``/``read_stop`` index Z-trimmed input planes. ``keep_start`` is
+	the offset of ``start`` inside the slab once its halo has been processed.
+	"""
+
+	start: int
+	stop: int
+	read_start: int
+	read_stop: int
+	keep_start: int
+
+	@property
+	def read_depth(self) -> int:
+		return self.read_stop - self.read_start
+
+
+def plan_pipeline_slabs(
+	plane_count: int,
+	slab_depth: int,
+	*,
+	mip_width: int = 0,
+	mip_axis: int = 0,
+	denoise: bool = False,
+) -> tuple[PipelineSlab, ...]:
+	"""Split Z-trimmed planes into output slabs with MIP and denoise halos.
+
+	A Z-axis MIP of width ``w`` reads ``w - 1`` trailing planes past each slab,
+	and neighboring-Z denoising reads one extra post-MIP plane on either side.
+	"""
+	if slab_depth < 1:
+		raise ValueError("slab depth must be positive")
+	window = mip_width if mip_width > 1 and mip_axis == 0 else 1
+	output_count = plane_count - window + 1
+	if output_count < 1:
+		raise ValueError("trim and MIP settings produce no output images")
+	halo = 1 if denoise else 0
+	slabs = []
+	for start in range(0, output_count, slab_depth):
+		stop = min(start + slab_depth, output_count)
+		first = max(start - halo, 0)
+		last = min(stop + halo, output_count)
+		slabs.append(
+			PipelineSlab(
+				start=start,
+				stop=stop,
+				read_start=first,
+				read_stop=last + window - 1,
+				keep_start=start - first,
+			)
+		)
+	return tuple(slabs)
+
+
+def _slab_targets(
+	items: tuple[StackMapItem, ...],
+	slab: PipelineSlab,
+	flip_axis: int | None,
+) -> tuple[StackMapItem, ...]:
+	if flip_axis == 0:
+		return tuple(
+			items[len(items) - 1 - index]
+			for index in range(slab.start, slab.stop)
+		)
+	return items[slab.start:slab.stop]
+
+
+def _streamed_mask_value(
+	selected: tuple[Path, ...],
+	buffer: np.ndarray,
+	layout,
+	workers: int,
+	slab_depth: int,
+	stage_options: dict,
+):
+	"""Resolve the whole-volume post-MIP minimum one slab at a time."""
+	options = dict(
+		stage_options,
+		circ_mask_ratio=None,
+		denoise_mode=None,
+		denoise_threshold=None,
+	)
+	minimum = None
+	for slab in plan_pipeline_slabs(
+		len(selected),
+		slab_depth,
+		mip_width=options["mip_width"],
+		mip_axis=options["mip_axis"],
+	):
+		planes = read_tiff_planes(
+			selected[slab.read_start:slab.read_stop],
+			buffer,
+			workers,
+			layout,
+		)
+		value = np.min(_volume_stages(planes, **options))
+		minimum = value if minimum is None else min(minimum, value)
+	return minimum
+
+
+def streamed_normalization_bounds(
+	inputs: tuple[Path, ...],
+	normalize_range: tuple[float, float],
+	workers: int,
+	layout: tuple[tuple[int, int], np.dtype] | None = None,
+) -> tuple[float, float]:
+	"""Resolve whole-volume percentile bounds reading one plane per worker.
+
+	Integer inputs up to 16 bits need one read of the stack; wider integers and
+	floats read it twice, once for their range and once for the histogram.
+	"""
+	image_shape, dtype = tiff_stack_layout(inputs) if layout is None else layout
+	sketch = PercentileSketch(dtype)
+	updates = (
+		(sketch.observe, sketch.accumulate)
+		if sketch.needs_second_pass
+		else (sketch.observe,)
+	)
+	for update in updates:
+		run_parallel(
+			_update_from_tiff,
+			((path, image_shape, dtype, update) for path in inputs),
+			min(workers, len(inputs)),
+			pool_factory=ThreadPool,
+		)
+	return sketch.percentiles(normalize_range)
+
+
+def stream_transform_pipeline(
+	inputs: tuple[Path, ...],
+	items: tuple[StackMapItem, ...],
+	*,
+	slab_depth: int,
+	workers: int,
+	compression: str | None,
+	normalize_range: tuple[float, float] | None = None,
+	normalize_bounds: tuple[float, float] | None = None,
+	vertical_trim=(0.0, 0.0),
+	horizontal_trim=(0.0, 0.0),
+	z_trim=(0.0, 0.0),
+	mip_width: int = 0,
+	mip_axis: int = 0,
+	circ_mask_ratio: float | None = None,
+	denoise_mode: str | None = None,
+	denoise_threshold: float | None = None,
+	flip_axis: int | None = None,
+	out_dtype: np.dtype | type | None = np.uint8,
+	bin_power: int = 0,
+	fused: bool = False,
+) -> tuple[Path, ...]:
+	"""Run the fused chain over overlapping Z slabs and write as each finishes.
+
+	Peak memory is bounded by one slab plus its halo instead of the full
+	volume, and every written plane matches the in-memory
+	``apply_transform_pipeline`` result given the same normalization bounds.
+	Whole-volume reductions are resolved with extra streamed reads first:
+	percentile bounds through ``streamed_normalization_bounds`` unless
+	``normalize_bounds`` is supplied, and the minimum an unnormalized circular
+	mask fills with. ``fused=True`` runs each slab through the per-plane
+	``fused_transform_pipeline`` kernel, which does not support denoising.
+	"""
+	if mip_width < 0:
+		raise ValueError("MIP width cannot be negative")
+	_validate_normalize_range(normalize_range)
+	_validate_denoise_config(denoise_mode, denoise_threshold)
+	if fused and denoise_mode is not None:
+		raise ValueError("fused execution does not support denoising")
+	layout = tiff_stack_layout(inputs)
+	if normalize_range is not None and normalize_bounds is None:
+		normalize_bounds = streamed_normalization_bounds(
+			inputs,
+			normalize_range,
+			workers,
+			layout,
+		)
+		log.write(
+			"Normalization",
+			f"{normalize_range[0]}-{normalize_range[1]} percentiles: "
+			f"{normalize_bounds[0]:.4g} to {normalize_bounds[1]:.4g}",
+			log_level=LOG.INFO,
+		)
+	selected = inputs[cli.crop_val(z_trim, len(inputs))]
+	slabs = plan_pipeline_slabs(
+		len(selected),
+		slab_depth,
+		mip_width=mip_width,
+		mip_axis=mip_axis,
+		denoise=denoise_mode is not None,
+	)
+	if slabs[-1].stop != len(items):
+		raise ValueError(
+			f"output plane count {slabs[-1].stop} does not match path count {len(items)}"
+		)
+	buffer = np.empty(
+		(max(slab.read_depth for slab in slabs),) + layout[0],
+		dtype=layout[1],
+	)
+	stage_options = {
+		"normalize_range": normalize_range,
+		"normalize_bounds": normalize_bounds,
+		"vertical_trim": vertical_trim,
+		"horizontal_trim": horizontal_trim,
+		"z_trim": (0, 0),
+		"mip_width": mip_width,
+		"mip_axis": mip_axis,
+		"circ_mask_ratio": circ_mask_ratio,
+		"circ_mask_value": None,
+		"denoise_mode": denoise_mode,
+		"denoise_threshold": denoise_threshold,
+	}
+	if circ_mask_ratio is not None and normalize_range is None:
+		stage_options["circ_mask_value"] = _streamed_mask_value(
+			selected,
+			buffer,
+			layout,
+			workers,
+			slab_depth,
+			stage_options,
+		)
+
+	written = []
+	for slab in slabs:
+		planes = read_tiff_planes(
+			selected[slab.read_start:slab.read_stop],
+			buffer,
+			workers,
+			layout,
+		)
+		if fused:
+			transformed = fused_transform_pipeline(
+				planes,
+				normalize_bounds=normalize_bounds,
+				vertical_trim=vertical_trim,
+				horizontal_trim=horizontal_trim,
+				mip_width=mip_width,
+				mip_axis=mip_axis,
+				circ_mask_ratio=circ_mask_ratio,
+				circ_mask_value=stage_options["circ_mask_value"],
+				flip_axis=None if flip_axis == 0 else flip_axis,
+				out_dtype=out_dtype,
+				bin_power=bin_power,
+				workers=workers,
+			)
+		else:
+			kept = _volume_stages(planes, **stage_options)[
+				slab.keep_start:slab.keep_start + slab.stop - slab.start
+			]
+			transformed = _plane_stages(
+				kept,
+				flip_axis=None if flip_axis == 0 else flip_axis,
+				out_dtype=out_dtype,
+				bin_power=bin_power,
+			)
+		written.extend(
+			write_pipeline_outputs(
+				transformed,
+				_slab_targets(items, slab, flip_axis),
+				compression=compression,
+				workers=workers,
+			)
+		)
+		log.write(
+			"Slab Written",
+			f"Planes {slab.start}-{slab.stop - 1} from {slab.read_depth} inputs",
+			log_level=LOG.INFO,
+		)
+	return tuple(written)
+
+
 @click.command()
 @click.option(
 	"-n",
@@ -438,6 +813,19 @@ def write_pipeline_outputs(
 	show_default=True,
 	help="Worker threads used for TIFF reads and writes.",
 )
+@click.option(
+	"--slab-depth",
+	type=click.IntRange(min=0),
+	default=0,
+	show_default=True,
+	help="Stream output in Z slabs of N planes; 0 loads the whole volume.",
+)
+@click.option(
+	"--fused/--staged",
+	default=False,
+	show_default=True,
+	help="Run normalize through binning per plane in reusable scratch buffers.",
+)
 @click.option(
 	"--compressed/--uncompressed",
 	default=False,
@@ -464,13 +852,17 @@ def pipeline(
 	out_dtype,
 	bin_power,
 	processes,
+	slab_depth,
+	fused,
 	compressed,
 	execute,
 ):
 	"""Apply an ordered operation chain with one TIFF read and write per plane.
 
 	Order: normalize, trim, MIP, circular mask, denoise, flip, dtype conversion,
-	spatial binning, then compression/write.
+	spatial binning, then compression/write. ``--slab-depth`` bounds memory by
+	streaming overlapping Z slabs instead of loading the whole volume, and
+	``--fused`` replaces the per-stage volume copies with one per-plane kernel.
 	"""
 	log.start()
 	inputs = require_tiff_paths(data_dir)
@@ -490,6 +882,8 @@ def pipeline(
 		_validate_denoise_config(denoise_mode, denoise_threshold)
 	except ValueError as error:
 		raise click.UsageError(str(error)) from error
+	if fused and denoise_mode is not None:
+		raise click.UsageError("--fused cannot be combined with --denoise-mode")
 	items = plan_pipeline_outputs(
 		inputs,
 		output_dir,
@@ -508,14 +902,13 @@ def pipeline(
 			)
 		return
 
-	with shared_tiff_volume(inputs, processes) as volume:
-		log.write(
-			"Image Load",
-			f"Read {len(inputs)} images once into shared memory {volume.shape}",
-			log_level=LOG.INFO,
-		)
-		transformed = apply_transform_pipeline(
-			volume,
+	if slab_depth:
+		stream_transform_pipeline(
+			inputs,
+			items,
+			slab_depth=slab_depth,
+			workers=processes,
+			compression=compression_for(compressed),
 			normalize_range=normalize_range,
 			vertical_trim=vertical_trim,
 			horizontal_trim=horizontal_trim,
@@ -528,7 +921,63 @@ def pipeline(
 			flip_axis=resolved_flip_axis,
 			out_dtype=out_dtype.nptype,
 			bin_power=bin_power,
+			fused=fused,
+		)
+		log.write("Complete", f"Streamed {len(items)} transformed images")
+		return
+
+	sketch = (
+		None
+		if normalize_range is None
+		else PercentileSketch(tiff_stack_layout(inputs)[1])
+	)
+	with shared_tiff_volume(
+		inputs,
+		processes,
+		on_plane=None if sketch is None else sketch.observe,
+	) as volume:
+		log.write(
+			"Image Load",
+			f"Read {len(inputs)} images once into shared memory {volume.shape}",
+			log_level=LOG.INFO,
 		)
+		normalize_bounds = (
+			None
+			if sketch is None
+			else resolve_percentiles(sketch, volume, normalize_range, processes)
+		)
+		if fused:
+			transformed = fused_transform_pipeline(
+				volume,
+				normalize_bounds=normalize_bounds,
+				vertical_trim=vertical_trim,
+				horizontal_trim=horizontal_trim,
+				z_trim=z_trim,
+				mip_width=mips,
+				mip_axis=axis,
+				circ_mask_ratio=circ_mask_ratio,
+				flip_axis=resolved_flip_axis,
+				out_dtype=out_dtype.nptype,
+				bin_power=bin_power,
+				workers=processes,
+			)
+		else:
+			transformed = apply_transform_pipeline(
+				volume,
+				normalize_range=normalize_range,
+				normalize_bounds=normalize_bounds,
+				vertical_trim=vertical_trim,
+				horizontal_trim=horizontal_trim,
+				z_trim=z_trim,
+				mip_width=mips,
+				mip_axis=axis,
+				circ_mask_ratio=circ_mask_ratio,
+				denoise_mode=denoise_mode,
+				denoise_threshold=denoise_threshold,
+				flip_axis=resolved_flip_axis,
+				out_dtype=out_dtype.nptype,
+				bin_power=bin_power,
+			)
 		write_pipeline_outputs(
 			transformed,
 			items,
@@ -10,6 +10,9 @@ import tifffile as tf
 from mctutil.shared.log import log, LOG
 
 
+DENOISE_CHUNK = 16
+
+
 def _validate_triplet(images):
 	triplet = np.asarray(images)
 	if triplet.ndim != 3 or triplet.shape[0] != 3:
@@ -48,6 +51,75 @@ def flat_denoised_center(images, threshold):
 	return result
 
 
+def _validate_denoise_mode(mode, threshold):
+	if mode == "threshold":
+		if threshold is None or not 0 <= threshold <= 1:
+			raise ValueError("threshold denoise requires a fraction between 0 and 1")
+	elif mode == "flat":
+		if threshold is None:
+			raise ValueError("flat denoise requires an absolute threshold")
+	else:
+		raise ValueError(f"unsupported denoise mode: {mode}")
+
+
+def _triplet_gaps(volume, threshold):
+	"""Return each center's ``(max - min) * threshold`` over its whole triplet.
+
+	Per-plane extrema are reduced once and combined with a rolling window of
+	three, instead of re-reducing every overlapping triplet.
+	"""
+	plane_max = np.max(volume, axis=(1, 2))
+	plane_min = np.min(volume, axis=(1, 2))
+	high = np.maximum(np.maximum(plane_max[:-2], plane_max[1:-1]), plane_max[2:])
+	low = np.minimum(np.minimum(plane_min[:-2], plane_min[1:-1]), plane_min[2:])
+	return (high.astype(np.float64) - low.astype(np.float64)) * threshold
+
+
+def denoised_centers(volume, mode, threshold, *, out=None, chunk=DENOISE_CHUNK):
+	"""Denoise every interior Z plane at once from shifted ``Z-1/Z/Z+1`` views.
+
+	Results match ``threshold_denoised_center``/``flat_denoised_center``
+	applied to each triplet. Work proceeds ``chunk`` centers at a time so the
+	float64 temporaries stay bounded, and results land in ``out`` (shape
+	``(Z - 2, Y, X)``), which is allocated when omitted.
+	"""
+	array = np.asarray(volume)
+	if array.ndim != 3 or len(array) < 3:
+		raise ValueError(
+			f"denoise centers require at least three ZYX planes; got {array.shape}"
+		)
+	_validate_denoise_mode(mode, threshold)
+	if chunk < 1:
+		raise ValueError("denoise chunk must be positive")
+	if out is None:
+		out = np.empty((len(array) - 2,) + array.shape[1:], dtype=array.dtype)
+	before, center, after = array[:-2], array[1:-1], array[2:]
+	gaps = _triplet_gaps(array, threshold) if mode == "threshold" else None
+	for start in range(0, len(center), chunk):
+		stop = min(start + chunk, len(center))
+		target = out[start:stop]
+		target[...] = center[start:stop]
+		if mode == "flat":
+			mask = np.logical_and(
+				before[start:stop] < threshold,
+				after[start:stop] < threshold,
+			)
+			target[mask] = 0
+			continue
+		previous = before[start:stop].astype(np.float64, copy=False)
+		following = after[start:stop].astype(np.float64, copy=False)
+		current = center[start:stop].astype(np.float64, copy=False)
+		gap = gaps[start:stop, np.newaxis, np.newaxis]
+		mask = np.logical_and(
+			np.abs(current - previous) > gap,
+			np.abs(current - following) > gap,
+		)
+		replacement = previous + following
+		replacement /= 2
+		np.copyto(target, replacement, where=mask, casting="unsafe")
+	return out
+
+
 def denoised_volume(volume, mode, threshold, *, boundary="preserve"):
 	"""Denoise every interior Z plane without performing any image I/O.
 
@@ -61,43 +133,33 @@ def denoised_volume(volume, mode, threshold, *, boundary="preserve"):
 		raise ValueError(f"unsupported denoise mode: {mode}")
 	if boundary not in {"preserve", "drop"}:
 		raise ValueError(f"unsupported denoise boundary policy: {boundary}")
-	operation = (
-		threshold_denoised_center
-		if mode == "threshold"
-		else flat_denoised_center
-	)
 	if len(array) < 3:
 		if boundary == "preserve":
 			return np.array(array, copy=True)
 		return np.empty((0,) + array.shape[1:], dtype=array.dtype)
-	centers = np.stack(
-		tuple(
-			operation(array[index - 1:index + 2], threshold)
-			for index in range(1, len(array) - 1)
-		),
-		axis=0,
-	)
 	if boundary == "drop":
-		return centers
-	result = np.array(array, copy=True)
-	result[1:-1] = centers
+		return denoised_centers(array, mode, threshold)
+	result = np.empty(array.shape, dtype=array.dtype)
+	result[0] = array[0]
+	result[-1] = array[-1]
+	denoised_centers(array, mode, threshold, out=result[1:-1])
 	return result
 
 
-def denoise_threshold(input_paths, output_path, threshold):
+def denoise_chunk(input_paths, output_paths, mode, threshold):
+	"""Read one run of planes once and write its denoised interior planes."""
 	base_data = np.stack(tuple(tf.imread(infile) for infile in input_paths))
-	output = threshold_denoised_center(base_data, threshold)
+	centers = denoised_centers(base_data, mode, threshold)
 	log.write(
 		"Simple Denoise",
-		f"threshold={threshold}; inputs={[path.name for path in input_paths]}",
+		f"{mode} threshold={threshold}; {input_paths[1].name}-{input_paths[-2].name}",
 		log_level=LOG.INFO,
 	)
-	tf.imwrite(output_path, output.astype(np.uint16))
-
-
-def denoise_flat(input_paths, output_path, threshold):
-	base_data = np.stack(tuple(tf.imread(infile) for infile in input_paths))
-	tf.imwrite(output_path, flat_denoised_center(base_data, threshold))
+	for output_path, output in zip(output_paths, centers):
+		tf.imwrite(
+			output_path,
+			output.astype(np.uint16) if mode == "threshold" else output,
+		)
 
 
 @click.command()
@@ -106,24 +168,31 @@ def denoise_flat(input_paths, output_path, threshold):
 				help="Difference threshold to mark as noise above.")
 @click.option("-n", "--num-processes", type=click.INT, default=psutil.cpu_count(),
 				help="Number of simultaneous processes.")
+@click.option("-c", "--chunk-size", type=click.IntRange(min=1), default=DENOISE_CHUNK, show_default=True,
+				help="Output planes denoised per worker task; each task reads its planes once.")
 @click.option("--flat-denoise/--threshold-denoise", type=click.BOOL, default=False,
 				help="Whether to use a ")
 @click.argument("INPUTDIR", type=click.Path(path_type=Path, file_okay=False), required=True)
 @click.argument("OUTPUTDIR", type=click.Path(path_type=Path, file_okay=False), required=True)
-def simple_denoise(threshold, area, num_processes, flat_denoise, inputdir, outputdir):
+def simple_denoise(threshold, area, num_processes, chunk_size, flat_denoise, inputdir, outputdir):
 	input_paths = natsorted(list(inputdir.glob("**/*.tif*")))
 
 	outputdir.mkdir(parents=True, exist_ok=True)
+	mode = "flat" if flat_denoise else "threshold"
+	log.write("Simple Denoise", f"Mode: {mode} ({len(input_paths)} inputs)", log_level=LOG.STATUS)
+	centers = range(1, len(input_paths) - 1)
+	tasks = [
+		(
+			input_paths[run[0] - 1:run[-1] + 2],
+			[outputdir.joinpath(input_paths[i].name) for i in run],
+			mode,
+			threshold,
+		)
+		for run in (centers[start:start + chunk_size] for start in range(0, len(centers), chunk_size))
+	]
 
 	with Pool(num_processes) as pool:
-		if flat_denoise:
-			log.write("Simple Denoise", "Mode: flat", log_level=LOG.STATUS)
-			pool.starmap(denoise_flat, [(input_paths[i - 1: i + 2], outputdir.joinpath(input_paths[i].name), threshold)
-										for i in range(1, len(input_paths) - 1)])
-		else:
-			log.write("Simple Denoise", f"Mode: threshold ({len(input_paths)} inputs)", log_level=LOG.STATUS)
-			pool.starmap(denoise_threshold, [(input_paths[i - 1: i + 2], outputdir.joinpath(input_paths[i].name), threshold)
-											for i in range(1, len(input_paths) - 1)])
+		pool.starmap(denoise_chunk, tasks)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
 from pathlib import Path
 from multiprocessing import Pool
+import time
 import uuid
 
 import click
@@ -15,10 +17,19 @@ from mctutil.shared.log import log, LOG
 from mctutil.shared import cli
 from mctutil.shared.io_helpers import (
 	FLAT,
+	RawReadPool,
 	distribute_read as distribute_offset_reads,
 	offset_reads,
 )
 from mctutil.shared.mem import SharedNP, ProjOrder, SinoOrder
+from mctutil.shared.tiff_layout import (
+	TiffLayout,
+	common_geometry,
+	decode_alignment,
+	inspect_layouts,
+	layout_reads,
+	summarize_layouts,
+)
 
 
 MODE = click.Choice(["full", "preproc"], case_sensitive=False)
@@ -58,6 +69,13 @@ def sino_write(sino_mem: SharedNP, path: PathLike, i, out_type: cli.NumpyCLI = N
 			log.write("Dry Run", f"Would write {path}")
 
 
+def timed_sino_write(*args) -> float:
+	"""Run ``sino_write`` and return the seconds this worker spent on it."""
+	started = time.perf_counter()
+	sino_write(*args)
+	return time.perf_counter() - started
+
+
 def image_bounds(sino_mem: SharedNP, i: int = None):
 	if i is None:
 		with sino_mem as sino:
@@ -106,6 +124,24 @@ def validate_mode(mode: str, flat_dir: Path | None):
 		raise click.UsageError("--flat-dir is required when --mode=full.")
 
 
+def _projection_reads(image, pj, rows: range, target_offset: int, target_stride: int):
+	"""Reads for ``rows`` of one projection; a bare path is one contiguous strip at ``pj["offset"]``."""
+	if isinstance(image, TiffLayout):
+		return layout_reads(image, rows, target_offset, target_stride)
+	h_step = pj["x"] * pj["bytesize"]
+	source_offset = pj["offset"] + rows.start * h_step
+	if target_stride == h_step:
+		return offset_reads(image, source_offset=source_offset, target_offset=target_offset, size=len(rows) * h_step)
+	return offset_reads(
+		image,
+		source_offset=source_offset,
+		target_offset=target_offset,
+		size=h_step,
+		count=len(rows),
+		target_stride=target_stride,
+	)
+
+
 def distribute_read(
 	target_mem: SharedNP,
 	pj,
@@ -114,12 +150,18 @@ def distribute_read(
 	image_order,
 	thread_max: int = cpu_count(),
 	sino_order: bool = True,
+	pool: RawReadPool | None = None,
 ):
-	"""Map TIFF byte spans into the projection or sinogram buffer layout."""
+	"""Map TIFF rows into the projection or sinogram buffer layout.
+
+	``image_order`` yields ``(projection_index, image)`` where each image is a
+	``TiffLayout``, or a path laid out as one contiguous strip at ``pj["offset"]``.
+	"""
 	h_step = pj["x"] * pj["bytesize"]
 	sino_block_size = target_mem.shape.Theta * h_step
 	proj_block_size = len(int_window) * h_step
 	base_offset = int(target_mem[int_window].buffer_address.start)
+	rows = range(window.start, window.start + len(int_window))
 	reads = []
 
 	if sino_order:
@@ -130,14 +172,7 @@ def distribute_read(
 			log_level=LOG.INFO,
 		)
 		for projection_index, image in image_order:
-			reads.extend(offset_reads(
-				image,
-				source_offset=pj["offset"] + window.start * h_step,
-				target_offset=base_offset + projection_index * h_step,
-				size=h_step,
-				count=len(int_window),
-				target_stride=sino_block_size,
-			))
+			reads.extend(_projection_reads(image, pj, rows, base_offset + projection_index * h_step, sino_block_size))
 	else:
 		log.write(
 			"Files Into Memory",
@@ -146,15 +181,150 @@ def distribute_read(
 			+ f"{target_mem[int_window].buffer_address}",
 			log_level=LOG.INFO,
 		)
+		projection_stride = target_mem.shape[1] * h_step
 		for projection_index, image in image_order:
-			reads.extend(offset_reads(
-				image,
-				source_offset=pj["offset"] + window.start * h_step,
-				target_offset=base_offset + projection_index * proj_block_size,
-				size=proj_block_size,
-			))
+			reads.extend(_projection_reads(image, pj, rows, base_offset + projection_index * projection_stride, h_step))
+
+	stats = distribute_offset_reads(target_mem, reads, thread_max=thread_max, pool=pool)
+	log.write(
+		"Read Coalescing",
+		f"{len(reads)} read(s) -> {stats.syscalls} read call(s), {stats.nbytes / 1e6:.1f} MB, "
+		+ f"{stats.bytes_per_syscall / 1e3:.1f} kB per call"
+		+ (f"; {stats.decoded} segment(s) decoded" if stats.decoded else ""),
+		log_level=LOG.INFO,
+	)
+
+
+class WindowPipeline:
+	"""Double-buffered read -> normalize -> write pipeline over sinogram windows.
+
+	One process pool serves every window. Window N+1 is read into the spare
+	input buffer on a background thread while window N is normalized, and each
+	window's writes run asynchronously out of its own sinogram buffer, which is
+	only reused once those writes finished.
+	"""
+
+	def __init__(self, pool, reader_pool, pj, images, flats_mem, input_mems, sino_mems, output_paths,
+				process_count: int, execute=True):
+		self.pool = pool
+		self.reader_pool = reader_pool
+		self.pj = pj
+		self.images = images
+		self.flats_mem = flats_mem
+		self.input_mems = input_mems
+		self.sino_mems = sino_mems
+		self.output_paths = output_paths
+		self.process_count = process_count
+		self.execute = execute
+		self.seconds = {"read": 0.0, "read wait": 0.0, "normalize": 0.0, "write": 0.0}
+		self.read_bytes = 0
+		self.rows = 0
+
+	def read(self, slot: int, window: range) -> float:
+		started = time.perf_counter()
+		distribute_read(
+			self.input_mems[slot],
+			self.pj,
+			window,
+			range(0, len(window)),
+			enumerate(self.images),
+			thread_max=self.process_count,
+			sino_order=False,
+			pool=self.reader_pool,
+		)
+		return time.perf_counter() - started
+
+	def normalize(self, slot: int, window: range) -> None:
+		started = time.perf_counter()
+		sino_mem = self.sino_mems[slot]
+		self.pool.starmap(
+			weighted_normalize,
+			[(sino_mem, self.input_mems[slot], self.flats_mem, window, range(0, len(window)), i, sino_mem.shape.Theta)
+				for i in range(sino_mem.shape.Theta)],
+		)
+		self.seconds["normalize"] += time.perf_counter() - started
+
+	def write(self, slot: int, window: range):
+		if self.execute:
+			for section_dir in set([fullpath.parent for fullpath in self.output_paths[window.start:window.stop]]):
+				section_dir.mkdir(parents=True, exist_ok=True)
+
+		def finished(durations):
+			self.seconds["write"] += sum(durations)
+
+		return self.pool.starmap_async(
+			timed_sino_write,
+			[(self.sino_mems[slot], self.output_paths[i + window.start], i, None, self.execute)
+				for i in range(len(window))],
+			callback=finished,
+		)
 
-	distribute_offset_reads(target_mem, reads, thread_max=thread_max)
+	def run(self, windows: list[range], output_dir: Path) -> None:
+		writes = [None, None]
+		with ThreadPoolExecutor(max_workers=1) as prefetch:
+			pending_read = prefetch.submit(self.read, 0, windows[0]) if windows else None
+			for number, window in enumerate(windows):
+				slot = number % 2
+				log.write("Cycle Start", f"Window {window}; Buffer {slot}")
+				waited = time.perf_counter()
+				self.seconds["read"] += pending_read.result()
+				self.seconds["read wait"] += time.perf_counter() - waited
+				self.read_bytes += len(self.images) * len(window) * self.pj["x"] * self.pj["bytesize"]
+				log.write("Files Read", f"Window {window}; Buffer {slot}")
+				if number + 1 < len(windows):
+					pending_read = prefetch.submit(self.read, 1 - slot, windows[number + 1])
+				if writes[slot] is not None:
+					writes[slot].get()
+				self.normalize(slot, window)
+				writes[slot] = self.write(slot, window)
+				self.rows += len(window)
+				log.write(
+					"Files Queued",
+					f"{output_dir} : {window} ({'writing' if self.execute else 'planning'})",
+					LOG.TIME,
+				)
+		for pending_write in writes:
+			if pending_write is not None:
+				pending_write.get()
+		self.report()
+
+	def report(self) -> None:
+		"""Log each stage's busy time and throughput.
+
+		Write time is summed inside the workers, so it excludes time queued
+		behind normalization and is reported per worker.
+		"""
+		read_seconds = max(self.seconds["read"], 1e-9)
+		log.write(
+			"Read Throughput",
+			f"{self.read_bytes / 1e6:.1f} MB in {self.seconds['read']:.2f} s "
+			+ f"({self.read_bytes / 1e6 / read_seconds:.1f} MB/s); "
+			+ f"{self.seconds['read wait']:.2f} s spent waiting on reads",
+			LOG.TIME,
+		)
+		seconds = self.seconds["normalize"]
+		log.write(
+			"Normalize Throughput",
+			f"{self.rows} sinogram(s) in {seconds:.2f} s ({self.rows / max(seconds, 1e-9):.1f}/s)",
+			LOG.TIME,
+		)
+		seconds = self.seconds["write"]
+		log.write(
+			"Write Throughput",
+			f"{self.rows} sinogram(s) in {seconds:.2f} worker-s ({self.rows / max(seconds, 1e-9):.1f}/s per worker)",
+			LOG.TIME,
+		)
+
+
+def plan_windows(rows: range, size: int, alignment: int = 1) -> list[range]:
+	"""Split ``rows`` into windows of at least ``size`` rows on multiples of ``alignment``.
+
+	The window size is rounded up to a multiple of ``alignment`` and windows
+	start on multiples of it, so no decoded segment straddles two windows.
+	"""
+	size = -(-size // alignment) * alignment
+	starts = range(rows.start - rows.start % alignment, rows.stop, size)
+	return [range(max(start, rows.start), min(start + size, rows.stop)) for start in starts]
 
 
 def run_full(input_dir: Path, output_dir: Path, flat_dir: Path, process_count: int, sectioning: int,
@@ -163,20 +333,21 @@ def run_full(input_dir: Path, output_dir: Path, flat_dir: Path, process_count: i
 	segment_id = str(uuid.uuid4())
 	internal_dtype = np.float32
 
-	with tf.TiffFile(image_paths[0]) as tif:
-		page = tif.pages[0]
-		pj = {
-			"dtype": page.dtype,
-			"bytesize": page.dtype.itemsize,
-			"offset": page.dataoffsets[0],
-			"x": page.shape[1],
-			"y": page.shape[0],
-		}
+	layouts = inspect_layouts(image_paths)
+	(height, width), dtype = common_geometry(layouts)
+	pj = {"dtype": dtype, "bytesize": dtype.itemsize, "x": width, "y": height}
+	log.write("Input Layout", summarize_layouts(layouts))
 
-	if sino_range is None:
-		sino_split = range(0, pj["y"], process_count)
-	else:
-		sino_split = range(sino_range.start, sino_range.stop, process_count)
+	alignment = min(decode_alignment(layouts), pj["y"])
+	windows = plan_windows(range(0, pj["y"]) if sino_range is None else sino_range, process_count, alignment)
+	window_rows = max((len(window) for window in windows), default=process_count)
+	if window_rows > process_count:
+		log.write(
+			"Window Alignment",
+			f"decoded inputs store {alignment}-row segments; reading {window_rows}-row windows "
+			+ "so each segment is decoded once",
+			log_level=LOG.WARN,
+		)
 
 	if sectioning:
 		output_paths = [
@@ -191,9 +362,9 @@ def run_full(input_dir: Path, output_dir: Path, flat_dir: Path, process_count: i
 			output_dir.mkdir(parents=True, exist_ok=True)
 		output_paths = [output_dir.joinpath(f"sino_{x:05}.tiff") for x in range(pj["y"])]
 
-	sino_shape = SinoOrder(process_count, len(image_paths), pj["x"])
-	proj_shape = ProjOrder(len(image_paths), process_count, pj["x"])
-	log.write("Setup", f"{pj}")
+	sino_shape = SinoOrder(window_rows, len(image_paths), pj["x"])
+	proj_shape = ProjOrder(len(image_paths), window_rows, pj["x"])
+	log.write("Setup", f"{pj}; double-buffered {sino_shape} from {proj_shape}")
 
 	with (
 		SharedNP(
@@ -202,46 +373,31 @@ def run_full(input_dir: Path, output_dir: Path, flat_dir: Path, process_count: i
 			ProjOrder(len(FLAT), pj["y"], pj["x"]),
 			create=True,
 		) as flats_mem,
-		SharedNP(f"sino_{segment_id}", internal_dtype, sino_shape, create=True) as sino_mem,
-		SharedNP(f"input_{segment_id}", pj["dtype"], proj_shape, create=True) as input_mem,
+		SharedNP(f"sino_{segment_id}_0", internal_dtype, sino_shape, create=True) as sino_mem_0,
+		SharedNP(f"sino_{segment_id}_1", internal_dtype, sino_shape, create=True) as sino_mem_1,
+		SharedNP(f"input_{segment_id}_0", pj["dtype"], proj_shape, create=True) as input_mem_0,
+		SharedNP(f"input_{segment_id}_1", pj["dtype"], proj_shape, create=True) as input_mem_1,
+		# Fork the normalize/write pool before any thread exists; the spawned
+		# readers' executor starts a management thread.
+		Pool(process_count) as pool,
+		RawReadPool(process_count).start() as reader_pool,
 	):
 		with flats_mem as flat_set:
 			for flat in list(FLAT):
 				flat_set[flat.index, :, :] = tf.imread(flat_dir.joinpath(f"{flat}_median.tiff")).astype(internal_dtype)
 
-		for x in sino_split:
-			window = range(x, min(x + process_count, sino_split.stop))
-			internal_window = range(0, len(window))
-			log.write("Cycle Start", f"Window {window}; Internal {internal_window}; Shape {sino_shape} from {proj_shape}")
-			distribute_read(
-				input_mem,
-				pj,
-				window,
-				internal_window,
-				enumerate(image_paths),
-				thread_max=process_count,
-				sino_order=False,
-			)
-			log.write("Files Read", f"Window {window}; Shape {proj_shape}")
-			with Pool(process_count) as pool:
-				pool.starmap(
-					weighted_normalize,
-					[(sino_mem, input_mem, flats_mem, window, internal_window, i, sino_mem.shape.Theta)
-						for i in range(sino_mem.shape.Theta)],
-				)
-			if execute:
-				for section_dir in set([fullpath.parent for fullpath in output_paths[window.start:window.stop]]):
-					section_dir.mkdir(parents=True, exist_ok=True)
-			with Pool(process_count) as pool:
-				pool.starmap(
-					sino_write,
-					[(sino_mem, output_paths[i + window.start], i, None, execute) for i in internal_window],
-				)
-			log.write(
-				"Files Written",
-				f"{output_dir} : {window} ({'written' if execute else 'planned'})",
-				LOG.TIME,
-			)
+		WindowPipeline(
+			pool,
+			reader_pool,
+			pj,
+			layouts,
+			flats_mem,
+			(input_mem_0, input_mem_1),
+			(sino_mem_0, sino_mem_1),
+			output_paths,
+			process_count,
+			execute=execute,
+		).run(windows, output_dir)
 
 
 def run_preproc(input_dir: Path, output_dir: Path, process_count: int, min_val: float | None, max_val: float | None,
@@ -8,18 +8,18 @@ import tifffile as tf
 
 
 from mctutil.shared.log import log
-from mctutil.shared.io_helpers import byteread_helper
+from mctutil.shared.io_helpers import RawReadPool
 from mctutil.shared.mem import SharedNP, ReconOrder
+from mctutil.shared.tiff_layout import common_geometry, inspect_layouts, layout_reads, summarize_layouts
 
 
 MODE = click.Choice(["shared", "naive"], case_sensitive=False)
 
 
-def get_details(path, stack_levels):
-	flist = list(Path(path).iterdir())
-	with tf.TiffFile(flist[0]) as tif:
-		page = tif.pages[0]
-		return page.dtype, (ReconOrder(len(flist), stack_levels, page.shape[1])), page.dataoffsets[0]
+def get_details(im_list, stack_levels):
+	layouts = inspect_layouts(im_list)
+	(_, width), dtype = common_geometry(layouts)
+	return dtype, ReconOrder(len(layouts), stack_levels, width), layouts
 
 
 def transpose_write(recon_mem: SharedNP, path, i):
@@ -72,25 +72,27 @@ def transpose_stack(mode, path, stack_start, stack_levels, pixel_shift, out_name
 		transpose_naive(path, out_path, out_name)
 		return
 
-	recon_dtype, recon_shape, base_offset = get_details(path, stack_levels)
 	im_list = sorted(list(Path(path).iterdir()))
-	log.write("Setup", f"Shape {recon_shape}; Type {recon_dtype}; offset {base_offset}")
+	recon_dtype, recon_shape, layouts = get_details(im_list, stack_levels)
+	log.write("Setup", f"Shape {recon_shape}; Type {recon_dtype}; {summarize_layouts(layouts)}")
 	with SharedNP("Tranpose_Source", recon_dtype, recon_shape, create=True) as tp_mem:
 		itemsize = np.dtype(recon_dtype).itemsize
-		source_offset = base_offset + recon_shape.X * itemsize * stack_start
 		target_offset = tp_mem[0].buffer_address.start
 		line_size = recon_shape.X * itemsize
 		chunk_size = line_size * recon_shape.Z
 
-		log.write("Setup", f"Itemsize {itemsize}; Offset {source_offset}; Line Size {line_size}")
-
-		with Pool(psutil.cpu_count()) as pool:
-			def get_offset(i):
-				return [{"source": source_offset + int(i * pixel_shift) * line_size,
-							"target": target_offset + chunk_size * i}]
-
-			pool.starmap(byteread_helper, [(tp_mem.name, im_list[i], recon_dtype, get_offset(i), chunk_size)
-										for i in range(len(im_list))])
+		log.write("Setup", f"Itemsize {itemsize}; Start Row {stack_start}; Line Size {line_size}")
+
+		reads = []
+		for i, layout in enumerate(layouts):
+			first_row = stack_start + int(i * pixel_shift)
+			reads.extend(layout_reads(
+				layout,
+				range(first_row, first_row + recon_shape.Z),
+				target_offset + chunk_size * i,
+			))
+		with RawReadPool(psutil.cpu_count()) as reader_pool:
+			reader_pool.read(tp_mem, reads)
 
 		log.write("Images Loaded")
 		Path(out_path).mkdir(parents=True, exist_ok=True)
@@ -1,5 +1,9 @@
+from __future__ import annotations
+
+from collections import deque
 from pathlib import Path
 
+from boto3.s3.transfer import TransferConfig
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from queue import Empty as ProgressQueueEmpty, Queue
@@ -18,6 +22,7 @@ from mctutil.shared.log import log, LOG
 from mctutil.shared.mesh import build_mesh
 from mctutil.shared.resource_monitor import record_active_workers
 from mctutil.shared.sharded_tree import read_sharded_scales
+from mctutil.transport.sync_manifest import ManifestEntry, SyncManifest
 
 _sessions = {}
 SYNC_STATUSES = ("planned", "skipped", "uploaded")
@@ -211,12 +216,13 @@ def inventory_sharded_tree(
 	source_folder: Path,
 	target_folder: str,
 	scales: list[tuple[int, str, Path]],
+	include_root: bool = True,
 ) -> list[list[SyncObject]]:
 	"""Enumerate root metadata and selected scale files exactly once."""
 	root_objects = [
 		_sync_object(path, _join_key(target_folder, path.name))
 		for path in sorted(source_folder.iterdir())
-		if path.is_file()
+		if include_root and path.is_file()
 	]
 	groups = [root_objects] if root_objects else []
 	for _mip, key, scale_path in scales:
@@ -237,7 +243,87 @@ def inventory_sharded_tree(
 	return groups
 
 
-def _object_matches(client, item: SyncObject, bucket_name: str) -> bool:
+@dataclass(frozen=True)
+class RemoteObject:
+	"""One listed object's size and ETag."""
+
+	size: int
+	etag: str
+
+
+def list_remote_objects(
+	client,
+	bucket_name: str,
+	prefix: str,
+	*,
+	recursive: bool = True,
+) -> dict[str, RemoteObject]:
+	"""Index every object under ``prefix`` with paginated ListObjectsV2 calls.
+
+	Non-recursive listings stop at the next ``/`` so the root prefix does not
+	enumerate the scale directories below it.
+	"""
+	arguments = {"Bucket": bucket_name, "Prefix": prefix}
+	if not recursive:
+		arguments["Delimiter"] = "/"
+	index = {}
+	for page in client.get_paginator("list_objects_v2").paginate(**arguments):
+		for entry in page.get("Contents", ()):
+			index[entry["Key"]] = RemoteObject(
+				size=int(entry["Size"]),
+				etag=str(entry.get("ETag", "")).strip('"'),
+			)
+	return index
+
+
+def remote_sync_index(
+	client,
+	bucket_name: str,
+	target_folder: str,
+	scales: list[tuple[int, str, Path]],
+	items: list[SyncObject] | None = None,
+) -> dict[str, RemoteObject] | None:
+	"""List the root and each selected scale prefix once.
+
+	When ``items`` is given, prefixes holding none of their keys are not
+	listed. Returns ``None`` when the bucket refuses listing, in which case
+	sync falls back to one HEAD request per object.
+	"""
+	root_prefix = f"{target_folder}/" if target_folder else ""
+	prefixes = [(root_prefix, False)] + [
+		(f"{_join_key(target_folder, key)}/", True)
+		for _mip, key, _scale_path in scales
+	]
+	if items is not None:
+		prefixes = [
+			(prefix, recursive)
+			for prefix, recursive in prefixes
+			if any(
+				item.key.startswith(prefix)
+				and (recursive or "/" not in item.key[len(prefix):])
+				for item in items
+			)
+		]
+	index = {}
+	try:
+		for prefix, recursive in prefixes:
+			index.update(
+				list_remote_objects(client, bucket_name, prefix, recursive=recursive)
+			)
+	except ClientError as exc:
+		code = str(exc.response.get("Error", {}).get("Code", ""))
+		if code not in {"AccessDenied", "403"}:
+			raise
+		log.write(
+			"S3 Upload",
+			f"cannot list s3://{bucket_name}/{root_prefix}; checking objects individually",
+			log_level=LOG.WARN,
+		)
+		return None
+	return index
+
+
+def _head_matches(client, item: SyncObject, bucket_name: str) -> bool:
 	try:
 		remote = client.head_object(Bucket=bucket_name, Key=item.key)
 	except ClientError as exc:
@@ -253,17 +339,50 @@ def _object_matches(client, item: SyncObject, bucket_name: str) -> bool:
 	)
 
 
+def _object_matches(
+	client,
+	item: SyncObject,
+	bucket_name: str,
+	remote: dict[str, RemoteObject] | None = None,
+	confirmed: ManifestEntry | None = None,
+) -> bool:
+	"""Decide skip vs upload, from the listing index when one is available.
+
+	The listing only rules objects out: missing keys and size mismatches
+	upload without a request. A same-size object is unchanged when the
+	manifest entry ``confirmed`` for this size and mtime recorded the listed
+	ETag; otherwise HEAD compares its ``mctutil-mtime-ns`` metadata. Server
+	upload times are never compared with local mtimes, which may be preserved
+	copies or come from a skewed clock.
+	"""
+	if remote is None:
+		return _head_matches(client, item, bucket_name)
+	listed = remote.get(item.key)
+	if listed is None or listed.size != item.size:
+		return False
+	if (
+		confirmed is not None
+		and confirmed.etag
+		and (confirmed.size, confirmed.mtime_ns, confirmed.etag) == (item.size, item.mtime_ns, listed.etag)
+	):
+		return True
+	return _head_matches(client, item, bucket_name)
+
+
 def upload_incremental_file(
 	client,
 	item: SyncObject,
 	bucket_name: str,
 	execute: bool,
 	progress_events: Queue,
+	transfer_config: TransferConfig | None = None,
+	remote: dict[str, RemoteObject] | None = None,
+	confirmed: ManifestEntry | None = None,
 ) -> str:
 	if not execute:
 		progress_events.put(item.size)
 		return "planned"
-	if _object_matches(client, item, bucket_name):
+	if _object_matches(client, item, bucket_name, remote, confirmed):
 		progress_events.put(item.size)
 		return "skipped"
 	transfer_progress = ObjectTransferProgress(item.size, progress_events)
@@ -274,6 +393,7 @@ def upload_incremental_file(
 			item.key,
 			ExtraArgs={"Metadata": item.fingerprint},
 			Callback=transfer_progress,
+			Config=transfer_config,
 		)
 	except Exception as exc:
 		raise RuntimeError(
@@ -283,24 +403,32 @@ def upload_incremental_file(
 	return "uploaded"
 
 
-def _sync_object_group(
-	client,
-	items: list[SyncObject],
-	bucket_name: str,
-	execute: bool,
-	progress_events: Queue,
-) -> SyncSummary:
-	summary = SyncSummary()
-	for item in items:
-		status = upload_incremental_file(
-			client,
-			item,
-			bucket_name,
-			execute,
-			progress_events,
-		)
-		summary.add(status, item.size, item.key)
-	return summary
+def sync_phases(
+	source_folder: Path,
+	groups: list[list[SyncObject]],
+) -> list[list[SyncObject]]:
+	"""Order inventoried objects into barriers: scale data, root files, ``info``.
+
+	Every scale object is uploaded before any root metadata, and the root
+	``info`` is uploaded alone after everything else, so a reader that finds
+	the new ``info`` also finds the shards it declares.
+	"""
+	source_folder = Path(source_folder)
+	items = [item for group in groups for item in group]
+	root = [item for item in items if item.path.parent == source_folder]
+	phases = [
+		[item for item in items if item.path.parent != source_folder],
+		[item for item in root if item.path.name != "info"],
+		[item for item in root if item.path.name == "info"],
+	]
+	return [phase for phase in phases if phase]
+
+
+def _part_transfer_config(jobs: int, remaining: int) -> TransferConfig:
+	"""Lend idle pool slots to multipart parts once fewer objects than jobs remain."""
+	return TransferConfig(
+		max_concurrency=max(1, jobs // max(1, min(jobs, remaining))),
+	)
 
 
 def _drain_progress_events(
@@ -319,51 +447,94 @@ def _drain_progress_events(
 				delta = progress_events.get_nowait()
 		except ProgressQueueEmpty:
 			return
-		progress.update(delta)
+		# Zero-byte events only wake the parent when an object finishes.
+		if delta:
+			progress.update(delta)
 		handled += 1
 
 
-def _execute_sync_groups(
+def _sync_phase(
+	executor: ThreadPoolExecutor,
 	client,
-	groups: list[list[SyncObject]],
+	items: list[SyncObject],
+	bucket_name: str,
+	execute: bool,
+	jobs: int,
+	progress_events: Queue,
+	progress,
+	summary: SyncSummary,
+	remote: dict[str, RemoteObject] | None = None,
+	manifest: SyncManifest | None = None,
+) -> None:
+	"""Upload one phase's objects with at most ``jobs`` in flight.
+
+	Objects are handed out one at a time from a shared queue as workers free
+	up, so a single large scale spreads across the whole pool. No further
+	objects are submitted after a failure. Confirmed objects are recorded in
+	``manifest`` from this thread as they finish.
+	"""
+	queue = deque(items)
+	pending = {}
+	while queue or pending:
+		while queue and len(pending) < jobs:
+			item = queue.popleft()
+			future = executor.submit(
+				upload_incremental_file,
+				client,
+				item,
+				bucket_name,
+				execute,
+				progress_events,
+				_part_transfer_config(jobs, len(queue) + len(pending) + 1),
+				remote,
+				None if manifest is None else manifest.entries.get(item.key),
+			)
+			future.add_done_callback(lambda _future: progress_events.put(0))
+			pending[future] = item
+		_drain_progress_events(progress_events, progress, wait=True)
+		for future in [future for future in pending if future.done()]:
+			item = pending.pop(future)
+			status = future.result()
+			summary.add(status, item.size, item.key)
+			if manifest is not None and status != "planned":
+				listed = None if remote is None else remote.get(item.key)
+				etag = listed.etag if status == "skipped" and listed is not None else None
+				manifest.record(item, etag)
+
+
+def _execute_sync_phases(
+	client,
+	phases: list[list[SyncObject]],
 	bucket_name: str,
 	execute: bool,
 	jobs: int,
 	progress_events: Queue,
 	progress,
+	remote: dict[str, RemoteObject] | None = None,
+	manifest: SyncManifest | None = None,
+	summary: SyncSummary | None = None,
 ) -> SyncSummary:
-	summary = SyncSummary()
-	if not groups:
+	summary = SyncSummary() if summary is None else summary
+	if not phases:
 		return summary
-	max_workers = min(len(groups), jobs + 1)
+	max_workers = min(jobs, max(len(phase) for phase in phases))
 	record_active_workers(max_workers)
 	try:
 		with ThreadPoolExecutor(max_workers=max_workers) as executor:
-			pending = {
-				executor.submit(
-					_sync_object_group,
+			for phase in phases:
+				_sync_phase(
+					executor,
 					client,
-					group,
+					phase,
 					bucket_name,
 					execute,
-					progress_events,
-				)
-				for group in groups
-			}
-			while pending:
-				_drain_progress_events(
+					max_workers,
 					progress_events,
 					progress,
-					wait=True,
+					summary,
+					remote,
+					manifest,
 				)
-				completed = {
-					future
-					for future in pending
-					if future.done()
-				}
-				for future in completed:
-					summary.merge(future.result())
-				pending.difference_update(completed)
 	finally:
 		_drain_progress_events(
 			progress_events,
@@ -400,24 +571,51 @@ def upload_sharded_tree(
 	include_mip0: bool = True,
 	execute: bool = False,
 	aws_profile: str | None = None,
+	verify_remote: bool = False,
+	mips: tuple[int, ...] | None = None,
+	include_root: bool = True,
 ) -> dict[str, int]:
-	"""Incrementally upload root metadata and selected sharded scale dirs."""
+	"""Incrementally upload root metadata and selected sharded scale dirs.
+
+	Files whose size and mtime match the local sync manifest for this
+	destination are skipped without any S3 request unless ``verify_remote``
+	is set; everything else is checked against a listing of its prefix.
+	``mips`` limits the sync to those scales and ``include_root=False``
+	leaves root metadata, including ``info``, for a later full sync.
+	"""
 	aws_profile = configure_aws_profile(aws_profile, bucket_name)
 	source_folder = Path(source_folder)
-	scales = read_sharded_scales(source_folder, include_mip0=include_mip0)
+	scales = read_sharded_scales(source_folder, include_mip0=include_mip0, mips=mips)
 	target_folder = str(target_folder).strip("/")
-	groups = inventory_sharded_tree(source_folder, target_folder, scales)
+	groups = inventory_sharded_tree(source_folder, target_folder, scales, include_root)
+	phases = sync_phases(source_folder, groups)
 	items = [
 		item
-		for group in groups
-		for item in group
+		for phase in phases
+		for item in phase
 	]
 	total_bytes = sum(item.size for item in items)
-	client = _get_session(aws_profile).client("s3") if execute else None
+	manifest = SyncManifest.for_destination(source_folder, bucket_name, target_folder)
+	summary = SyncSummary()
+	if not verify_remote:
+		for item in items:
+			if manifest.matches(item):
+				summary.add("skipped", item.size, item.key)
+		phases = [
+			[item for item in phase if not manifest.matches(item)]
+			for phase in phases
+		]
+		phases = [phase for phase in phases if phase]
+	pending = [item for phase in phases for item in phase]
+	client = None
+	remote = None
+	if execute and pending:
+		client = _get_session(aws_profile).client("s3")
+		remote = remote_sync_index(client, bucket_name, target_folder, scales, pending)
 	progress_events = Queue()
 	start_message = (
 		f"Synchronizing {len(items)} object(s), "
-		f"{format_bytes(total_bytes)}, with up to {jobs} scale worker(s)."
+		f"{format_bytes(total_bytes)}, with up to {jobs} upload worker(s)."
 	)
 	if not execute:
 		start_message = (
@@ -431,15 +629,25 @@ def upload_sharded_tree(
 		final_message=None,
 		position_formatter=format_byte_progress,
 	) as progress:
-		summary = _execute_sync_groups(
-			client,
-			groups,
-			bucket_name,
-			execute,
-			jobs,
-			progress_events,
-			progress,
-		)
+		if summary.bytes["skipped"]:
+			progress.update(summary.bytes["skipped"])
+		try:
+			_execute_sync_phases(
+				client,
+				phases,
+				bucket_name,
+				execute,
+				jobs,
+				progress_events,
+				progress,
+				remote,
+				manifest if execute else None,
+				summary,
+			)
+		finally:
+			if execute:
+				manifest.compact()
+			manifest.close()
 	_emit_sync_details(summary)
 	log.write(
 		"S3 Upload",
@@ -464,7 +672,12 @@ def upload_sharded_tree(
 )
 @click.option("--include-mip0/--exclude-mip0", default=True, show_default=True)
 @click.option("--jobs", type=click.IntRange(min=1), default=6, show_default=True,
-				help="Parallel scale-directory uploads in sharded-tree mode.")
+				help="Parallel object uploads in sharded-tree mode.")
+@click.option(
+	"--verify-remote",
+	is_flag=True,
+	help="Check every object against S3 instead of trusting the local sync manifest.",
+)
 @click.option(
 	"--execute/--dry-run",
 	default=None,
@@ -487,6 +700,7 @@ def s3upload(
 	include_mip0=True,
 	jobs=6,
 	aws_profile=None,
+	verify_remote=False,
 ):
 	if execute is None:
 		execute = not from_sharded_tree
@@ -514,6 +728,7 @@ def s3upload(
 				include_mip0=include_mip0,
 				execute=execute,
 				aws_profile=aws_profile,
+				verify_remote=verify_remote,
 			)
 		except click.ClickException:
 			raise
@@ -0,0 +1,109 @@
+"""Local record of objects a sharded S3 sync has already placed remotely."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import json
+import os
+from pathlib import Path
+import time
+from urllib.parse import quote
+
+
+SYNC_MANIFEST_DIR = ".mctutil-sync"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+	"""The local file state last confirmed at one destination key."""
+
+	key: str
+	size: int
+	mtime_ns: int
+	etag: str | None
+	uploaded_at: float
+
+
+def manifest_path(source_folder: Path, bucket_name: str, target_folder: str) -> Path:
+	"""Return the manifest file for one bucket and destination prefix."""
+	destination = quote(f"{bucket_name}/{target_folder}".rstrip("/"), safe="")
+	return Path(source_folder) / SYNC_MANIFEST_DIR / f"{destination}.jsonl"
+
+
+def _read_entries(path: Path) -> dict[str, ManifestEntry]:
+	entries = {}
+	try:
+		lines = path.read_text(encoding="utf-8").splitlines()
+	except FileNotFoundError:
+		return entries
+	for line in lines:
+		# A crash can leave one truncated final line; later lines win per key.
+		try:
+			entry = ManifestEntry(**json.loads(line))
+		except (ValueError, TypeError):
+			continue
+		entries[entry.key] = entry
+	return entries
+
+
+class SyncManifest:
+	"""Append-only JSONL manifest of ``(key, size, mtime_ns, etag, uploaded_at)``.
+
+	Each confirmed object is appended and flushed as soon as it is known, so a
+	failed run keeps everything it finished. ``compact`` rewrites the file with
+	one line per key.
+	"""
+
+	def __init__(self, path: Path):
+		self.path = Path(path)
+		self.entries = _read_entries(self.path)
+		self._handle = None
+
+	@classmethod
+	def for_destination(
+		cls,
+		source_folder: Path,
+		bucket_name: str,
+		target_folder: str,
+	) -> SyncManifest:
+		return cls(manifest_path(source_folder, bucket_name, target_folder))
+
+	def matches(self, item) -> bool:
+		"""Return whether ``item`` is unchanged since it was last confirmed."""
+		entry = self.entries.get(item.key)
+		return (
+			entry is not None
+			and entry.size == item.size
+			and entry.mtime_ns == item.mtime_ns
+		)
+
+	def record(self, item, etag: str | None = None) -> None:
+		"""Append a confirmed upload or remote match for ``item``."""
+		entry = ManifestEntry(item.key, item.size, item.mtime_ns, etag, time.time())
+		if self._handle is None:
+			self.path.parent.mkdir(parents=True, exist_ok=True)
+			self._handle = open(self.path, "a", encoding="utf-8")
+		self._handle.write(json.dumps(asdict(entry)) + "\n")
+		self._handle.flush()
+		self.entries[entry.key] = entry
+
+	def compact(self) -> None:
+		"""Atomically rewrite the manifest with the latest entry per key."""
+		self.close()
+		if not self.entries:
+			return
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		temporary = self.path.with_suffix(".tmp")
+		temporary.write_text(
+			"".join(
+				json.dumps(asdict(entry)) + "\n"
+				for _key, entry in sorted(self.entries.items())
+			),
+			encoding="utf-8",
+		)
+		os.replace(temporary, self.path)
+
+	def close(self) -> None:
+		if self._handle is not None:
+			self._handle.close()
+			self._handle = None
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare windowed and van Herk/Gil-Werman maximum-intensity projections."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from mctutil.transform.ops import (
+	reference_maximum_intensity_projection,
+	sliding_maximum,
+)
+
+
+DEFAULT_WIDTHS = (2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def best_time(function, repeat: int) -> tuple[float, np.ndarray]:
+	"""Return the fastest of ``repeat`` runs and the last result."""
+	best = float("inf")
+	result = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		result = function()
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+
+def parse_args(arguments=None):
+	parser = argparse.ArgumentParser(
+		description="Time maximum_intensity_projection implementations across widths.",
+	)
+	parser.add_argument(
+		"--shape",
+		type=int,
+		nargs=3,
+		default=(384, 256, 256),
+		metavar=("Z", "Y", "X"),
+		help="Synthetic volume shape.",
+	)
+	parser.add_argument("--dtype", default="uint16", help="Synthetic volume dtype.")
+	parser.add_argument("--axis", type=int, default=0, help="Projection axis.")
+	parser.add_argument(
+		"--widths",
+		type=int,
+		nargs="+",
+		default=DEFAULT_WIDTHS,
+		help="MIP widths to time.",
+	)
+	parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement.")
+	return parser.parse_args(arguments)
+
+
+def main(arguments=None) -> int:
+	args = parse_args(arguments)
+	dtype = np.dtype(args.dtype)
+	rng = np.random.default_rng(0)
+	if np.issubdtype(dtype, np.integer):
+		info = np.iinfo(dtype)
+		volume = rng.integers(info.min, info.max, size=args.shape, dtype=dtype, endpoint=True)
+	else:
+		volume = rng.random(args.shape).astype(dtype)
+
+	print(f"shape={tuple(args.shape)} dtype={dtype} axis={args.axis}")
+	print(f"{'width':>6} {'reference s':>12} {'sliding s':>10} {'speedup':>8}")
+	for width in args.widths:
+		if width > volume.shape[args.axis]:
+			print(f"{width:>6} skipped: exceeds axis length {volume.shape[args.axis]}")
+			continue
+		reference_time, expected = best_time(
+			lambda: reference_maximum_intensity_projection(volume, width, args.axis),
+			args.repeat,
+		)
+		sliding_time, actual = best_time(
+			lambda: sliding_maximum(volume, width, args.axis),
+			args.repeat,
+		)
+		if not np.array_equal(expected, actual):
+			print(f"{width:>6} MISMATCH")
+			return 1
+		print(
+			f"{width:>6} {reference_time:>12.4f} {sliding_time:>10.4f} "
+			f"{reference_time / sliding_time:>7.2f}x"
+		)
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
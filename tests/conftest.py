@@ -45,6 +45,11 @@ class _DummySession:
 def _stub_modules() -> dict[str, types.ModuleType]:
 	boto3 = types.ModuleType("boto3")
 	boto3.Session = lambda *args, **kwargs: _DummySession()
+	boto3_s3 = types.ModuleType("boto3.s3")
+	boto3_s3_transfer = types.ModuleType("boto3.s3.transfer")
+	boto3_s3_transfer.TransferConfig = lambda **kwargs: types.SimpleNamespace(**kwargs)
+	boto3.s3 = boto3_s3
+	boto3_s3.transfer = boto3_s3_transfer
 
 	botocore = types.ModuleType("botocore")
 	botocore_exceptions = types.ModuleType("botocore.exceptions")
@@ -171,6 +176,8 @@ def _stub_modules() -> dict[str, types.ModuleType]:
 
 	return {
 		"boto3": boto3,
+		"boto3.s3": boto3_s3,
+		"boto3.s3.transfer": boto3_s3_transfer,
 		"brotli": brotli,
 		"botocore": botocore,
 		"botocore.exceptions": botocore_exceptions,
@@ -12,6 +12,7 @@ pseudo-terminal:
 from __future__ import annotations
 
 import argparse
+from datetime import datetime, timezone
 import json
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -40,7 +41,23 @@ class FakeS3:
 			"HeadObject",
 		)
 
-	def upload_file(self, filename, bucket, key, ExtraArgs, Callback):
+	def get_paginator(self, _operation):
+		return types.SimpleNamespace(paginate=self.list_pages)
+
+	def list_pages(self, Bucket, Prefix, Delimiter=None):
+		# The unchanged object predates the local mtime, so sync confirms it
+		# with one HEAD request.
+		key = self.unchanged["key"]
+		if not key.startswith(Prefix):
+			return [{}]
+		return [{"Contents": [{
+			"Key": key,
+			"Size": self.unchanged["size"],
+			"ETag": '"demo"',
+			"LastModified": datetime.fromtimestamp(0, timezone.utc),
+		}]}]
+
+	def upload_file(self, filename, bucket, key, ExtraArgs, Callback, Config=None):
 		size = Path(filename).stat().st_size
 		if key == self.fail_key:
 			Callback(size)
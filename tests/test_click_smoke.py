@@ -22,6 +22,7 @@ CASES = [
 	CommandCase("mctutil/als832/extract_projections.py", "extract_projections"),
 	CommandCase("mctutil/als832/extract_refs.py", "extract_refs"),
 	CommandCase("mctutil/als832/h5_tree.py", "h5_tree"),
+	CommandCase("mctutil/flats/apply.py", "apply"),
 	CommandCase("mctutil/flats/beam_tracking.py", "beam_tracking"),
 	CommandCase("mctutil/flats/medianize.py", "medianize"),
 	CommandCase("mctutil/flats/series_digest.py", "series_digest"),
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import tifffile
+from click.testing import CliRunner
+
+import mctutil.flats.apply as flats_apply
+import mctutil.flats.beam_tracking as beam_tracking
+
+
+def _write_inputs(tmp_path, count=5, shape=(12, 14)):
+	rng = np.random.default_rng(1)
+	pre = (1000 + 100 * rng.random(shape)).astype(np.float32)
+	post = (1100 + 100 * rng.random(shape)).astype(np.float32)
+	projections = (500 + 300 * rng.random((count,) + shape)).astype(np.float32)
+	tifffile.imwrite(tmp_path / "pre.tif", pre)
+	tifffile.imwrite(tmp_path / "post.tif", post)
+	tifffile.imwrite(tmp_path / "scan.tif", projections, photometric="minisblack")
+	return pre, post, projections
+
+
+def _run(tmp_path):
+	return CliRunner().invoke(
+		flats_apply.apply,
+		[
+			str(tmp_path / "scan.tif"),
+			str(tmp_path / "out"),
+			"--pre-flat",
+			str(tmp_path / "pre.tif"),
+			"--post-flat",
+			str(tmp_path / "post.tif"),
+			"--transport-sigma",
+			"2",
+			"--workers",
+			"2",
+		],
+		catch_exceptions=False,
+	)
+
+
+def test_apply_streams_a_multipage_stack_and_resumes_missing_outputs(tmp_path):
+	pre, post, projections = _write_inputs(tmp_path)
+
+	result = _run(tmp_path)
+
+	assert result.exit_code == 0, result.output
+	G = beam_tracking.optimal_transport_interp(pre, post, 2)
+	outputs = sorted((tmp_path / "out").glob("*.tif"))
+	assert [path.name for path in outputs] == [f"scan_{index:05d}.tif" for index in range(5)]
+	for index, t in enumerate(beam_tracking.projection_times(5)):
+		written = tifffile.imread(outputs[index])
+		assert written.dtype == np.float32
+		np.testing.assert_allclose(written, beam_tracking.flatfield_projection(projections[index], G, t), rtol=1e-5)
+
+	outputs[2].unlink()
+	kept = outputs[0].stat().st_mtime_ns
+	result = _run(tmp_path)
+
+	assert "5 projection(s), 4 already corrected" in result.output
+	assert outputs[2].exists()
+	assert outputs[0].stat().st_mtime_ns == kept
+	assert not list((tmp_path / "out").glob(".*.partial"))
+
+
+def test_apply_writes_scaled_uint16_from_a_digest_stack(tmp_path):
+	_, _, projections = _write_inputs(tmp_path, count=3)
+	rng = np.random.default_rng(2)
+	digest = (1000 + 100 * rng.random((3, 12, 14))).astype(np.float32)
+	tifffile.imwrite(tmp_path / "digest.tif", digest, photometric="minisblack")
+
+	result = CliRunner().invoke(
+		flats_apply.apply,
+		[
+			str(tmp_path / "scan.tif"),
+			str(tmp_path / "out"),
+			"--digest-stack",
+			str(tmp_path / "digest.tif"),
+			"--transport-sigma",
+			"2",
+			"--dtype",
+			"uint16",
+			"--scale",
+			"1000",
+			"--workers",
+			"1",
+		],
+		catch_exceptions=False,
+	)
+
+	assert result.exit_code == 0, result.output
+	# Keyframes sit at the centres of the digest's sampling intervals.
+	G = beam_tracking.keyframe_interp(list(digest.astype(np.float64)), [1 / 6, 1 / 2, 5 / 6], 2)
+	for index, t in enumerate([0.0, 0.5, 1.0]):
+		written = tifffile.imread(tmp_path / "out" / f"scan_{index:05d}.tif")
+		assert written.dtype == np.uint16
+		expected = beam_tracking.flatfield_projection(projections[index], G, t) * 1000
+		np.testing.assert_allclose(written, expected, atol=1)
+
+
+def test_apply_rejects_a_binned_digest_before_starting_workers(tmp_path, monkeypatch):
+	_write_inputs(tmp_path, count=3)
+	tifffile.imwrite(tmp_path / "digest.tif", np.ones((3, 6, 7), np.float32), photometric="minisblack")
+	monkeypatch.setattr(flats_apply, "correct_projections", lambda *_args: pytest.fail("workers started"))
+
+	result = CliRunner().invoke(
+		flats_apply.apply,
+		[str(tmp_path / "scan.tif"), str(tmp_path / "out"), "--digest-stack", str(tmp_path / "digest.tif")],
+	)
+
+	assert result.exit_code != 0
+	assert "(6, 7), but the projections are (12, 14)" in result.output
+	assert "--bin or --crop" in result.output
+
+
+def test_apply_requires_one_gain_source(tmp_path):
+	_write_inputs(tmp_path)
+
+	result = CliRunner().invoke(flats_apply.apply, [str(tmp_path / "scan.tif"), str(tmp_path / "out")])
+
+	assert result.exit_code != 0
+	assert "--digest-stack" in result.output
+
+
+def test_apply_rejects_writing_into_the_projection_directory(tmp_path):
+	_, _, projections = _write_inputs(tmp_path, count=2)
+	frames = tmp_path / "frames"
+	frames.mkdir()
+	for index, projection in enumerate(projections):
+		tifffile.imwrite(frames / f"proj_{index}.tif", projection)
+	arguments = ["--pre-flat", str(tmp_path / "pre.tif"), "--post-flat", str(tmp_path / "post.tif")]
+
+	for output_dir in (frames, frames / ".." / "frames"):
+		result = CliRunner().invoke(flats_apply.apply, [str(frames), str(output_dir), *arguments])
+
+		assert result.exit_code == 2
+		assert "must not be the projection directory" in result.output
+	np.testing.assert_array_equal(tifffile.imread(frames / "proj_0.tif"), projections[0])
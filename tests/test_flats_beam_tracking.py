@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import tifffile
+
+import mctutil.flats.beam_tracking as beam_tracking
+
+
+def _keyframes(count=3, shape=(16, 20)):
+	rng = np.random.default_rng(0)
+	return [1000 + 200 * rng.random(shape) for _ in range(count)]
+
+
+def _reference_gain(flats, times, t, transport_sigma):
+	k = min(max(int(np.searchsorted(times, t) - 1), 0), len(times) - 2)
+	w = (t - times[k]) / (times[k + 1] - times[k])
+	la, lb = np.log(flats[k]), np.log(flats[k + 1])
+	transport = beam_tracking.gaussian_filter(lb - la, transport_sigma)
+	return np.exp(0.5 * (la + lb) + (w - 0.5) * transport)
+
+
+def test_batched_float32_gain_stack_matches_per_projection_float64_model():
+	flats = _keyframes()
+	times = [0.0, 0.4, 1.0]
+	G = beam_tracking.keyframe_interp(flats, times, transport_sigma=2)
+
+	stack = beam_tracking.build_gain_stack(G, 11, batch=3)
+
+	assert stack.shape == (11, 16, 20)
+	assert stack.dtype == np.float32
+	for index, t in enumerate(beam_tracking.projection_times(11)):
+		reference = _reference_gain(flats, np.asarray(times), t, 2)
+		np.testing.assert_allclose(stack[index], reference, rtol=1e-5)
+		np.testing.assert_allclose(G(t), reference, rtol=1e-5)
+
+
+def test_pair_fields_are_cached_in_a_bounded_lru(monkeypatch):
+	filtered = []
+	original = beam_tracking.gaussian_filter
+
+	def counting_filter(values, sigma):
+		filtered.append(sigma)
+		return original(values, sigma)
+
+	monkeypatch.setattr(beam_tracking, "gaussian_filter", counting_filter)
+	G = beam_tracking.keyframe_interp(_keyframes(4), [0.0, 0.3, 0.6, 1.0], cache_pairs=2)
+
+	for t in (0.1, 0.5, 0.2, 0.5, 0.9):
+		G(t)
+	assert len(filtered) == 3
+	assert list(G.pairs.fields) == [1, 2]
+
+	G(0.1)
+	assert len(filtered) == 4
+	with pytest.raises(ValueError, match="cache_pairs"):
+		beam_tracking.keyframe_interp(_keyframes(2), [0.0, 1.0], cache_pairs=0)
+
+
+@pytest.mark.parametrize("method", ["keyframe", "crossfade"])
+def test_gain_stack_streams_into_a_memmapped_tiff(tmp_path, method):
+	flats = _keyframes(2)
+	if method == "keyframe":
+		G = beam_tracking.keyframe_interp(flats, [0.0, 1.0], transport_sigma=2)
+	else:
+		G = beam_tracking.geometric_crossfade(*flats)
+
+	path = beam_tracking.write_gain_stack(G, 5, tmp_path / "gain.tif", batch=2)
+
+	written = tifffile.memmap(path)
+	assert written.dtype == np.float32
+	np.testing.assert_array_equal(written, beam_tracking.build_gain_stack(G, 5))
+
+
+def test_empty_gain_stack_keeps_the_frame_shape(tmp_path):
+	G = beam_tracking.keyframe_interp(_keyframes(2), [0.0, 1.0], transport_sigma=2)
+
+	stack = beam_tracking.build_gain_stack(G, 0)
+
+	assert stack.shape == (0, 16, 20)
+	assert stack.dtype == np.float32
+	with pytest.raises(ValueError, match="at least one projection"):
+		beam_tracking.write_gain_stack(G, 0, tmp_path / "gain.tif")
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import tifffile
+from click.testing import CliRunner
+
+import mctutil.flats.series_digest as series_digest
+
+
+def _frames(count=23, shape=(10, 12)):
+	rng = np.random.default_rng(3)
+	return (1000 + 500 * rng.random((count,) + shape)).astype(np.float32)
+
+
+def _reference(frames, keep, window, bin_factor, crop):
+	centres = series_digest.sample_centres(len(frames), keep)
+	row0, row1, col0, col1 = crop
+	snapshots, centroids = [], []
+	for low, high in series_digest.sample_windows(len(frames), centres, window):
+		median = np.median(frames[low:high, row0:row1, col0:col1], axis=0)
+		binned = series_digest.spatial_bin(median, bin_factor)
+		snapshots.append(binned.astype(np.float32))
+		centroids.append(series_digest.beam_centroid(binned))
+	return snapshots, centroids
+
+
+@pytest.mark.parametrize("layout", ["directory", "stack"])
+def test_prefetched_rolling_windows_match_per_window_medians(tmp_path, layout):
+	frames = _frames()
+	if layout == "directory":
+		path = tmp_path / "frames"
+		path.mkdir()
+		for index, frame in enumerate(frames):
+			tifffile.imwrite(path / f"flat_{index:04d}.tif", frame)
+	else:
+		path = tmp_path / "flats.tif"
+		tifffile.imwrite(path, frames, photometric="minisblack")
+	centres = series_digest.sample_centres(len(frames), 6)
+	windows = series_digest.sample_windows(len(frames), centres, 7)
+
+	snapshots, centroids = series_digest.digest_snapshots(path, windows, 2, (1, 9, 0, 12), readers=3)
+
+	expected_snapshots, expected_centroids = _reference(frames, 6, 7, 2, (1, 9, 0, 12))
+	assert windows[0][0] == 0 and windows[1][0] < windows[0][1]
+	for snapshot, expected in zip(snapshots, expected_snapshots):
+		assert snapshot.dtype == np.float32
+		np.testing.assert_array_equal(snapshot, expected)
+	np.testing.assert_allclose(centroids, expected_centroids)
+
+
+def test_window_buffer_reads_overlapping_frames_once():
+	frames = _frames(count=8)
+	reads = []
+
+	def reader():
+		for index in range(8):
+			reads.append(index)
+			yield index, frames[index]
+
+	buffer = series_digest.WindowBuffer(5)
+	source = reader()
+	shared = []
+	for low, high in [(0, 3), (1, 6), (3, 8), (4, 7)]:
+		buffer.fill(low, high, source)
+		shared.append(np.shares_memory(buffer.window(low, high), buffer.buffer))
+		np.testing.assert_array_equal(buffer.median(low, high), np.median(frames[low:high], axis=0))
+	assert reads == list(range(8))
+	# Only the window whose slots wrap past the end of the ring is gathered.
+	assert shared == [True, True, True, False]
+
+
+def test_series_digest_cli_writes_trajectory_with_reader_pool(tmp_path):
+	path = tmp_path / "flats.tif"
+	tifffile.imwrite(path, _frames(), photometric="minisblack")
+
+	result = CliRunner().invoke(
+		series_digest.series_digest,
+		[str(path), "--keep", "4", "--median-window", "3", "--readers", "2", "--out", str(tmp_path / "out")],
+		catch_exceptions=False,
+	)
+
+	assert result.exit_code == 0, result.output
+	table = np.loadtxt(tmp_path / "out" / "drift_trajectory.csv", delimiter=",", skiprows=1)
+	assert table.shape == (4, 6)
+	assert tifffile.imread(tmp_path / "out" / "digest_stack.tif").shape == (4, 10, 12)
@@ -176,3 +176,238 @@ def test_pipeline_is_live_and_the_orphaned_command_is_removed():
 	assert result.exit_code == 0, result.output
 	assert "pipeline" in result.output
 	assert not Path("mctutil/transform/transform.py").exists()
+
+
+def _write_planes(directory, volume):
+	directory.mkdir()
+	for index, image in enumerate(volume):
+		tifffile.imwrite(directory / f"slice_{index:02d}.tif", image)
+
+
+def test_slab_planning_adds_mip_and_denoise_halos():
+	slabs = pipeline_module.plan_pipeline_slabs(
+		10,
+		3,
+		mip_width=3,
+		mip_axis=0,
+		denoise=True,
+	)
+
+	assert [(slab.start, slab.stop) for slab in slabs] == [(0, 3), (3, 6), (6, 8)]
+	assert [(slab.read_start, slab.read_stop) for slab in slabs] == [
+		(0, 6),
+		(2, 9),
+		(5, 10),
+	]
+	assert [slab.keep_start for slab in slabs] == [0, 1, 1]
+
+
+def test_streamed_slabs_are_byte_identical_to_the_in_memory_cli(
+	tmp_path,
+	monkeypatch,
+):
+	monkeypatch.setattr(pipeline_module.log, "start", lambda: None)
+	monkeypatch.setattr(pipeline_module.log, "write", lambda *_args, **_kwargs: None)
+	rng = np.random.default_rng(132)
+	volume = rng.integers(0, 4000, size=(9, 8, 8), dtype=np.int16)
+	volume[4, 3, 3] = 30000
+	input_dir = tmp_path / "input"
+	_write_planes(input_dir, volume)
+	base = [
+		"--data-dir", str(input_dir),
+		"--z-trim", "1,0",
+		"--vertical-trim", "1,1",
+		"--mips", "3",
+		"--circ-mask-ratio", "0.8",
+		"--denoise-mode", "threshold",
+		"--denoise-threshold", "0.2",
+		"--flip-axis", "z",
+		"--out-dtype", "uint8",
+		"--bin-power", "1",
+		"--processes", "2",
+	]
+	reference_dir = tmp_path / "reference"
+	result = CliRunner().invoke(
+		pipeline_module.pipeline,
+		base + ["--output-dir", str(reference_dir)],
+	)
+	assert result.exit_code == 0, result.output
+	reference = sorted(reference_dir.glob("*.tif"))
+	assert len(reference) == 6
+
+	for depth in (1, 2, 4, 32):
+		output_dir = tmp_path / f"slab_{depth}"
+		result = CliRunner().invoke(
+			pipeline_module.pipeline,
+			base + ["--output-dir", str(output_dir), "--slab-depth", str(depth)],
+		)
+		assert result.exit_code == 0, result.output
+		streamed = sorted(output_dir.glob("*.tif"))
+		assert [path.name for path in streamed] == [path.name for path in reference]
+		for expected, actual in zip(reference, streamed):
+			assert expected.read_bytes() == actual.read_bytes()
+
+
+def test_normalized_slab_streaming_matches_the_in_memory_cli(
+	tmp_path,
+	monkeypatch,
+):
+	monkeypatch.setattr(pipeline_module.log, "start", lambda: None)
+	monkeypatch.setattr(pipeline_module.log, "write", lambda *_args, **_kwargs: None)
+	volume = np.random.default_rng(2).integers(
+		0,
+		4096,
+		size=(6, 6, 6),
+		dtype=np.uint16,
+	)
+	input_dir = tmp_path / "input"
+	_write_planes(input_dir, volume)
+	base = [
+		"--data-dir", str(input_dir),
+		"--normalize-over", "2,98",
+		"--mips", "2",
+		"--circ-mask-ratio", "0.9",
+		"--out-dtype", "float32",
+		"--processes", "2",
+	]
+	outputs = []
+	for extra in ([], ["--slab-depth", "2"]):
+		output_dir = tmp_path / f"output{len(outputs)}"
+		result = CliRunner().invoke(
+			pipeline_module.pipeline,
+			base + ["--output-dir", str(output_dir)] + extra,
+		)
+		assert result.exit_code == 0, result.output
+		outputs.append(sorted(output_dir.glob("*.tif")))
+
+	floor, ceiling = np.percentile(volume, (2, 98))
+	expected = pipeline_module.apply_transform_pipeline(
+		volume,
+		normalize_range=(2, 98),
+		normalize_bounds=(float(floor), float(ceiling)),
+		mip_width=2,
+		circ_mask_ratio=0.9,
+		out_dtype=np.float32,
+	)
+	for in_memory, streamed in zip(*outputs):
+		assert in_memory.read_bytes() == streamed.read_bytes()
+	assert np.array_equal(
+		np.stack([tifffile.imread(path) for path in outputs[1]]),
+		expected,
+	)
+
+
+def test_fused_kernel_matches_staged_cores_per_plane():
+	from mctutil.transform.fused import fused_transform_pipeline
+
+	volume = np.random.default_rng(3).random((6, 10, 9)).astype(np.float32) * 50
+	bounds = normalization_bounds(volume, 1, 99)
+	for options in (
+		{"mip_width": 3, "mip_axis": 0, "flip_axis": 0},
+		{"mip_width": 2, "mip_axis": 2, "flip_axis": 1, "bin_power": 1},
+		{"vertical_trim": (1, 2), "z_trim": (1, 0), "out_dtype": np.float32},
+	):
+		for normalize in (None, (1, 99)):
+			options = dict(options, circ_mask_ratio=0.7)
+			expected = pipeline_module.apply_transform_pipeline(
+				volume,
+				normalize_range=normalize,
+				normalize_bounds=None if normalize is None else bounds,
+				**options,
+			)
+			actual = fused_transform_pipeline(
+				volume,
+				normalize_bounds=None if normalize is None else bounds,
+				workers=2,
+				**options,
+			)
+			assert actual.dtype == expected.dtype
+			assert actual.tobytes() == expected.tobytes()
+
+
+def test_fused_wide_z_mip_uses_blocks_and_matches_staged_cores():
+	from mctutil.transform.fused import fused_transform_pipeline
+
+	volume = np.random.default_rng(4).random((45, 6, 5)).astype(np.float32) * 50
+	bounds = normalization_bounds(volume, 1, 99)
+	for options in (
+		{"mip_width": 16, "mip_axis": 0, "flip_axis": 0},
+		{"mip_width": 20, "mip_axis": 0, "z_trim": (2, 1), "out_dtype": np.float32},
+	):
+		expected = pipeline_module.apply_transform_pipeline(
+			volume,
+			normalize_range=(1, 99),
+			normalize_bounds=bounds,
+			circ_mask_ratio=0.7,
+			**options,
+		)
+		actual = fused_transform_pipeline(volume, normalize_bounds=bounds, circ_mask_ratio=0.7, workers=3, **options)
+		assert actual.tobytes() == expected.tobytes()
+		unnormalized = pipeline_module.apply_transform_pipeline(volume, circ_mask_ratio=0.7, **options)
+		assert fused_transform_pipeline(volume, circ_mask_ratio=0.7, **options).tobytes() == unnormalized.tobytes()
+
+
+def test_fused_cli_matches_staged_in_memory_and_slab_output(
+	tmp_path,
+	monkeypatch,
+):
+	monkeypatch.setattr(pipeline_module.log, "start", lambda: None)
+	monkeypatch.setattr(pipeline_module.log, "write", lambda *_args, **_kwargs: None)
+	volume = np.random.default_rng(4).integers(0, 3000, size=(7, 8, 8), dtype=np.int16)
+	input_dir = tmp_path / "input"
+	_write_planes(input_dir, volume)
+	base = [
+		"--data-dir", str(input_dir),
+		"--normalize-over", "1,99",
+		"--mips", "2",
+		"--circ-mask-ratio", "0.8",
+		"--flip-axis", "z",
+		"--bin-power", "1",
+		"--processes", "2",
+	]
+	runs = {}
+	for name, extra in (
+		("staged", []),
+		("fused", ["--fused"]),
+		("fused_slab", ["--fused", "--slab-depth", "3"]),
+	):
+		output_dir = tmp_path / name
+		result = CliRunner().invoke(
+			pipeline_module.pipeline,
+			base + ["--output-dir", str(output_dir)] + extra,
+		)
+		assert result.exit_code == 0, result.output
+		runs[name] = [path.read_bytes() for path in sorted(output_dir.glob("*.tif"))]
+
+	assert len(runs["staged"]) == 6
+	assert runs["fused"] == runs["staged"]
+	assert runs["fused_slab"] == runs["staged"]
+
+	result = CliRunner().invoke(
+		pipeline_module.pipeline,
+		base + [
+			"--output-dir", str(tmp_path / "denoise"),
+			"--fused",
+			"--denoise-mode", "flat",
+			"--denoise-threshold", "1",
+		],
+	)
+	assert result.exit_code == 2
+	assert "--fused cannot be combined with --denoise-mode" in result.output
+
+
+def test_sliding_maximum_matches_the_windowed_reference_for_every_width():
+	from mctutil.transform.ops import (
+		reference_maximum_intensity_projection,
+		sliding_maximum,
+	)
+
+	volume = np.random.default_rng(5).random((21, 6, 19)).astype(np.float32)
+	volume[4, 2, 3] = np.nan
+	for axis in range(3):
+		for width in range(1, volume.shape[axis] + 1):
+			expected = reference_maximum_intensity_projection(volume, width, axis)
+			actual = sliding_maximum(volume, width, axis)
+			assert actual.flags.c_contiguous
+			assert actual.tobytes() == expected.tobytes()
+			assert maximum_intensity_projection(volume, width, axis).tobytes() == expected.tobytes()
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from concurrent.futures import Future
 from multiprocessing import shared_memory
 import uuid
 
 import numpy as np
+import pytest
 import tifffile
 
 from mctutil.ng import precompute as precompute_module
-from mctutil.shared.io_helpers import distribute_read, offset_reads
-from mctutil.shared.mem import ProjOrder, SharedNP
+from mctutil.shared import io_helpers
+from mctutil.shared.io_helpers import RawReadPool, distribute_read, offset_reads
+from mctutil.shared.mem import ProjOrder, SharedNP, SinoOrder
 from mctutil.transform import sinogram
 
 
@@ -37,6 +40,102 @@ def test_raw_offset_reads_copy_exact_strided_spans_into_shared_memory(tmp_path):
 		memory.unlink()
 
 
+def test_raw_read_pool_reuses_its_workers_across_reads_and_targets(tmp_path):
+	sources = []
+	for index in range(3):
+		sources.append(tmp_path / f"source_{index}.bin")
+		sources[-1].write_bytes(bytes(range(index * 10, index * 10 + 8)))
+	memories = [shared_memory.SharedMemory(create=True, size=24) for _ in range(2)]
+	try:
+		with RawReadPool(2) as pool:
+			executors = []
+			for memory in memories:
+				reads = [
+					read
+					for index, source in enumerate(sources)
+					for read in offset_reads(source, source_offset=0, target_offset=index * 8, size=4, count=2)
+				]
+				distribute_read(memory, reads, pool=pool)
+				executors.append(pool._executor)
+				assert bytes(memory.buf) == b"".join(source.read_bytes() for source in sources)
+			assert executors[0] is not None and executors[0] is executors[1]
+		assert pool._executor is None
+	finally:
+		for memory in memories:
+			memory.close()
+			memory.unlink()
+
+
+def test_read_jobs_split_a_single_source_across_workers():
+	reads = offset_reads("volume.raw", source_offset=0, target_offset=0, size=4, count=5)
+
+	jobs = io_helpers._read_jobs("target", reads, 3)
+
+	assert [[read.source_offset for read in job[2]] for job in jobs] == [[0, 4], [8, 12], [16]]
+	assert io_helpers._read_jobs("target", reads, 1) == [("target", "volume.raw", reads)]
+
+
+def test_reader_cache_closes_least_recently_used_entries():
+	cache = OrderedDict()
+	closed = []
+
+	for key in ("a", "b", "a", "c"):
+		io_helpers._cached(cache, key, 2, str.upper, closed.append)
+
+	assert list(cache) == ["a", "c"]
+	assert closed == ["B"]
+
+
+def test_coalesce_reads_sorts_and_merges_source_contiguous_spans():
+	reads = list(offset_reads("a.raw", source_offset=10, target_offset=0, size=4, count=3, target_stride=20))
+	reads += offset_reads("a.raw", source_offset=40, target_offset=100, size=2, count=2)
+	reads.reverse()
+
+	assert io_helpers.coalesce_reads(reads) == [
+		(10, [(0, 4), (20, 4), (40, 4)]),
+		(40, [(100, 4)]),
+	]
+
+
+@pytest.mark.parametrize("vectored", [True, False])
+def test_strided_gather_reads_each_span_with_few_calls(tmp_path, monkeypatch, vectored):
+	source = tmp_path / "rows.bin"
+	source.write_bytes(bytes(range(20)))
+	if vectored:
+		monkeypatch.setattr(io_helpers, "IOV_MAX", 2)
+	else:
+		monkeypatch.delattr(io_helpers.os, "preadv", raising=False)
+	reads = offset_reads(source, source_offset=0, target_offset=0, size=4, count=5, target_stride=6)
+	memory = shared_memory.SharedMemory(create=True, size=30)
+	try:
+		memory.buf[:] = b"." * 30
+
+		stats = distribute_read(memory, reversed(reads), thread_max=1)
+
+		expected = bytearray(b"." * 30)
+		for index in range(5):
+			expected[index * 6:index * 6 + 4] = bytes(range(index * 4, index * 4 + 4))
+		assert bytes(memory.buf) == bytes(expected)
+		assert stats.nbytes == 20
+		assert stats.syscalls == (3 if vectored else 1)
+		assert stats.bytes_per_syscall == 20 / stats.syscalls
+	finally:
+		memory.close()
+		memory.unlink()
+
+
+def test_coalesced_read_past_end_of_file_raises(tmp_path):
+	source = tmp_path / "short.bin"
+	source.write_bytes(b"abcdef")
+	memory = shared_memory.SharedMemory(create=True, size=16)
+	try:
+		with pytest.raises(EOFError, match="short raw read"):
+			distribute_read(memory, offset_reads(source, source_offset=0, target_offset=0, size=4, count=2))
+	finally:
+		memory.close()
+		memory.unlink()
+
+
 def test_sinogram_projection_layout_matches_tifffile_pixels(tmp_path, monkeypatch):
 	monkeypatch.setattr(sinogram.log, "write", lambda *_args, **_kwargs: None)
 	images = []
@@ -73,7 +172,22 @@ def test_sinogram_projection_layout_matches_tifffile_pixels(tmp_path, monkeypatc
 			assert np.array_equal(target, np.asarray(expected))
 
 
-def test_precompute_batches_memmap_offsets_through_shared_ingest(monkeypatch):
+@pytest.mark.parametrize(
+	("staging_slots", "staging_budget", "source_offsets", "target_offsets", "shared_shape"),
+	[
+		(1, None, [[100, 124], [148]], [[0, 24], [0]], (2, 3, 4)),
+		(2, None, [[100, 124], [148]], [[0, 24], [48]], (4, 3, 4)),
+		(2, 24, [[100], [124], [148]], [[0], [0], [0]], (1, 3, 4)),
+	],
+)
+def test_precompute_batches_memmap_offsets_through_shared_ingest(
+	monkeypatch,
+	staging_slots,
+	staging_budget,
+	source_offsets,
+	target_offsets,
+	shared_shape,
+):
 	spec = precompute_module.InputSpec(
 		mode="memmap",
 		source="volume.tif",
@@ -94,7 +208,7 @@ def test_precompute_batches_memmap_offsets_through_shared_ingest(monkeypatch):
 	read_batches = []
 	executors = []
 
-	def record_reads(_target, reads, thread_max):
+	def record_reads(_target, reads, thread_max, pool=None):
 		read_batches.append((tuple(reads), thread_max))
 
 	class ImmediateExecutor:
@@ -119,21 +233,17 @@ def test_precompute_batches_memmap_offsets_through_shared_ingest(monkeypatch):
 		plan,
 		[0, 1, 2],
 		workers=2,
+		staging_slots=staging_slots,
+		staging_budget=staging_budget,
 	)
 
 	assert result == precompute_module.WorkerBatchResult(frozenset({0, 1, 2}), None)
-	assert [[read.source_offset for read in reads] for reads, _ in read_batches] == [
-		[100, 124],
-		[148],
-	]
-	assert [[read.target_offset for read in reads] for reads, _ in read_batches] == [
-		[0, 24],
-		[0],
-	]
-	assert [thread_max for _, thread_max in read_batches] == [2, 1]
+	assert [[read.source_offset for read in reads] for reads, _ in read_batches] == source_offsets
+	assert [[read.target_offset for read in reads] for reads, _ in read_batches] == target_offsets
+	assert [thread_max for _, thread_max in read_batches] == [len(reads) for reads in source_offsets]
 	initializer_args = executors[0].options["initargs"]
 	assert initializer_args[3] is True
-	assert initializer_args[4] == (2, 3, 4)
+	assert initializer_args[4] == shared_shape
 	assert initializer_args[6] == 5
 
 
@@ -185,3 +295,71 @@ def test_discover_input_exposes_memmap_raw_plane_layout(tmp_path):
 		assert spec.plane_stride == mapped.strides[0]
 	finally:
 		del mapped
+
+
+def test_precompute_worker_passes_planes_without_transpose_copies(monkeypatch, tmp_path):
+	class RecordingVolume:
+		def __init__(self, *_args, **_kwargs):
+			self.writes = []
+
+		def __setitem__(self, key, value):
+			self.writes.append((key, value))
+
+	monkeypatch.setattr(precompute_module, "_require_cloudvolume", lambda: RecordingVolume)
+	monkeypatch.setattr(precompute_module, "patch_cloudfiles_monitoring", lambda: None)
+	monkeypatch.setattr(precompute_module, "_WORKER_BUFFERS", {})
+	memory = shared_memory.SharedMemory(create=True, size=2 * 3 * 4 * 2)
+	try:
+		source = np.ndarray((2, 3, 4), dtype=np.uint16, buffer=memory.buf)
+		source[:] = np.arange(24, dtype=np.uint16).reshape(2, 3, 4)
+		precompute_module._init_worker("file:///output", "uint16", memory.name, True, (2, 3, 4), "uint16", 0)
+
+		precompute_module._write_slice((0, 1))
+		_, written = precompute_module._WORKER_VOLUME.writes[0]
+		assert written.shape == (4, 3, 1, 1)
+		assert written.flags.f_contiguous
+		assert np.shares_memory(written, precompute_module._WORKER_SOURCE)
+	finally:
+		precompute_module._WORKER_SHARED_MEMORY.close()
+		precompute_module._WORKER_SHARED_MEMORY = None
+		memory.close()
+		memory.unlink()
+
+	paths = []
+	for z_index in range(3):
+		paths.append(str(tmp_path / f"slice_{z_index}.tif"))
+		tifffile.imwrite(paths[-1], np.full((3, 4), z_index + 1, dtype=np.uint16))
+	precompute_module._init_worker("file:///output", "float32", tuple(paths), False, None, "uint16", 0)
+
+	for z_index in range(3):
+		assert precompute_module._write_slice(z_index) == z_index
+	assert precompute_module._write_slab((0, 2)) == (0, 1)
+	writes = precompute_module._WORKER_VOLUME.writes
+	assert [written.dtype for _, written in writes] == [np.dtype("float32")] * 4
+	assert all(written.flags.f_contiguous for _, written in writes)
+	assert np.shares_memory(writes[0][1], writes[2][1])
+	assert np.array_equal(writes[3][1][:, :, :, 0], np.stack([np.full((4, 3), 1), np.full((4, 3), 2)], axis=-1))
+	assert set(precompute_module._WORKER_BUFFERS) == {"source", "converted"}
+
+
+def test_sinogram_order_gather_reads_one_span_per_projection(tmp_path, monkeypatch):
+	messages = []
+	monkeypatch.setattr(sinogram.log, "write", lambda step, statement="", **_kwargs: messages.append((step, statement)))
+	images = []
+	sources = []
+	for index in range(3):
+		data = np.arange(20, dtype=np.uint16).reshape(5, 4) + index * 100
+		path = tmp_path / f"projection_{index}.tif"
+		tifffile.imwrite(path, data, compression=None)
+		images.append(path)
+		sources.append(data)
+	with tifffile.TiffFile(images[0]) as tif:
+		page = tif.pages[0]
+		projection = {"bytesize": 2, "offset": page.dataoffsets[0], "x": 4}
+
+	with SharedNP(f"issue138_{uuid.uuid4().hex}", np.uint16, SinoOrder(2, 3, 4), create=True) as target_mem:
+		sinogram.distribute_read(target_mem, projection, range(1, 3), range(0, 2), enumerate(images), thread_max=1)
+		with target_mem as target:
+			assert np.array_equal(target, np.stack(sources)[:, 1:3, :].transpose(1, 0, 2))
+
+	assert ("Read Coalescing", "6 read(s) -> 3 read call(s), 0.0 MB, 0.0 kB per call") in messages
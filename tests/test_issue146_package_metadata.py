@@ -22,6 +22,7 @@ MODULE_DISTRIBUTIONS = {
 	"taskqueue": "task-queue",
 	"tifffile": "tifffile",
 	"zarr": "zarr",
+	"zstandard": "zstandard",
 }
 
 
@@ -7,6 +7,7 @@ import tifffile
 from mctutil.transform import pipeline as pipeline_module
 from mctutil.transform.flip import flipped_image, flipped_volume
 from mctutil.transform.simple_noise import (
+	denoised_centers,
 	denoised_volume,
 	flat_denoised_center,
 	threshold_denoised_center,
@@ -73,13 +74,13 @@ def test_standalone_denoise_leaf_uses_the_canonical_center_core(
 		)
 
 	core_calls = []
-	real_core = module.threshold_denoised_center
+	real_core = module.denoised_centers
 
-	def recording_core(images, threshold):
-		core_calls.append((np.asarray(images).shape, threshold))
-		return real_core(images, threshold)
+	def recording_core(images, mode, threshold):
+		core_calls.append((np.asarray(images).shape, mode, threshold))
+		return real_core(images, mode, threshold)
 
-	monkeypatch.setattr(module, "threshold_denoised_center", recording_core)
+	monkeypatch.setattr(module, "denoised_centers", recording_core)
 	result = CliRunner().invoke(
 		module.simple_denoise,
 		[
@@ -91,11 +92,69 @@ def test_standalone_denoise_leaf_uses_the_canonical_center_core(
 	)
 
 	assert result.exit_code == 0, result.output
-	assert core_calls == [((3, 2, 2), 0.5)]
+	assert core_calls == [((3, 2, 2), "threshold", 0.5)]
 	assert [path.name for path in output_dir.glob("*.tif")] == ["slice_1.tif"]
 	assert np.all(tifffile.imread(output_dir / "slice_1.tif") == 10)
 
 
+def test_batched_denoise_matches_per_triplet_cores():
+	volume = np.random.default_rng(150).integers(0, 500, size=(9, 5, 4)).astype(np.int16)
+	volume[4, 2, 2] = 5000
+	for mode, threshold, core in (
+		("threshold", 0.2, threshold_denoised_center),
+		("flat", 100, flat_denoised_center),
+	):
+		expected = np.stack(
+			[core(volume[index - 1:index + 2], threshold) for index in range(1, 8)]
+		)
+		for chunk in (1, 2, 16):
+			actual = denoised_centers(volume, mode, threshold, chunk=chunk)
+			assert actual.dtype == volume.dtype
+			assert np.array_equal(actual, expected)
+
+
+def test_standalone_denoise_reads_each_chunk_with_one_halo_plane_per_side(
+	load_module,
+	tmp_path,
+	monkeypatch,
+):
+	module = load_module("mctutil/transform/simple_noise.py")
+	monkeypatch.setattr(module, "Pool", SerialPool)
+	monkeypatch.setattr(module.log, "write", lambda *_args, **_kwargs: None)
+	input_dir = tmp_path / "input"
+	input_dir.mkdir()
+	volume = np.random.default_rng(151).integers(0, 200, size=(7, 3, 3)).astype(np.uint16)
+	for index, image in enumerate(volume):
+		tifffile.imwrite(input_dir / f"slice_{index}.tif", image)
+	reads = []
+	real_imread = module.tf.imread
+	monkeypatch.setattr(
+		module.tf,
+		"imread",
+		lambda path: reads.append(Path(path).name) or real_imread(path),
+	)
+
+	result = CliRunner().invoke(
+		module.simple_denoise,
+		[
+			"--threshold", "0.3",
+			"--num-processes", "1",
+			"--chunk-size", "2",
+			str(input_dir),
+			str(tmp_path / "output"),
+		],
+	)
+
+	assert result.exit_code == 0, result.output
+	assert len(reads) == 4 + 4 + 3
+	written = sorted((tmp_path / "output").glob("*.tif"))
+	assert [path.name for path in written] == [f"slice_{index}.tif" for index in range(1, 6)]
+	assert np.array_equal(
+		np.stack([tifffile.imread(path) for path in written]),
+		denoised_volume(volume, "threshold", 0.3, boundary="drop"),
+	)
+
+
 def test_fused_denoise_and_flip_match_canonical_core_sequence():
 	volume = np.arange(6 * 4 * 4, dtype=np.float32).reshape(6, 4, 4)
 	volume[3, 1, 1] = 1000
@@ -146,3 +146,82 @@ def test_ng_precompute_segmentation_dtype_and_chunk_defaults(tmp_path, monkeypat
 	assert plan.chunk_size == (4, 3, 1)
 	assert coerce_segmentation_dtype(np.dtype("uint64"), "compressed_segmentation", None) == np.dtype("uint64")
 	assert create_volume_info(plan, spec)["scales"][0]["compressed_segmentation_block_size"] == [8, 8, 8]
+
+
+def test_ng_precompute_rotates_staging_slot_groups(tmp_path, monkeypatch):
+	monkeypatch.setattr(precompute_module, "_require_cloudvolume", lambda: CloudVolume)
+	monkeypatch.setattr(precompute_module, "system_resources", lambda: (8 * 1024 ** 3, 4))
+	input_path = tmp_path / "sample.tif"
+	source = np.arange(7 * 3 * 4, dtype=np.uint16).reshape(7, 3, 4)
+	tifffile.imwrite(input_path, source, photometric="minisblack")
+	staged = []
+	distribute = precompute_module.distribute_offset_reads
+
+	def record(target, reads, thread_max=None, pool=None):
+		reads = tuple(reads)
+		staged.append(tuple(read.target_offset // (3 * 4 * 2) for read in reads))
+		distribute(target, reads, thread_max=thread_max, pool=pool)
+
+	monkeypatch.setattr(precompute_module, "distribute_offset_reads", record)
+
+	for slots in (1, 3):
+		staged.clear()
+		output_path = tmp_path / f"slots_{slots}"
+		result = CliRunner().invoke(
+			precompute,
+			[
+				str(input_path),
+				str(output_path),
+				"--workers", "2",
+				"--staging-slots", str(slots),
+				"--chunk-size", "2,2,1",
+			],
+		)
+
+		assert result.exit_code == 0, result.output
+		volume = CloudVolume(output_path.resolve().as_uri(), parallel=False)
+		written = np.asarray(volume[:, :, :, 0])[..., 0]
+		assert np.array_equal(written, source.transpose(2, 1, 0))
+		if slots == 1:
+			assert staged == [(0, 1)] * 3 + [(0,)]
+		else:
+			assert staged == [(0, 1), (2, 3), (4, 5), (0,)]
+
+
+def test_plan_slab_units_stay_inside_chunk_rows():
+	assert precompute_module.plan_slab_units(range(7), 1) == [(z, z + 1) for z in range(7)]
+	assert precompute_module.plan_slab_units(range(10), 4) == [(0, 4), (4, 8), (8, 10)]
+	assert precompute_module.plan_slab_units([9, 1, 2, 3, 6, 5], 4) == [(1, 4), (5, 7), (9, 10)]
+
+
+def test_ng_precompute_writes_z_deep_chunks_as_whole_slabs(tmp_path, monkeypatch):
+	monkeypatch.setattr(precompute_module, "_require_cloudvolume", lambda: CloudVolume)
+	monkeypatch.setattr(precompute_module, "system_resources", lambda: (8 * 1024 ** 3, 4))
+	source = np.arange(7 * 3 * 4, dtype=np.uint16).reshape(7, 3, 4)
+	memmap_input = tmp_path / "sample.tif"
+	tifffile.imwrite(memmap_input, source, photometric="minisblack")
+	directory_input = tmp_path / "slices"
+	directory_input.mkdir()
+	for z_index, plane in enumerate(source):
+		tifffile.imwrite(directory_input / f"slice_{z_index}.tif", plane)
+
+	for input_path in (memmap_input, directory_input):
+		output_path = tmp_path / f"{input_path.stem}_deep"
+		result = CliRunner().invoke(
+			precompute,
+			[
+				str(input_path),
+				str(output_path),
+				"--workers", "2",
+				"--chunk-size", "4,2,3",
+				"--voxel-offset", "0,0,5",
+			],
+		)
+
+		assert result.exit_code == 0, result.output
+		volume = CloudVolume(output_path.resolve().as_uri(), parallel=False)
+		written = np.asarray(volume[:, :, :, 0])[..., 0]
+		assert np.array_equal(written, source.transpose(2, 1, 0))
+		chunk_names = {path.name for path in (output_path / "700_700_700").iterdir()}
+		assert {name.rsplit("_", 1)[1] for name in chunk_names} == {"5-8", "8-11", "11-12"}
+		assert len(chunk_names) == 6
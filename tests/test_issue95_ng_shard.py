@@ -75,14 +75,26 @@ def test_shard_dry_run_reports_per_mip_mapping(
 	assert not destination.exists()
 
 
-def test_shard_excludes_mip0_and_uses_one_durable_queue(
+@pytest.mark.parametrize(
+	("per_scale", "queue_names", "task_sets", "labels"),
+	[
+		(False, ["tasks-0"], [["mip-1", "mip-2"]], ["Shard Tasks"]),
+		(True, ["tasks-0-mip1", "tasks-0-mip2"], [["mip-1"], ["mip-2"]], ["Shard MIP 1", "Shard MIP 2"]),
+	],
+)
+def test_shard_excludes_mip0_and_queues_scales_together_unless_reported(
 	load_module,
 	tmp_path,
 	monkeypatch,
+	per_scale,
+	queue_names,
+	task_sets,
+	labels,
 ):
 	module = load_module("mctutil/ng/shard.py")
 	task_calls = []
 	queue_calls = []
+	completed = []
 
 	def create_sharded(*_args, **kwargs):
 		task_calls.append(kwargs)
@@ -109,10 +121,17 @@ def test_shard_excludes_mip0_and_uses_one_durable_queue(
 		queue_calls.append(
 			(queue_path, fingerprint, parallel, lease_seconds, kwargs)
 		)
-		assert list(tasks_factory()) == ["mip-1", "mip-2"]
+		assert list(tasks_factory()) == task_sets[len(queue_calls) - 1]
 		return {"status": "complete"}
 
 	monkeypatch.setattr(module, "run_persistent_tasks", run_tasks)
+	if per_scale:
+		shard_volume = module.shard_volume
+
+		def report_scales(*args):
+			return shard_volume(*args[:8], completed.append, *args[9:])
+
+		monkeypatch.setattr(module, "shard_volume", report_scales)
 	source = tmp_path / "source"
 	source.mkdir()
 	destination = tmp_path / "staged"
@@ -135,10 +154,13 @@ def test_shard_excludes_mip0_and_uses_one_durable_queue(
 	assert [call["mip"] for call in task_calls] == [1, 2]
 	assert all(call["fill_missing"] is True for call in task_calls)
 	assert all(call["compress"] == "gzip" for call in task_calls)
-	assert len(queue_calls) == 1
-	assert queue_calls[0][2] == 3
-	assert queue_calls[0][4]["release_leases"] is False
-	assert queue_calls[0][4]["progress_label"] == "Shard Tasks"
+	assert [call[0].name for call in queue_calls] == queue_names
+	assert len({call[1] for call in queue_calls}) == len(queue_names)
+	assert all(call[2] == 3 for call in queue_calls)
+	assert all(call[4]["release_leases"] is False for call in queue_calls)
+	assert all(call[4]["lease_batch"] is None for call in queue_calls)
+	assert [call[4]["progress_label"] for call in queue_calls] == labels
+	assert completed == ([1, 2] if per_scale else [])
 	state_files = list(queue.rglob("pipeline.json"))
 	assert len(state_files) == 1
 	state = json.loads(state_files[0].read_text(encoding="utf-8"))
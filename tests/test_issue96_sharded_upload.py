@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 import json
+import os
 from pathlib import Path
+import threading
+import time
 import types
 
 from click.testing import CliRunner
+import pytest
 
 
 def make_sharded_tree(root: Path) -> Path:
@@ -36,12 +41,18 @@ def make_sharded_tree(root: Path) -> Path:
 	return root
 
 
+EPOCH = datetime.fromtimestamp(0, timezone.utc)
+
+
 class FakeClient:
 	def __init__(self):
 		self.objects = {}
 		self.uploads = []
+		self.head_calls = 0
+		self.list_calls = 0
 
 	def head_object(self, Bucket, Key):
+		self.head_calls += 1
 		try:
 			return self.objects[(Bucket, Key)]
 		except KeyError:
@@ -50,7 +61,27 @@ class FakeClient:
 				"HeadObject",
 			)
 
-	def upload_file(self, filename, bucket, key, ExtraArgs, Callback=None):
+	def get_paginator(self, operation):
+		assert operation == "list_objects_v2"
+		return types.SimpleNamespace(paginate=self.list_pages)
+
+	def list_pages(self, Bucket, Prefix, Delimiter=None):
+		self.list_calls += 1
+		contents = [
+			{
+				"Key": key,
+				"Size": remote["ContentLength"],
+				"ETag": '"etag"',
+				"LastModified": remote.get("LastModified", EPOCH),
+			}
+			for (bucket, key), remote in sorted(self.objects.items())
+			if bucket == Bucket
+			and key.startswith(Prefix)
+			and not (Delimiter and Delimiter in key[len(Prefix):])
+		]
+		return [{"Contents": contents}]
+
+	def upload_file(self, filename, bucket, key, ExtraArgs, Callback=None, Config=None):
 		path = Path(filename)
 		self.uploads.append((path, bucket, key, ExtraArgs))
 		if Callback is not None:
@@ -58,6 +89,7 @@ class FakeClient:
 		self.objects[(bucket, key)] = {
 			"ContentLength": path.stat().st_size,
 			"Metadata": ExtraArgs["Metadata"],
+			"LastModified": datetime.now(timezone.utc),
 		}
 
 
@@ -160,9 +192,23 @@ def test_sharded_upload_is_incremental(load_module, tmp_path, monkeypatch):
 		execute=True,
 	)
 
+	verified = module.upload_sharded_tree(
+		source,
+		"dataset",
+		"bucket",
+		jobs=2,
+		execute=True,
+		verify_remote=True,
+	)
+
 	assert first["uploaded"] == 4
-	assert second == {"planned": 0, "skipped": 4, "uploaded": 0}
+	assert second == verified == {"planned": 0, "skipped": 4, "uploaded": 0}
 	assert len(client.uploads) == 4
+	# The first run lists root plus two scale prefixes; the second trusts the
+	# local manifest; --verify-remote lists again and confirms each same-size
+	# object's metadata with HEAD.
+	assert client.list_calls == 6
+	assert client.head_calls == 4
 
 
 def test_sharded_upload_dry_run_never_constructs_s3_client(
@@ -271,6 +317,51 @@ def test_explicit_dry_run_overrides_legacy_execute_default(
 	assert events == [False]
 
 
+def test_single_scale_upload_defers_root_metadata_to_full_sync(
+	load_module,
+	tmp_path,
+	monkeypatch,
+):
+	module = load_module("mctutil/transport/s3upload.py")
+	monkeypatch.setattr(module, "ClientError", FakeClientError)
+	source = make_sharded_tree(tmp_path / "staged")
+	# A scale still being sharded need not exist yet.
+	(source / "700_700_700" / "0.shard").unlink()
+	(source / "700_700_700").rmdir()
+	client = FakeClient()
+	monkeypatch.setattr(
+		module,
+		"_get_session",
+		lambda _profile: types.SimpleNamespace(client=lambda _name: client),
+	)
+
+	early = module.upload_sharded_tree(
+		source,
+		"dataset",
+		"bucket",
+		execute=True,
+		mips=(1,),
+		include_root=False,
+	)
+	full = module.upload_sharded_tree(
+		source,
+		"dataset",
+		"bucket",
+		include_mip0=False,
+		execute=True,
+	)
+
+	assert early == {"planned": 0, "skipped": 0, "uploaded": 1}
+	assert full == {"planned": 0, "skipped": 1, "uploaded": 2}
+	assert [upload[2] for upload in client.uploads] == [
+		"dataset/1400_1400_1400/0.shard",
+		"dataset/provenance",
+		"dataset/info",
+	]
+	# The early sync lists only its scale prefix, never the root.
+	assert client.list_calls == 2
+
+
 def test_sharded_tree_validation_rejects_unsharded_scale(load_module, tmp_path):
 	module = load_module("mctutil/transport/s3upload.py")
 	source = tmp_path / "not-sharded"
@@ -294,3 +385,219 @@ def test_sharded_tree_validation_rejects_unsharded_scale(load_module, tmp_path):
 
 	assert result.exit_code != 0
 	assert "scale 0 is not sharded" in result.output
+
+
+class ConcurrentClient(FakeClient):
+	def __init__(self):
+		super().__init__()
+		self.lock = threading.Lock()
+		self.active = 0
+		self.peak = 0
+		self.configs = {}
+
+	def upload_file(self, filename, bucket, key, ExtraArgs, Callback=None, Config=None):
+		with self.lock:
+			self.active += 1
+			self.peak = max(self.peak, self.active)
+			self.configs[key] = Config
+		time.sleep(0.02)
+		with self.lock:
+			self.active -= 1
+		super().upload_file(filename, bucket, key, ExtraArgs, Callback)
+
+
+def test_single_scale_fans_out_objects_and_uploads_root_info_last(
+	load_module,
+	tmp_path,
+	monkeypatch,
+):
+	module = load_module("mctutil/transport/s3upload.py")
+	monkeypatch.setattr(module, "ClientError", FakeClientError)
+	source = make_sharded_tree(tmp_path / "staged")
+	for index in range(1, 12):
+		(source / "700_700_700" / f"{index}.shard").write_bytes(b"mip0")
+	client = ConcurrentClient()
+	monkeypatch.setattr(
+		module,
+		"_get_session",
+		lambda _profile: types.SimpleNamespace(client=lambda _name: client),
+	)
+
+	counts = module.upload_sharded_tree(
+		source,
+		"dataset",
+		"bucket",
+		jobs=4,
+		execute=True,
+	)
+
+	order = [upload[2] for upload in client.uploads]
+	assert counts["uploaded"] == 15
+	assert 1 < client.peak <= 4
+	assert order[-2:] == ["dataset/provenance", "dataset/info"]
+	assert client.configs["dataset/info"].max_concurrency == 4
+	assert min(config.max_concurrency for config in client.configs.values()) == 1
+
+
+def test_sync_phases_order_scale_data_before_root_metadata(load_module, tmp_path):
+	module = load_module("mctutil/transport/s3upload.py")
+	source = make_sharded_tree(tmp_path / "staged")
+	scales = module.read_sharded_scales(source)
+	groups = module.inventory_sharded_tree(source, "dataset", scales)
+
+	phases = module.sync_phases(source, groups)
+
+	assert [[item.key for item in phase] for phase in phases] == [
+		["dataset/700_700_700/0.shard", "dataset/1400_1400_1400/0.shard"],
+		["dataset/provenance"],
+		["dataset/info"],
+	]
+
+
+def test_listing_index_and_manifest_etags_skip_unchanged_objects(tmp_path, monkeypatch):
+	boto3 = pytest.importorskip("boto3")
+	moto = pytest.importorskip("moto")
+	from mctutil.transport import s3upload
+
+	source = make_sharded_tree(tmp_path / "staged")
+	for index in range(1, 1_200):
+		(source / "700_700_700" / f"{index}.shard").write_bytes(b"mip0")
+	for path in source.rglob("*"):
+		os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+	requests = []
+	monkeypatch.delenv("AWS_PROFILE", raising=False)
+
+	with moto.mock_aws():
+		session = boto3.Session(
+			aws_access_key_id="testing",
+			aws_secret_access_key="testing",
+			region_name="us-east-1",
+		)
+		client = session.client("s3")
+		client.create_bucket(Bucket="bucket")
+		client.meta.events.register(
+			"before-call.s3.*",
+			lambda model, **_kwargs: requests.append(model.name),
+		)
+		monkeypatch.setattr(s3upload, "configure_aws_profile", lambda *_args: "test")
+		monkeypatch.setattr(
+			s3upload,
+			"_get_session",
+			lambda _profile: types.SimpleNamespace(client=lambda _name: client),
+		)
+
+		first = s3upload.upload_sharded_tree(source, "dataset", "bucket", jobs=4, execute=True)
+		requests.clear()
+		second = s3upload.upload_sharded_tree(
+			source, "dataset", "bucket", jobs=4, execute=True, verify_remote=True
+		)
+		verified = list(requests)
+		requests.clear()
+		repeated = s3upload.upload_sharded_tree(
+			source, "dataset", "bucket", jobs=4, execute=True, verify_remote=True
+		)
+		unchanged = set(requests)
+		requests.clear()
+		(source / "provenance").write_text("{\"changed\": 1}", encoding="utf-8")
+		os.utime(source / "info")
+		third = s3upload.upload_sharded_tree(source, "dataset", "bucket", jobs=4, execute=True)
+
+	assert first["uploaded"] == 1_203
+	assert second == repeated == {"planned": 0, "skipped": 1_203, "uploaded": 0}
+	# Same-size objects are confirmed once by HEAD metadata, never by upload time.
+	assert verified.count("HeadObject") == 1_203
+	# The manifest then holds their listed ETags; 1,200 MIP-0 keys span two
+	# ListObjectsV2 pages and need no per-object requests.
+	assert unchanged == {"ListObjectsV2"}
+	assert third == {"planned": 0, "skipped": 1_201, "uploaded": 2}
+	# Only the root prefix held changed files, and only the touched same-size
+	# info needed its metadata checked.
+	assert requests.count("ListObjectsV2") == 1
+	assert requests.count("HeadObject") == 1
+
+
+def test_rerun_after_failure_resumes_from_local_manifest(
+	load_module,
+	tmp_path,
+	monkeypatch,
+):
+	module = load_module("mctutil/transport/s3upload.py")
+	monkeypatch.setattr(module, "ClientError", FakeClientError)
+	source = make_sharded_tree(tmp_path / "staged")
+	client = FakeClient()
+	upload = client.upload_file
+
+	def fail_mip1(filename, bucket, key, ExtraArgs, Callback=None, Config=None):
+		if "1400_1400_1400" in key:
+			raise OSError("connection reset")
+		upload(filename, bucket, key, ExtraArgs, Callback)
+
+	monkeypatch.setattr(client, "upload_file", fail_mip1)
+	monkeypatch.setattr(
+		module,
+		"_get_session",
+		lambda _profile: types.SimpleNamespace(client=lambda _name: client),
+	)
+
+	with pytest.raises(RuntimeError, match="1400_1400_1400/0.shard"):
+		module.upload_sharded_tree(source, "dataset", "bucket", jobs=1, execute=True)
+	manifest = module.SyncManifest.for_destination(source, "bucket", "dataset")
+	assert set(manifest.entries) == {"dataset/700_700_700/0.shard"}
+
+	monkeypatch.setattr(client, "upload_file", upload)
+	with (manifest.path).open("a", encoding="utf-8") as handle:
+		handle.write('{"key": "truncat')
+	counts = module.upload_sharded_tree(source, "dataset", "bucket", jobs=1, execute=True)
+
+	assert counts == {"planned": 0, "skipped": 1, "uploaded": 3}
+	assert [upload[2] for upload in client.uploads].count("dataset/700_700_700/0.shard") == 1
+	lines = manifest.path.read_text(encoding="utf-8").splitlines()
+	assert sorted(json.loads(line)["key"] for line in lines) == [
+		"dataset/1400_1400_1400/0.shard",
+		"dataset/700_700_700/0.shard",
+		"dataset/info",
+		"dataset/provenance",
+	]
+	assert not any(".mctutil-sync" in upload[2] for upload in client.uploads)
+
+
+def test_manifest_trusts_only_unchanged_size_and_mtime(tmp_path):
+	from mctutil.transport.sync_manifest import SyncManifest
+
+	path = tmp_path / "staged" / "shard"
+	path.parent.mkdir()
+	path.write_bytes(b"abc")
+	item = types.SimpleNamespace(key="k", size=3, mtime_ns=path.stat().st_mtime_ns)
+	manifest = SyncManifest.for_destination(tmp_path / "staged", "bucket", "a/b")
+	manifest.record(item, "etag")
+	manifest.close()
+
+	reloaded = SyncManifest(manifest.path)
+	assert manifest.path.name == "bucket%2Fa%2Fb.jsonl"
+	assert reloaded.entries["k"].etag == "etag"
+	assert reloaded.matches(item)
+	assert not reloaded.matches(types.SimpleNamespace(key="k", size=3, mtime_ns=item.mtime_ns + 1))
+	assert not reloaded.matches(types.SimpleNamespace(key="other", size=3, mtime_ns=item.mtime_ns))
+
+
+def test_newer_remote_upload_time_does_not_hide_a_changed_file(load_module, tmp_path, monkeypatch):
+	module = load_module("mctutil/transport/s3upload.py")
+	monkeypatch.setattr(module, "ClientError", FakeClientError)
+	source = make_sharded_tree(tmp_path / "staged")
+	client = FakeClient()
+	monkeypatch.setattr(
+		module,
+		"_get_session",
+		lambda _profile: types.SimpleNamespace(client=lambda _name: client),
+	)
+	module.upload_sharded_tree(source, "dataset", "bucket", jobs=1, execute=True)
+
+	# Same size, preserved old mtime: the remote object is newer by upload time.
+	shard = source / "700_700_700" / "0.shard"
+	shard.write_bytes(b"MIP0")
+	os.utime(shard, ns=(1_000_000_000, 1_000_000_000))
+	client.uploads.clear()
+	counts = module.upload_sharded_tree(source, "dataset", "bucket", jobs=1, execute=True)
+
+	assert counts["uploaded"] == 1
+	assert [upload[2] for upload in client.uploads] == ["dataset/700_700_700/0.shard"]
@@ -3,6 +3,8 @@ from __future__ import annotations
 import importlib
 import json
 from pathlib import Path
+import threading
+import time
 import tomllib
 import types
 
@@ -141,6 +143,7 @@ def test_run_stage_dispatches_sibling_commands_by_keyword(
 		"stage_include_mip0": True,
 		"upload_include_mip0": True,
 		"upload_jobs": 3,
+		"upload_verify_remote": False,
 		"mesh_at": "s3",
 		"mesh_mip": 0,
 		"mesh_num_lod": 4,
@@ -169,9 +172,75 @@ def test_run_stage_dispatches_sibling_commands_by_keyword(
 	assert calls["shard"][1]["capacity_override"] == 2 * 1024 ** 3
 	assert calls["shard"][1]["parallel"] == 2
 	assert calls["upload"][1]["aws_profile"] == "test-profile"
+	assert calls["upload"][1]["verify_remote"] is False
 	assert calls["mesh"][1]["aws_profile"] == "test-profile"
 
 
+def test_shard_stage_uploads_each_finished_scale_without_root_metadata(
+	load_module,
+	tmp_path,
+	monkeypatch,
+):
+	module = load_module("mctutil/ng/publish.py")
+	uploads = []
+
+	def shard(**kwargs):
+		if kwargs["on_scale_complete"] is None:
+			return
+		for mip in (0, 1, 2):
+			kwargs["on_scale_complete"](mip)
+
+	def upload_sharded_tree(**kwargs):
+		uploads.append(kwargs)
+		if kwargs["mips"] == (2,):
+			raise RuntimeError("network down")
+
+	modules = {
+		"mctutil.ng.shard": types.SimpleNamespace(
+			shard=types.SimpleNamespace(callback=shard),
+		),
+		"mctutil.transport.s3upload": types.SimpleNamespace(
+			upload_sharded_tree=upload_sharded_tree,
+		),
+	}
+	monkeypatch.setattr(module.importlib, "import_module", lambda name: modules[name])
+	monkeypatch.setattr(
+		module,
+		"dataset_resources",
+		lambda *_args, **_kwargs: types.SimpleNamespace(shard_ceiling=1, shard_workers=1),
+	)
+	plan = types.SimpleNamespace(
+		dataset=tmp_path / "cell",
+		layer_type="image",
+		precomputed=tmp_path / "precomputed",
+		staged=tmp_path / "staged",
+	)
+	options = {
+		"effective_stages": module.STAGES,
+		"aws_profile": None,
+		"stage_include_mip0": True,
+		"upload_include_mip0": False,
+		"upload_jobs": 4,
+		"release_queue_leases": True,
+		"s3_prefix": "s3://bucket/prefix",
+	}
+
+	module.run_stage("shard", plan, options)
+
+	assert [upload["mips"] for upload in uploads] == [(1,), (2,)]
+	assert all(upload["include_root"] is False for upload in uploads)
+	assert uploads[0]["target_folder"] == "prefix/cell_precomputed_sharded"
+	assert uploads[0]["jobs"] == 4
+
+	uploads.clear()
+	module.run_stage(
+		"shard",
+		plan,
+		{**options, "effective_stages": module.STAGES[:-2] + ("mesh",)},
+	)
+	assert uploads == []
+
+
 def test_publish_dry_run_reports_metadata_and_never_writes(
 	load_module,
 	tmp_path,
@@ -469,3 +538,128 @@ def test_publish_rejects_contradictory_stage_controls(load_module, tmp_path):
 
 	assert result.exit_code != 0
 	assert "contradicts --no-upload" in result.output
+
+
+def test_publish_overlaps_one_datasets_upload_with_anothers_compute(
+	load_module,
+	tmp_path,
+	monkeypatch,
+):
+	module = load_module("mctutil/ng/publish.py")
+	root = tmp_path / "root"
+	root.mkdir()
+	datasets = [make_dataset(root, name) for name in ("alpha", "beta")]
+	monkeypatch.setattr(module, "module_available", lambda _name: True)
+	monkeypatch.setattr(module, "system_resources", lambda: (32 * 1024 ** 3, 2))
+	lock = threading.Lock()
+	compute = {"active": 0, "peak": 0}
+	beta_precompute = threading.Event()
+	overlapped = []
+
+	def run_stage(stage, plan, _options):
+		if stage == "upload":
+			if plan.dataset.name == "alpha":
+				overlapped.append(beta_precompute.wait(5))
+			return
+		with lock:
+			compute["active"] += 1
+			compute["peak"] = max(compute["peak"], compute["active"])
+		if (plan.dataset.name, stage) == ("beta", "precompute"):
+			beta_precompute.set()
+		time.sleep(0.01)
+		with lock:
+			compute["active"] -= 1
+
+	monkeypatch.setattr(module, "run_stage", run_stage)
+
+	result = CliRunner().invoke(
+		module.publish,
+		[str(root), "--s3-prefix", "s3://bucket/prefix"],
+	)
+
+	assert result.exit_code == 0, result.output
+	assert overlapped == [True]
+	# Every compute stage claims both CPUs, so those never overlap.
+	assert compute["peak"] == 1
+	for dataset in datasets:
+		state = json.loads(
+			(dataset / ".mctutil_ng_publish.json").read_text(encoding="utf-8")
+		)
+		assert {
+			stage: record["status"] for stage, record in state["stages"].items()
+		} == {
+			"prep": "omitted",
+			"precompute": "complete",
+			"downsample": "complete",
+			"shard": "complete",
+			"upload": "complete",
+			"mesh": "omitted",
+		}
+
+
+def test_stage_graph_stops_scheduling_after_a_failure(load_module, tmp_path, monkeypatch):
+	module = load_module("mctutil/ng/publish.py")
+	root = tmp_path / "root"
+	root.mkdir()
+	for name in ("alpha", "beta"):
+		make_dataset(root, name)
+	monkeypatch.setattr(module, "module_available", lambda _name: True)
+	monkeypatch.setattr(module, "system_resources", lambda: (32 * 1024 ** 3, 1))
+	calls = []
+
+	def run_stage(stage, plan, _options):
+		calls.append((plan.dataset.name, stage))
+		if stage == "downsample":
+			raise RuntimeError(f"{plan.dataset.name} downsample failed")
+
+	monkeypatch.setattr(module, "run_stage", run_stage)
+
+	result = CliRunner().invoke(module.publish, [str(root), "--no-upload"])
+
+	assert result.exit_code != 0
+	assert calls == [("alpha", "precompute"), ("alpha", "downsample")]
+	state = json.loads(
+		(root / "beta" / ".mctutil_ng_publish.json").read_text(encoding="utf-8")
+	)
+	assert "precompute" not in state["stages"]
+
+
+def test_resource_budget_clamps_and_limits_each_class(load_module):
+	module = load_module("mctutil/ng/publish.py")
+	budget = module.ResourceBudget(cpu=4, memory=0)
+	upload = module.StageDemand(network=1)
+	compute = budget.clamp(module.StageDemand(cpu=16, memory=10))
+
+	assert compute == module.StageDemand(cpu=4)
+	budget.acquire(compute)
+	assert budget.fits(upload)
+	assert not budget.fits(module.StageDemand(cpu=1))
+	budget.acquire(upload)
+	assert not budget.fits(module.StageDemand(network=1))
+	budget.release(compute)
+	assert budget.fits(module.StageDemand(cpu=4))
+
+
+def test_precompute_demand_claims_its_staging_memory(load_module, tmp_path, monkeypatch):
+	import numpy as np
+	import tifffile
+
+	from mctutil.ng import precompute
+
+	module = load_module("mctutil/ng/publish.py")
+	root = tmp_path / "root"
+	root.mkdir()
+	dataset = root / "sample"
+	dataset.mkdir()
+	volume = dataset / "volume_MEMMAP_original.tif"
+	tifffile.imwrite(volume, np.zeros((8, 16, 32), np.uint16), photometric="minisblack")
+	plan = module.build_dataset_plan(dataset, True)
+	options = {"selected_stages": ("precompute",), "workers": 3, "memory_capacity": 0}
+
+	demand = module.stage_demand("precompute", plan, options)
+
+	# Two staging slots of three 16 x 32 uint16 planes.
+	assert demand == module.StageDemand(cpu=3, memory=2 * 3 * 16 * 32 * 2)
+	assert precompute.staging_bytes(precompute.discover_input(volume), 3) == demand.memory
+	monkeypatch.setattr(module, "staging_memory_budget", lambda _capacity: 1024)
+	assert module.stage_demand("precompute", plan, {**options, "memory_capacity": 4096}).memory == 1024
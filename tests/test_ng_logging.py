@@ -250,6 +250,7 @@ def test_z_plane_progress_spans_reduced_worker_retry(
 		z_indices,
 		workers,
 		progress,
+		**_options,
 	):
 		calls.append((tuple(z_indices), workers))
 		if len(calls) == 1:
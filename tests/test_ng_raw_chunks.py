@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import tifffile
+from click.testing import CliRunner
+from cloudvolume import CloudVolume
+
+from mctutil.ng.completeness import check_mip0_completeness
+from mctutil.ng.raw_chunks import RawChunkWriter
+import mctutil.ng.precompute as precompute_module
+
+
+def _create_layer(path, shape, chunk_size, voxel_offset=(0, 0, 0), dtype="uint16"):
+	info = CloudVolume.create_new_info(
+		num_channels=1,
+		layer_type="image",
+		data_type=dtype,
+		encoding="raw",
+		resolution=[700, 700, 700],
+		voxel_offset=list(voxel_offset),
+		chunk_size=list(chunk_size),
+		volume_size=list(shape),
+	)
+	volume = CloudVolume(path.resolve().as_uri(), info=info, parallel=False, compress=False)
+	volume.commit_info()
+	return volume
+
+
+def test_native_raw_chunks_match_cloudvolume_files_byte_for_byte(tmp_path):
+	shape, chunk_size, offset = (5, 6, 7), (2, 4, 3), (10, 20, 30)
+	data = np.arange(np.prod(shape), dtype=np.uint16).reshape(shape, order="F")
+	reference = _create_layer(tmp_path / "reference", shape, chunk_size, offset)
+	reference[:, :, :, 0:1] = data[:, :, :, None]
+	_create_layer(tmp_path / "native", shape, chunk_size, offset)
+
+	writer = RawChunkWriter(tmp_path / "native")
+	assert writer.write((10, 20, 30), data[:, :, :3]) == 6
+	writer[:, :, 33:37, 0:1] = data[:, :, 3:, None]
+
+	reference_files = {path.name: path.read_bytes() for path in (tmp_path / "reference" / "700_700_700").iterdir()}
+	native_files = {path.name: path.read_bytes() for path in (tmp_path / "native" / "700_700_700").iterdir()}
+	assert native_files == reference_files
+	assert check_mip0_completeness(tmp_path / "native").complete
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_native_compressed_chunks_read_back_through_cloudvolume(tmp_path, compression):
+	shape = (8, 4, 4)
+	data = np.random.default_rng(0).integers(0, 1000, size=shape, dtype=np.uint16)
+	_create_layer(tmp_path / "layer", shape, (4, 4, 2))
+	RawChunkWriter(tmp_path / "layer", compression="none").write((0, 0, 0), data)
+
+	writer = RawChunkWriter(tmp_path / "layer", compression=compression, level=3)
+	writer.write((0, 0, 0), data)
+
+	suffix = ".gz" if compression == "gzip" else ".zstd"
+	names = [path.name for path in (tmp_path / "layer" / "700_700_700").iterdir()]
+	assert len(names) == 4 and all(name.endswith(suffix) for name in names)
+	volume = CloudVolume((tmp_path / "layer").resolve().as_uri(), parallel=False)
+	assert np.array_equal(np.asarray(volume[:, :, :, 0])[..., 0], data)
+	completeness = check_mip0_completeness(tmp_path / "layer")
+	assert completeness.complete
+	assert completeness.metric == "chunks"
+
+
+def test_native_writer_rejects_unaligned_or_mismatched_blocks(tmp_path):
+	_create_layer(tmp_path / "layer", (4, 4, 4), (2, 2, 2))
+	writer = RawChunkWriter(tmp_path / "layer")
+
+	with pytest.raises(ValueError, match="not aligned"):
+		writer.write((0, 0, 1), np.zeros((4, 4, 2), dtype=np.uint16))
+	with pytest.raises(ValueError, match="outside bounds"):
+		writer.write((0, 0, 2), np.zeros((4, 4, 4), dtype=np.uint16))
+	with pytest.raises(ValueError, match="expected uint16"):
+		writer.write((0, 0, 0), np.zeros((4, 4, 2), dtype=np.float32))
+	with pytest.raises(ValueError, match="compression level"):
+		RawChunkWriter(tmp_path / "layer", level=3)
+
+
+def test_native_writer_replaces_chunks_whole(tmp_path, monkeypatch):
+	_create_layer(tmp_path / "layer", (4, 4, 2), (4, 4, 2))
+	writer = RawChunkWriter(tmp_path / "layer")
+	writer.write((0, 0, 0), np.ones((4, 4, 2), dtype=np.uint16))
+	chunk = tmp_path / "layer" / "700_700_700" / "0-4_0-4_0-2"
+	original = chunk.read_bytes()
+
+	def interrupted(_source, _target):
+		raise KeyboardInterrupt
+
+	monkeypatch.setattr("mctutil.ng.raw_chunks.os.replace", interrupted)
+	with pytest.raises(KeyboardInterrupt):
+		writer.write((0, 0, 0), np.full((4, 4, 2), 7, dtype=np.uint16))
+
+	assert chunk.read_bytes() == original
+	assert [path.name for path in chunk.parent.iterdir()] == [chunk.name]
+
+
+def test_precompute_native_writer_matches_cloudvolume_writer(tmp_path, monkeypatch):
+	monkeypatch.setattr(precompute_module, "_require_cloudvolume", lambda: CloudVolume)
+	input_path = tmp_path / "sample.tif"
+	source = np.arange(5 * 6 * 4, dtype=np.uint16).reshape(5, 6, 4)
+	tifffile.imwrite(input_path, source, photometric="minisblack")
+	outputs = {}
+	for writer, compression in (("cloudvolume", "none"), ("auto", "none"), ("native", "gzip")):
+		output_path = tmp_path / f"{writer}_{compression}"
+		result = CliRunner().invoke(
+			precompute_module.precompute,
+			[
+				str(input_path),
+				str(output_path),
+				"--workers", "1",
+				"--chunk-size", "2,4,2",
+				"--chunk-writer", writer,
+				"--chunk-compression", compression,
+			],
+		)
+		assert result.exit_code == 0, result.output
+		outputs[writer, compression] = {
+			path.name: path.read_bytes() for path in (output_path / "700_700_700").iterdir()
+		}
+		volume = CloudVolume(output_path.resolve().as_uri(), parallel=False)
+		assert np.array_equal(np.asarray(volume[:, :, :, 0])[..., 0], source.transpose(2, 1, 0))
+
+	assert outputs["auto", "none"] == outputs["cloudvolume", "none"]
+	assert precompute_module._resolve_chunk_writer("raw", "auto", "none", None) == "cloudvolume"
+	assert precompute_module._resolve_chunk_writer("raw", "auto", "zstd", None) == "native"
+	assert all(name.endswith(".gz") for name in outputs["native", "gzip"])
+
+
+def test_precompute_rejects_compression_without_the_native_writer(tmp_path):
+	input_path = tmp_path / "labels_seg.tif"
+	tifffile.imwrite(input_path, np.zeros((2, 2, 2), dtype=np.uint32), photometric="minisblack")
+
+	for arguments in (
+		["--chunk-writer", "cloudvolume", "--chunk-compression", "gzip"],
+		["--layer-type", "segmentation", "--chunk-writer", "native"],
+		["--compression-level", "4"],
+	):
+		result = CliRunner().invoke(
+			precompute_module.precompute,
+			[str(input_path), str(tmp_path / "out"), "--dry-run", *arguments],
+		)
+		assert result.exit_code != 0
+		assert "writer" in result.output or "compression" in result.output
@@ -7,6 +7,7 @@ import types
 import pytest
 
 from mctutil.ng import resource_planning
+from mctutil.shared.resource_monitor import MemoryPressure
 
 
 GIB = 1024 ** 3
@@ -270,6 +271,7 @@ def publish_options(module, **updates):
 		"stage_include_mip0": True,
 		"upload_include_mip0": True,
 		"upload_jobs": 6,
+		"upload_verify_remote": False,
 		"mesh_at": "local",
 		"mesh_mip": 0,
 		"mesh_num_lod": 4,
@@ -378,3 +380,62 @@ def test_shard_resume_fingerprint_ignores_workers_but_tracks_capacity(
 
 	assert fewer_workers == baseline
 	assert different_capacity != baseline
+
+
+def test_concurrency_controller_tracks_memory_watermarks(tmp_path):
+	samples = iter([
+		resource_planning.MemoryPressure(95, 100),
+		resource_planning.MemoryPressure(90, 100),
+		None,
+		resource_planning.MemoryPressure(70, 100),
+		resource_planning.MemoryPressure(10, 100),
+		resource_planning.MemoryPressure(10, 100),
+		resource_planning.MemoryPressure(10, 100),
+	])
+	now = [0.0]
+	controller = resource_planning.ConcurrencyController(
+		maximum=8,
+		limit=8,
+		sample=lambda: next(samples),
+		clock=lambda: now[0],
+	)
+
+	assert controller.update() == 7
+	assert controller.update() == 7
+	limits = []
+	for _ in range(6):
+		now[0] += 1.0
+		limits.append(controller.update())
+	assert limits == [6, 6, 6, 7, 8, 8]
+
+	with pytest.raises(ValueError, match="watermarks"):
+		resource_planning.ConcurrencyController(1, 1, lambda: None, low_water=0.9)
+
+
+def test_settled_workers_round_trip(tmp_path):
+	assert resource_planning.load_settled_workers(tmp_path) is None
+	resource_planning.store_settled_workers(tmp_path / "layer", 5)
+	assert resource_planning.load_settled_workers(tmp_path / "layer") == 5
+	(tmp_path / "layer" / resource_planning.SETTLED_WORKERS_NAME).write_text("{}", encoding="utf-8")
+	assert resource_planning.load_settled_workers(tmp_path / "layer") is None
+
+
+def test_staging_budget_leaves_the_reserve_and_live_headroom():
+	assert resource_planning.staging_memory_budget(16 * GIB) == 6 * GIB
+	assert resource_planning.staging_memory_budget(
+		16 * GIB,
+		MemoryPressure(current=10 * GIB, limit=12 * GIB),
+	) == GIB
+
+
+@pytest.mark.parametrize(
+	("budget", "expected"),
+	(
+		(100 * GIB, (8, 2)),
+		(8 * GIB, (8, 1)),
+		(3 * GIB, (3, 1)),
+		(1, (1, 1)),
+	),
+)
+def test_fit_staging_drops_slots_before_batch_width(budget, expected):
+	assert resource_planning.fit_staging(GIB, 8, 2, budget) == expected
@@ -13,6 +13,7 @@ import pytest
 import mctutil.ng.completeness as completeness_module
 import mctutil.ng.precompute as precompute_module
 from mctutil.ng.completeness import check_mip0_completeness
+from mctutil.shared.resource_monitor import MemoryPressure
 
 
 def write_info(
@@ -116,7 +117,7 @@ def test_precompute_retries_only_in_process_incomplete_planes(monkeypatch, tmp_p
 	failure = BrokenProcessPool("worker died")
 	calls = []
 
-	def execute(_cloudpath, _spec, _plan, z_indices, workers, progress):
+	def execute(_cloudpath, _spec, _plan, z_indices, workers, progress, **_options):
 		calls.append((tuple(z_indices), workers))
 		if len(calls) == 1:
 			progress.update(101)
@@ -306,7 +307,7 @@ def test_persistent_queue_resume_can_preserve_existing_leases(
 	)
 	observed = {}
 
-	def drain(queue_url, _parallel, _lease_seconds, poll):
+	def drain(queue_url, _parallel, _lease_seconds, poll, lease_batch, insertion_done, insert_lock):
 		resumed = taskqueue.TaskQueue(queue_url, progress=False)
 		observed["leased"] = resumed.leased
 		resumed.delete(leased_task, tally=True)
@@ -382,3 +383,78 @@ def test_queue_fingerprint_mismatch_fails_before_queue_mutation(
 		)
 
 	assert not constructed
+
+
+def test_precompute_task_window_holds_the_controller_limit(monkeypatch):
+	from concurrent.futures import ThreadPoolExecutor
+	import threading
+	import time
+
+	running = [0, 0]
+	lock = threading.Lock()
+
+	def fake_write(work_item):
+		with lock:
+			running[0] += 1
+			running[1] = max(running)
+		time.sleep(0.01)
+		with lock:
+			running[0] -= 1
+		return work_item
+
+	monkeypatch.setattr(precompute_module, "_write_slice", fake_write)
+	controller = precompute_module.ConcurrencyController(
+		maximum=4,
+		limit=2,
+		sample=lambda: None,
+	)
+	completed = set()
+	with ThreadPoolExecutor(max_workers=4) as pool:
+		window = precompute_module._TaskWindow(pool, 4, completed, controller=controller)
+		for z_index in range(12):
+			window.submit((z_index, z_index + 1))
+		window.collect(window.pending)
+
+	assert completed == set(range(12))
+	assert running[1] == 2
+	assert not window.pending
+
+
+def test_precompute_starts_at_and_records_settled_concurrency(monkeypatch, tmp_path):
+	spec = precompute_module.InputSpec(
+		mode="directory",
+		source=(),
+		shape=(8, 2, 2),
+		dtype=np.dtype("uint16"),
+	)
+	pressure = MemoryPressure(90, 100)
+	monkeypatch.setattr(precompute_module, "current_memory_pressure", lambda: pressure)
+	starts = []
+
+	def execute(_cloudpath, _spec, _plan, z_indices, workers, progress, controller, **_options):
+		starts.append((workers, controller.limit))
+		controller.update()
+		progress.update(len(z_indices))
+		return precompute_module.WorkerBatchResult(frozenset(z_indices), None)
+
+	monkeypatch.setattr(precompute_module, "_execute_slices", execute)
+	output = tmp_path / "output"
+
+	precompute_module.write_all_slices(output, spec, types.SimpleNamespace(), 6)
+	precompute_module.write_all_slices(output, spec, types.SimpleNamespace(), 6)
+
+	assert starts == [(6, 6), (6, 5)]
+	assert precompute_module.load_settled_workers(output) == 4
+
+	monkeypatch.setattr(precompute_module, "current_memory_pressure", lambda: None)
+	controllers = []
+
+	def execute_unmonitored(_cloudpath, _spec, _plan, z_indices, _workers, progress, controller, **_options):
+		controllers.append(controller)
+		progress.update(len(z_indices))
+		return precompute_module.WorkerBatchResult(frozenset(z_indices), None)
+
+	monkeypatch.setattr(precompute_module, "_execute_slices", execute_unmonitored)
+	precompute_module.write_all_slices(output, spec, types.SimpleNamespace(), 6)
+	assert controllers == [None]
+	assert precompute_module.load_settled_workers(output) == 4
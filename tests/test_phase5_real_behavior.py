@@ -23,6 +23,20 @@ class SerialPool:
 	def starmap(self, func, iterable):
 		return [func(*args) for args in iterable]
 
+	def starmap_async(self, func, iterable, callback=None):
+		result = SerialResult(self.starmap(func, iterable))
+		if callback is not None:
+			callback(result.value)
+		return result
+
+
+class SerialResult:
+	def __init__(self, value):
+		self.value = value
+
+	def get(self):
+		return self.value
+
 
 def fake_distribute_read(target_mem, _pj, window, _int_window, image_order, **_kwargs):
 	with target_mem as target:
@@ -310,3 +324,53 @@ def test_sinogram_dry_run_writes_nothing(load_module, tmp_path, monkeypatch):
 
 	assert result.exit_code == 0, result.output
 	assert not output_dir.exists()
+
+
+def test_sinogram_full_mode_pipelines_windows_through_persistent_pools(load_module, tmp_path, monkeypatch):
+	module = load_module("mctutil/transform/sinogram.py")
+	messages = []
+	monkeypatch.setattr(module.log, "write", lambda step, statement="", *_args, **_kwargs: messages.append(step))
+
+	input_dir = tmp_path / "input"
+	flat_dir = tmp_path / "flats"
+	output_dir = tmp_path / "output"
+	input_dir.mkdir()
+	flat_dir.mkdir()
+	projections = [np.arange(20, dtype=np.uint16).reshape(5, 4) + 10 * index for index in range(3)]
+	for index, data in enumerate(projections):
+		tifffile.imwrite(input_dir / f"proj_{index}.tif", data, compression=None)
+	for name, value in {"pregain": 2, "postgain": 2, "predark": 0, "postdark": 0}.items():
+		tifffile.imwrite(flat_dir / f"{name}_median.tiff", np.full((5, 4), value, dtype=np.uint16))
+
+	result = CliRunner().invoke(
+		module.sino_convert,
+		["--mode", "full", "-i", str(input_dir), "-o", str(output_dir), "-f", str(flat_dir), "-p", "2"],
+		catch_exceptions=False,
+	)
+
+	assert result.exit_code == 0, result.output
+	stack = np.stack(projections).astype(np.float32) / 2
+	for row in range(5):
+		np.testing.assert_array_equal(tifffile.imread(output_dir / f"sino_{row:05}.tiff"), stack[:, row, :])
+	assert messages.count("Cycle Start") == 3
+	assert {"Read Throughput", "Normalize Throughput", "Write Throughput"} <= set(messages)
+
+
+def test_sinogram_write_time_is_summed_inside_the_workers(load_module, tmp_path):
+	module = load_module("mctutil/transform/sinogram.py")
+	submitted = []
+
+	class QueuedPool:
+		def starmap_async(self, function, arguments, callback):
+			submitted.append((function, arguments))
+			callback([0.25, 0.5])
+
+	pipeline = module.WindowPipeline(
+		QueuedPool(), None, {}, [], None, (None, None), ("sino", "sino"), [tmp_path / "a", tmp_path / "b"], 2,
+		execute=False,
+	)
+
+	pipeline.write(0, range(0, 2))
+
+	assert submitted[0][0] is module.timed_sino_write
+	assert pipeline.seconds["write"] == 0.75
@@ -142,7 +142,7 @@ def test_resumed_queue_progress_starts_at_durable_completion(
 		recorded["label"] = _label
 		return progress
 
-	def drain(queue_url, _parallel, _lease_seconds, poll):
+	def drain(queue_url, _parallel, _lease_seconds, poll, lease_batch, insertion_done, insert_lock):
 		resumed = taskqueue.TaskQueue(queue_url, progress=False)
 		while not resumed.is_empty():
 			task = resumed.lease(seconds=60)
@@ -203,8 +203,10 @@ def test_queue_workers_are_capped_by_unfinished_tasks(
 		recorded["progress"] = progress
 		return progress
 
-	def drain(_queue_url, parallel, _lease_seconds, poll):
+	def drain(_queue_url, parallel, _lease_seconds, poll, lease_batch, insertion_done, insert_lock):
 		recorded["parallel"] = parallel
+		recorded["lease_batch"] = lease_batch
+		recorded["insertion_done"] = insertion_done
 		queue.completed = total
 		poll()
 		return []
@@ -222,6 +224,8 @@ def test_queue_workers_are_capped_by_unfinished_tasks(
 	)
 
 	assert recorded["parallel"] == expected
+	assert recorded["lease_batch"] == 1
+	assert recorded["insertion_done"] is None
 	assert (
 		f"Executing queue with {expected} worker(s)"
 		in recorded["progress"].configuration["start_message"]
@@ -377,3 +381,244 @@ def test_worker_failure_closes_progress_before_diagnostics(
 	assert "Queue execution complete" not in output
 	state = module.read_state(queue_path / "mctutil-state.json")
 	assert state["status"] == "executing"
+
+
+def test_one_renewal_thread_serves_every_active_lease():
+	import threading
+	import time
+
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	renewed = []
+
+	class FakeQueue:
+		def renew(self, task, seconds):
+			renewed.append((task, seconds))
+			if task == "broken":
+				raise OSError("lease file vanished")
+
+	renewer = module.LeaseRenewer(FakeQueue(), lease_seconds=60)
+	renewer.interval = 0.01
+	threads = threading.active_count()
+	first = renewer.add(["first"])
+	renewer.add(["second"])
+	renewer.add(["broken"])
+	assert threading.active_count() == threads + 1
+	deadline = time.monotonic() + 5
+	while min(renewed.count(("first", 60)), renewed.count(("second", 60))) < 3:
+		assert time.monotonic() < deadline
+		time.sleep(0.01)
+	renewer.remove(first)
+	stopped_at = renewed.count(("first", 60))
+	time.sleep(0.05)
+	renewer.close()
+
+	assert renewed.count(("first", 60)) == stopped_at
+	assert renewed.count(("broken", 60)) == 1
+	assert renewer._thread.is_alive() is False
+
+
+def test_serial_worker_reuses_output_buffers_and_reports_timing(tmp_path, capsys):
+	taskqueue = pytest.importorskip("taskqueue")
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	queue_url = module.file_queue_url(tmp_path / "queue")
+	queue = taskqueue.TaskQueue(queue_url, progress=False)
+	queue.insert([taskqueue.PrintTask(f"task {index}") for index in range(3)])
+
+	events = module.drain_file_queue(queue_url, 1, 60, task_modules=())
+
+	outputs = sorted(event["stdout"] for event in events if event["status"] == "complete")
+	# Each reused buffer holds only its own task's output.
+	assert outputs == [f"PrintTask(txt='task {index}'): task {index}\n" for index in range(3)]
+	timing = events[-1]
+	assert timing["status"] == "timing"
+	assert timing["tasks"] == 3
+	assert timing["execute_seconds"] > 0
+	assert queue.is_empty()
+
+	log.set_threshold(LOG_MASK_ALL)
+	try:
+		module._report_worker_timing(events)
+	finally:
+		log.set_threshold(LOG_MASK_DEFAULT)
+	assert "Task timing: 3 task(s); execute" in capsys.readouterr().out
+
+
+def test_lease_batches_grow_with_the_queue_but_keep_workers_balanced():
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+
+	assert module.lease_batch_size(30_000, 16) == module.LEASE_BATCH_MAX
+	assert module.lease_batch_size(500, 16) == 3
+	assert module.lease_batch_size(5, 4) == 1
+	assert module.lease_batch_size(5, 4, requested=7) == 7
+
+
+def _batch_queue(tmp_path, monkeypatch, module, taskqueue):
+	class CountingQueue(taskqueue.TaskQueue):
+		leases = 0
+
+		def lease(self, *args, **kwargs):
+			CountingQueue.leases += 1
+			return super().lease(*args, **kwargs)
+
+	monkeypatch.setattr(
+		module,
+		"_require_taskqueue",
+		lambda: (taskqueue.QueueEmptyError, CountingQueue),
+	)
+	queue_url = module.file_queue_url(tmp_path / "queue")
+	return CountingQueue, queue_url, taskqueue.TaskQueue(queue_url, progress=False)
+
+
+def test_workers_lease_and_acknowledge_tasks_in_batches(tmp_path, monkeypatch):
+	taskqueue = pytest.importorskip("taskqueue")
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	counting, queue_url, queue = _batch_queue(tmp_path, monkeypatch, module, taskqueue)
+	queue.insert([taskqueue.PrintTask(str(index)) for index in range(10)])
+
+	events = module.drain_file_queue(queue_url, 1, 60, task_modules=(), lease_batch=4)
+
+	# Three batches (4, 4, 2) and one final empty lease.
+	assert counting.leases == 4
+	assert events[-1]["tasks"] == 10
+	assert queue.completed == 10
+	assert queue.is_empty()
+
+
+def test_failed_batch_acknowledges_finished_tasks_and_returns_the_rest(
+	tmp_path,
+	monkeypatch,
+):
+	taskqueue = pytest.importorskip("taskqueue")
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	_counting, queue_url, queue = _batch_queue(tmp_path, monkeypatch, module, taskqueue)
+	queue.insert([taskqueue.PrintTask(str(index)) for index in range(6)])
+	executed = []
+	original = taskqueue.PrintTask.execute
+
+	def execute(task):
+		if len(executed) == 2:
+			raise RuntimeError("task exploded")
+		executed.append(task)
+		original(task)
+
+	monkeypatch.setattr(taskqueue.PrintTask, "execute", execute)
+
+	with pytest.raises(module.QueueDrainError, match="task exploded"):
+		module.drain_file_queue(queue_url, 1, 60, task_modules=(), lease_batch=5)
+
+	assert queue.completed == 2
+	assert queue.leased == 0
+	assert queue.enqueued == 4
+
+
+def test_workers_drain_while_later_batches_are_inserted(tmp_path, monkeypatch):
+	import threading
+
+	taskqueue = pytest.importorskip("taskqueue")
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	monkeypatch.setattr(module, "INSERT_BATCH_TASKS", 10)
+	executed = threading.Event()
+	original = taskqueue.PrintTask.execute
+
+	def execute(task):
+		original(task)
+		executed.set()
+
+	monkeypatch.setattr(taskqueue.PrintTask, "execute", execute)
+
+	def tasks():
+		for index in range(25):
+			if index == 20:
+				# Deadlocks (and fails) unless a worker drains the first batches.
+				assert executed.wait(timeout=30)
+			yield taskqueue.PrintTask(str(index))
+
+	queue_path = tmp_path / "streamed"
+	state = module.run_persistent_tasks(queue_path, "streamed", tasks, parallel=1)
+
+	queue = taskqueue.TaskQueue(module.file_queue_url(queue_path), progress=False)
+	assert state["status"] == "complete"
+	assert state["inserted"] == 25
+	assert queue.completed == 25
+	assert queue.is_empty()
+
+
+def test_interrupted_insertion_resumes_after_the_last_committed_task(
+	tmp_path,
+	monkeypatch,
+):
+	taskqueue = pytest.importorskip("taskqueue")
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	monkeypatch.setattr(module, "INSERT_BATCH_TASKS", 10)
+	queue_path = tmp_path / "resumed-insert"
+	generated = []
+
+	def tasks():
+		for index in range(25):
+			generated.append(index)
+			yield taskqueue.PrintTask(str(index))
+
+	insert = taskqueue.TaskQueue.insert
+
+	def interrupted_insert(queue, batch, *args, **kwargs):
+		if len(generated) == 20 and queue.inserted == 13:
+			# Dies in the middle of the second generated batch.
+			raise RuntimeError("task insertion interrupted")
+		return insert(queue, batch, *args, **kwargs)
+
+	monkeypatch.setattr(taskqueue.TaskQueue, "insert", interrupted_insert)
+	with pytest.raises(RuntimeError, match="task insertion interrupted"):
+		module.run_persistent_tasks(queue_path, "resumed-insert", tasks, parallel=1)
+	monkeypatch.setattr(taskqueue.TaskQueue, "insert", insert)
+	queue = taskqueue.TaskQueue(module.file_queue_url(queue_path), progress=False)
+	interrupted = module.read_state(queue_path / "mctutil-state.json")
+	assert interrupted["status"] == "inserting"
+	assert queue.inserted == 13
+	assert queue.completed == 13
+
+	generated.clear()
+	state = module.run_persistent_tasks(queue_path, "resumed-insert", tasks, parallel=1)
+
+	assert state["status"] == "complete"
+	assert state["inserted"] == 25
+	assert queue.completed == 25
+	assert queue.is_empty()
+	# The factory is replayed to skip committed tasks; they are not re-inserted.
+	assert generated == list(range(25))
+	assert queue.inserted == 25
+
+
+def test_tasks_are_inserted_while_holding_the_lease_lock(tmp_path):
+	import threading
+
+	taskqueue = pytest.importorskip("taskqueue")
+	module = importlib.import_module("mctutil.shared.persistent_queue")
+	queue = taskqueue.TaskQueue(module.file_queue_url(tmp_path / "locked-insert"), progress=False, n_threads=0)
+	lock = threading.Lock()
+	held = []
+	insert = queue.insert
+
+	def checked_insert(tasks):
+		held.append(lock.locked())
+		return insert(tasks)
+
+	queue.insert = checked_insert
+	inserter = module.TaskInserter(
+		queue,
+		lambda: (taskqueue.PrintTask(str(index)) for index in range(3)),
+		threading.Event(),
+		lock,
+	)
+	inserter.start()
+	inserter.join()
+
+	assert held == [True, True, True]
+	assert queue.inserted == inserter.inserted == 3
+	leased = []
+	with lock:
+		leasing = threading.Thread(target=lambda: leased.extend(module._lease_batch(queue, 60, 1, lock)))
+		leasing.start()
+		leasing.join(timeout=0.2)
+		assert leasing.is_alive() and not leased
+	leasing.join(timeout=30)
+	assert len(leased) == 1
@@ -3,6 +3,7 @@ from __future__ import annotations
 from io import StringIO
 import os
 from pathlib import Path
+import threading
 import time
 import types
 
@@ -135,6 +136,13 @@ def test_cgroup_sampler_reports_memory_categories_and_system_context(tmp_path):
 		commit_limit=4 * GIB,
 		overcommit_mode=1,
 	)
+	assert sample.limit == 4 * GIB
+
+	write(cgroup / "memory.max", f"{6 * GIB}\n")
+	limited = module._CgroupSampler(cgroup, proc_root).sample()
+	assert limited.limit == 6 * GIB
+	assert module.MemoryPressure(limited.current, limited.limit).fraction == 0.5
+	assert module.MemoryPressure(limited.current, None).fraction is None
 
 
 def test_process_tree_sampler_sums_pss_and_swap_from_rollups(tmp_path):
@@ -386,3 +394,39 @@ def test_spawned_worker_does_not_inherit_active_monitor():
 			process.terminate()
 			process.join(timeout=2.0)
 		parent.close()
+
+
+def test_stage_summary_reports_staging_slots_only_when_recorded():
+	summary = module._StageAccumulator("precompute", usage(GIB)).finish(None)
+
+	assert "staging slots" not in module.format_stage_summary(summary, 2, None)
+	message = module.format_stage_summary(summary, 2, None, staging_slots=3)
+	assert "effective workers=2; staging slots=3; peak processes" in message
+
+
+def test_overlapping_stage_is_unaccounted_and_cannot_shape_the_summary(monkeypatch):
+	monitor = module.PublishResourceMonitor()
+	requests = []
+	monkeypatch.setattr(
+		monitor,
+		"_request",
+		lambda command, value=None: requests.append(command) or command,
+	)
+
+	def overlapping_upload():
+		with monitor.stage("upload", dataset="alpha"):
+			monitor.observe_workers(12)
+			monitor.observe_staging_slots(5)
+
+	with monitor.stage("precompute", dataset="beta"):
+		worker = threading.Thread(target=overlapping_upload)
+		worker.start()
+		worker.join()
+		monitor.observe_workers(3)
+
+	assert requests == ["start", "stop"]
+	assert monitor.active_workers == 3
+	assert monitor.staging_slots is None
+	with monitor.stage("upload", dataset="alpha"):
+		pass
+	assert requests == ["start", "stop", "start", "stop"]
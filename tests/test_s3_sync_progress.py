@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 import json
 from io import StringIO
 from pathlib import Path
@@ -11,6 +12,9 @@ import pytest
 from mctutil.shared.log import log
 
 
+EPOCH = datetime.fromtimestamp(0, timezone.utc)
+
+
 class TtyBuffer(StringIO):
 	def isatty(self):
 		return True
@@ -47,10 +51,13 @@ class CallbackClient:
 	def __init__(self, *, fail_key=None):
 		self.objects = {}
 		self.uploads = []
+		self.head_calls = 0
+		self.list_calls = 0
 		self.callback_calls = 0
 		self.fail_key = fail_key
 
 	def head_object(self, Bucket, Key):
+		self.head_calls += 1
 		try:
 			return self.objects[(Bucket, Key)]
 		except KeyError:
@@ -59,7 +66,27 @@ class CallbackClient:
 				"HeadObject",
 			)
 
-	def upload_file(self, filename, bucket, key, ExtraArgs, Callback):
+	def get_paginator(self, operation):
+		assert operation == "list_objects_v2"
+		return types.SimpleNamespace(paginate=self.list_pages)
+
+	def list_pages(self, Bucket, Prefix, Delimiter=None):
+		self.list_calls += 1
+		contents = [
+			{
+				"Key": key,
+				"Size": remote["ContentLength"],
+				"ETag": '"etag"',
+				"LastModified": remote.get("LastModified", EPOCH),
+			}
+			for (bucket, key), remote in sorted(self.objects.items())
+			if bucket == Bucket
+			and key.startswith(Prefix)
+			and not (Delimiter and Delimiter in key[len(Prefix):])
+		]
+		return [{"Contents": contents}]
+
+	def upload_file(self, filename, bucket, key, ExtraArgs, Callback, Config=None):
 		path = Path(filename)
 		size = path.stat().st_size
 		self.uploads.append(key)
@@ -84,6 +111,7 @@ class CallbackClient:
 		self.objects[(bucket, key)] = {
 			"ContentLength": size,
 			"Metadata": ExtraArgs["Metadata"],
+			"LastModified": datetime.now(timezone.utc),
 		}
 
 	def _callback(self, callback, amount):
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+import tifffile
+
+import mctutil.ng.precompute as precompute_module
+import mctutil.transform.sinogram as sinogram
+from mctutil.shared.io_helpers import DecodeRead, RawReadPool, distribute_read, offset_reads
+from mctutil.shared.mem import ProjOrder, SharedNP, SinoOrder
+from mctutil.shared.tiff_layout import (
+	TiffLayout,
+	decode_alignment,
+	inspect_layouts,
+	layout_reads,
+	summarize_layouts,
+)
+
+WRITE_OPTIONS = {
+	"contiguous": {},
+	"tiled": {"tile": (16, 16)},
+	"zlib": {"compression": "zlib", "rowsperstrip": 8},
+	"big-endian": {"byteorder": ">"},
+}
+
+
+def _image(index=0, shape=(40, 30)):
+	return (np.arange(shape[0] * shape[1]).reshape(shape) + index * 1000).astype(np.uint16)
+
+
+def _write_inputs(tmp_path):
+	paths = []
+	for index, options in enumerate(WRITE_OPTIONS.values()):
+		paths.append(tmp_path / f"projection_{index}.tif")
+		tifffile.imwrite(paths[-1], _image(index), **options)
+	return paths
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_layouts_route_raw_and_decoded_rows_into_one_strided_layout(tmp_path, workers):
+	layouts = inspect_layouts(_write_inputs(tmp_path), threads=2)
+
+	assert [(layout.kind, layout.raw) for layout in layouts] == [
+		("contiguous", True),
+		("tiled", False),
+		("compressed", False),
+		("contiguous", True),
+	]
+	assert layouts[3].swapped and not layouts[0].swapped
+	assert summarize_layouts(layouts) == (
+		"2 contiguous, 1 tiled, 1 compressed; 2 raw-offset, 2 decoded (1 byte-swapped)"
+	)
+
+	row_bytes = 30 * 2
+	reads = []
+	for index, layout in enumerate(layouts):
+		reads.extend(layout_reads(layout, range(5, 37), index * row_bytes, len(layouts) * row_bytes))
+	memory = shared_memory.SharedMemory(create=True, size=32 * len(layouts) * row_bytes)
+	try:
+		with RawReadPool(workers) as pool:
+			stats = distribute_read(memory, reads, pool=pool)
+		target = np.ndarray((32, len(layouts), 30), dtype=np.uint16, buffer=memory.buf)
+		for index in range(len(layouts)):
+			np.testing.assert_array_equal(target[:, index], _image(index)[5:37])
+		del target
+	finally:
+		memory.close()
+		memory.unlink()
+	assert stats.nbytes == memory.size
+	assert stats.decoded > 0
+
+
+def test_multi_strip_layouts_read_each_strip_by_offset(tmp_path):
+	image = _image(shape=(10, 4))
+	path = tmp_path / "strips.raw"
+	gaps = [16, 40, 8]
+	with open(path, "wb") as handle:
+		offsets = []
+		for gap, strip in zip(gaps, np.array_split(image, [4, 8])):
+			handle.write(b"\xff" * gap)
+			offsets.append(handle.tell())
+			handle.write(strip.tobytes())
+	layout = TiffLayout(str(path), 0, "multi-strip", (10, 4), np.dtype(np.uint16), 4, tuple(offsets))
+
+	reads = layout_reads(layout, range(2, 9), 0)
+
+	assert [read.size for read in reads] == [2 * 8, 4 * 8, 1 * 8]
+	memory = shared_memory.SharedMemory(create=True, size=7 * 8)
+	try:
+		distribute_read(memory, reads, thread_max=1)
+		np.testing.assert_array_equal(np.ndarray((7, 4), np.uint16, buffer=memory.buf), image[2:9])
+	finally:
+		memory.close()
+		memory.unlink()
+
+
+def test_swapped_reads_land_in_native_byte_order(tmp_path):
+	path = tmp_path / "big.raw"
+	values = np.arange(12, dtype=np.uint32)
+	path.write_bytes(b"\0" * 4 + values.astype(">u4").tobytes())
+	reads = offset_reads(path, source_offset=4, target_offset=0, size=24, count=2, source_stride=24,
+		target_stride=24, swap=4)
+
+	memory = shared_memory.SharedMemory(create=True, size=48)
+	try:
+		distribute_read(memory, reads, thread_max=1)
+		np.testing.assert_array_equal(np.ndarray(12, np.uint32, buffer=memory.buf), values)
+	finally:
+		memory.close()
+		memory.unlink()
+	with pytest.raises(ValueError, match="whole number"):
+		offset_reads(path, source_offset=0, target_offset=0, size=6, swap=4)
+
+
+def test_aligned_windows_decode_each_segment_once(tmp_path):
+	path = tmp_path / "strips.tif"
+	image = _image(shape=(40, 30))
+	tifffile.imwrite(path, image, compression="zlib", rowsperstrip=16)
+	layout = inspect_layouts([path])[0]
+	alignment = decode_alignment([layout, inspect_layouts(_write_inputs(tmp_path))[0]])
+	windows = sinogram.plan_windows(range(3, 40), 5, alignment)
+
+	assert alignment == 16
+	assert windows == [range(3, 16), range(16, 32), range(32, 40)]
+	assert sinogram.plan_windows(range(3, 12), 4) == [range(3, 7), range(7, 11), range(11, 12)]
+	decoded = 0
+	for window in windows:
+		memory = shared_memory.SharedMemory(create=True, size=len(window) * layout.row_bytes)
+		try:
+			decoded += distribute_read(memory, layout_reads(layout, window, 0), thread_max=1).decoded
+			np.testing.assert_array_equal(np.ndarray((len(window), 30), np.uint16, buffer=memory.buf), image[window])
+		finally:
+			memory.close()
+			memory.unlink()
+	assert decoded == 3
+
+
+def test_decode_reads_split_on_segment_boundaries():
+	read = DecodeRead("image.tif", 0, 3, 30, 100, 10, chunk_rows=8)
+
+	pieces = read.split(3)
+
+	assert [(piece.row_start, piece.row_stop) for piece in pieces] == [(3, 16), (16, 30)]
+	assert [piece.target_offset for piece in pieces] == [100, 230]
+	with pytest.raises(ValueError, match="chunk_rows"):
+		DecodeRead("image.tif", 0, 0, 1, 0, 1, chunk_rows=0)
+
+
+@pytest.mark.parametrize("sino_order", [True, False])
+def test_sinogram_gather_decodes_compressed_projections(tmp_path, monkeypatch, sino_order):
+	messages = []
+	monkeypatch.setattr(sinogram.log, "write", lambda step, statement="", **_kwargs: messages.append((step, statement)))
+	layouts = inspect_layouts(_write_inputs(tmp_path))
+	projection = {"bytesize": 2, "x": 30}
+	shape = SinoOrder(2, 4, 30) if sino_order else ProjOrder(4, 2, 30)
+
+	with SharedNP(f"layout_{uuid.uuid4().hex}", np.uint16, shape, create=True) as target_mem:
+		sinogram.distribute_read(
+			target_mem, projection, range(9, 11), range(0, 2), enumerate(layouts), thread_max=1, sino_order=sino_order
+		)
+		with target_mem as target:
+			expected = np.stack([_image(index)[9:11] for index in range(4)])
+			assert np.array_equal(target, expected.transpose(1, 0, 2) if sino_order else expected)
+
+	assert any(step == "Read Coalescing" and "segment(s) decoded" in statement for step, statement in messages)
+
+
+def test_precompute_stages_compressed_stack_pages_by_decoding(tmp_path):
+	path = tmp_path / "volume.tif"
+	volume = np.stack([_image(index, (12, 10)) for index in range(3)])
+	tifffile.imwrite(path, volume, compression="zlib", photometric="minisblack")
+
+	spec = precompute_module.discover_input(path)
+
+	assert spec.mode == "memmap" and spec.raw_offset is None
+	assert spec.shape == (3, 12, 10)
+	assert [layout.kind for layout in spec.layouts] == ["compressed"] * 3
+	plane_size = 12 * 10 * 2
+	memory = shared_memory.SharedMemory(create=True, size=2 * plane_size)
+	try:
+		precompute_module._stage_batch(memory, spec, [(2, 0), (0, 1)], plane_size, 1)
+		staged = np.ndarray((2, 12, 10), np.uint16, buffer=memory.buf)
+		np.testing.assert_array_equal(staged, volume[[2, 0]])
+		del staged
+	finally:
+		memory.close()
+		memory.unlink()
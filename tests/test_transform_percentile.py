@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from mctutil.transform.normalize import normalization_bounds
+from mctutil.transform.percentile import PercentileSketch, volume_percentiles
+
+
+PERCENTILES = (0, 0.5, 2, 33.3, 50, 98, 99.9, 100)
+
+
+@pytest.mark.parametrize(
+	"dtype",
+	(np.uint8, np.int8, np.uint16, np.int16, np.int32, np.uint32),
+)
+def test_integer_histogram_percentiles_match_numpy_exactly(dtype):
+	info = np.iinfo(dtype)
+	volume = np.random.default_rng(7).integers(
+		max(int(info.min), -20000),
+		min(int(info.max), 20000),
+		size=(5, 13, 11),
+		dtype=dtype,
+		endpoint=True,
+	)
+
+	actual = volume_percentiles(volume, PERCENTILES, workers=3)
+
+	assert actual == tuple(float(value) for value in np.percentile(volume, PERCENTILES))
+
+
+def test_small_integers_need_one_pass_and_wide_ranges_two():
+	assert not PercentileSketch(np.uint16).needs_second_pass
+	assert PercentileSketch(np.int32).needs_second_pass
+	assert PercentileSketch(np.float32).needs_second_pass
+
+
+def test_float_histogram_percentiles_are_within_one_bin():
+	volume = np.random.default_rng(8).normal(size=(8, 32, 32)).astype(np.float32)
+	bins = 1024
+	width = (float(volume.max()) - float(volume.min())) / bins
+
+	actual = np.array(volume_percentiles(volume, PERCENTILES, workers=2, bins=bins))
+	expected = np.percentile(volume, PERCENTILES)
+
+	assert np.all(np.abs(actual - expected) <= width)
+	assert actual[0] == expected[0]
+	assert actual[-1] == expected[-1]
+
+
+def test_floats_spanning_exactly_the_bin_count_still_interpolate():
+	volume = np.linspace(0, 64, 5 * 7 * 9, dtype=np.float64).reshape(5, 7, 9) ** 1.5 / 8
+	sketch = PercentileSketch(volume.dtype, bins=64)
+	for plane in volume:
+		sketch.observe(plane)
+	for plane in volume:
+		sketch.accumulate(plane)
+
+	actual = np.array(sketch.percentiles(PERCENTILES))
+
+	assert float(volume.max() - volume.min()) == 64
+	assert not sketch.exact
+	assert np.all(np.abs(actual - np.percentile(volume, PERCENTILES)) <= 1)
+
+
+def test_constant_and_unobserved_streams():
+	constant = np.full((2, 3, 3), 7.5, dtype=np.float32)
+	assert volume_percentiles(constant, (1, 99)) == (7.5, 7.5)
+	sketch = PercentileSketch(np.float32)
+	with pytest.raises(ValueError, match="observe every plane"):
+		sketch.accumulate(constant[0])
+	with pytest.raises(ValueError, match="planes; got"):
+		sketch.observe(constant[0].astype(np.float64))
+
+
+def test_normalization_bounds_use_the_histogram_engine():
+	image = np.arange(101, dtype=np.uint8).reshape(1, 101)
+
+	assert normalization_bounds(image, 5, 95, workers=2) == (5.0, 95.0)
+
+
+def test_non_finite_float_values_are_left_out():
+	volume = np.random.default_rng(9).normal(size=(4, 16, 16)).astype(np.float32)
+	finite = volume.copy()
+	volume[0, 0, :3] = (np.nan, np.inf, -np.inf)
+	volume[2, 5, 5] = np.nan
+
+	actual = np.array(volume_percentiles(volume, (0, 50, 100), bins=1 << 12))
+
+	expected = np.percentile(np.delete(finite.ravel(), [0, 1, 2, 2 * 256 + 5 * 16 + 5]), (0, 50, 100))
+	width = (float(np.nanmax(finite)) - float(np.nanmin(finite))) / (1 << 12)
+	assert np.all(np.isfinite(actual))
+	assert np.all(np.abs(actual - expected) <= width)
+	with pytest.raises(ValueError, match="NaN or infinite"):
+		volume_percentiles(np.full((2, 2), np.nan, dtype=np.float32), (1, 99))